@@ -0,0 +1,116 @@
+"""
+AI Job Lease Check for TestGenie Enterprise
+Checks that a worker whose lease lapsed cannot write to a job claimed again (ai_jobs.py)
+
+Worker A stores a case, its heartbeat is aged past the lease, the job is
+requeued and claimed by worker B; A's next case must be rolled back and A
+must stop. B then finishes the job with the ids A stored. No provider is
+called: ai_service.stream_test_cases is replaced by scripted streams.
+
+Usage:
+    python ai_job_check.py
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Checks run against a scratch database built from the current models, without worker threads
+os.environ['DATABASE_URL'] = os.environ.get('AI_JOB_CHECK_DATABASE_URL', 'sqlite://')
+os.environ['AI_JOB_WORKERS'] = '0'
+os.environ['AI_CACHE_ENABLED'] = 'false'
+
+LEASE_SECONDS = 300
+
+
+def check(condition, label, failures):
+    print(f"{'✅' if condition else '❌'} {label}")
+    if not condition:
+        failures.append(label)
+
+
+def case(title):
+    return {'title': title, 'description': '', 'expected_result': '', 'steps': [], 'tags': []}
+
+
+def age_lease(job_id):
+    from models import db, AIJob
+
+    job = db.session.get(AIJob, job_id)
+    job.heartbeat_at = datetime.utcnow() - timedelta(seconds=LEASE_SECONDS + 1)
+    db.session.commit()
+
+
+def main():
+    from ai_service import ai_service
+    from ai_jobs import submit_ai_job, claim_job, requeue_stale_jobs, run_ai_job, MAX_ATTEMPTS
+    from enterprise_test_platform_sqlite import app
+    from models import db, AIJob, Project, TestCase
+
+    print("🧪 TestGenie AI Job Lease Check")
+    print("=" * 50)
+    failures = []
+    with app.app_context():
+        project = Project(name='AI job check', description='')
+        db.session.add(project)
+        db.session.commit()
+        job_id = submit_ai_job('Users log in', project.id, 'functional', 3).id
+
+        def stream_a(**kwargs):
+            yield case('A1')
+            # Worker A stalls past its lease; the job goes to worker B
+            age_lease(job_id)
+            requeue_stale_jobs(LEASE_SECONDS)
+            claim_job('worker-b')
+            yield case('A2')
+            yield case('A3')
+
+        check(claim_job('worker-a') == job_id, 'worker A claims the job', failures)
+        ai_service.stream_test_cases = stream_a
+        run_ai_job(job_id, 'worker-a')
+        job = db.session.get(AIJob, job_id)
+        titles = [tc.title for tc in TestCase.query.filter_by(project_id=project.id)]
+        check(job.status == 'Running' and job.worker == 'worker-b' and job.attempts == 2,
+              f'job stays Running for worker B ({job.status}, {job.worker}, {job.attempts} attempts)', failures)
+        check(len(job.get_test_case_ids()) == 1 and titles == ['A1'],
+              f'worker A stopped: its case after losing the claim was rolled back {titles}', failures)
+
+        ai_service.stream_test_cases = lambda **kwargs: iter([case('B1'), case('B2')])
+        run_ai_job(job_id, 'worker-b')
+        db.session.expire_all()
+        job = db.session.get(AIJob, job_id)
+        ids = job.get_test_case_ids()
+        check(job.status == 'Completed' and len(ids) == 3 and len(set(ids)) == 3
+              and TestCase.query.filter_by(project_id=project.id).count() == 3,
+              'worker B completes the job with the ids A stored, no duplicates', failures)
+
+        # A long generation that keeps storing cases keeps its lease
+        job_id = submit_ai_job('Users log out', project.id, 'functional', 1).id
+        claim_job('worker-c')
+        job = db.session.get(AIJob, job_id)
+        job.started_at = datetime.utcnow() - timedelta(seconds=10 * LEASE_SECONDS)
+        db.session.commit()
+        requeue_stale_jobs(LEASE_SECONDS)
+        db.session.expire_all()
+        check(db.session.get(AIJob, job_id).status == 'Running', 'fresh heartbeat keeps an old claim', failures)
+
+        # Out of attempts: the job fails and its old worker cannot complete it afterwards
+        job = db.session.get(AIJob, job_id)
+        job.attempts = MAX_ATTEMPTS
+        db.session.commit()
+        age_lease(job_id)
+        requeue_stale_jobs(LEASE_SECONDS)
+        ai_service.stream_test_cases = lambda **kwargs: iter([case('C1')])
+        run_ai_job(job_id, 'worker-c')
+        db.session.expire_all()
+        job = db.session.get(AIJob, job_id)
+        check(job.status == 'Failed' and not job.get_test_case_ids(),
+              f'failed job is not flipped back to Completed ({job.status})', failures)
+
+    print()
+    print(f"📊 {len(failures)} failed checks")
+    return failures
+
+
+if __name__ == '__main__':
+    sys.exit(1 if main() else 0)
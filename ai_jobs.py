@@ -0,0 +1,354 @@
+"""
+AI Generation Jobs for TestGenie Enterprise
+Runs AI test case generation on a local worker pool instead of in the web request
+
+POST /api/ai-generate only records an AIJob row (the durable queue) and
+returns its id; clients poll GET /api/ai-jobs/<id> or follow
+GET /api/ai-jobs/<id>/events (Server-Sent Events, reconnecting every
+STREAM_SECONDS so no web worker waits out a generation). Workers stream the
+completion from the provider and store each test case as soon as its JSON
+object closes, so events start with the first case. Worker threads claim
+the oldest queued job with a conditional UPDATE, so any number of pools -
+one per gunicorn worker, or `python ai_jobs.py worker` on its own - share
+the queue without running a job twice. Web workers never wait on the AI
+provider.
+
+A claim is a lease: the worker renews ai_jobs.heartbeat_at with every case
+it stores, and a job whose heartbeat is older than AI_JOB_LEASE_SECONDS (its
+worker was stopped) is queued again, up to MAX_ATTEMPTS tries. Every write a
+worker makes to a job is scoped to its own claim, so a worker whose lease
+lapsed and whose job was claimed again stops instead of overwriting it.
+
+Settings (Config in azure_config.py):
+    AI_JOB_WORKERS        - worker threads per web process; 0 runs none (default 2)
+    AI_JOB_POLL_SECONDS   - idle poll interval, for jobs queued by other processes (default 2)
+    AI_JOB_LEASE_SECONDS  - how long a Running job may go without storing a case before it is retried (default 300)
+
+Usage:
+    python ai_jobs.py worker [--workers 4]   - Run a worker pool in the foreground
+    python ai_jobs.py status                 - List recent jobs
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, update
+
+from models import db, AIJob, Project, TestCase
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+
+# How often an SSE stream checks its job for new cases, and the comment sent when nothing changes
+EVENT_POLL_SECONDS = 0.25
+HEARTBEAT_SECONDS = 15
+# How long one SSE response may hold its web worker (below gunicorn's 30s sync worker timeout);
+# the browser then reconnects after RECONNECT_MILLISECONDS with Last-Event-ID
+STREAM_SECONDS = 20
+RECONNECT_MILLISECONDS = 500
+
+
+def submit_ai_job(requirements, project_id, test_type, count, bypass_cache=False):
+    """Queue a generation and wake the local workers"""
+    job = AIJob(requirements=requirements, project_id=project_id or None, test_type=test_type, count=count,
+                bypass_cache=bypass_cache)
+    db.session.add(job)
+    db.session.commit()
+    if job_pool is not None:
+        job_pool.ensure_started()
+        job_pool.notify()
+    return job
+
+
+class ClaimLost(Exception):
+    """The job was requeued after its lease lapsed and is no longer this worker's"""
+
+
+def claim_job(worker):
+    """Mark the oldest queued job Running for this worker; its id, or None when the queue is empty"""
+    jobs = AIJob.__table__
+    while True:
+        job_id = db.session.execute(
+            select(jobs.c.id).where(jobs.c.status == 'Queued')
+            .order_by(jobs.c.created_at).limit(1)).scalar()
+        if job_id is None:
+            db.session.rollback()
+            return None
+        now = datetime.utcnow()
+        claimed = db.session.execute(
+            update(jobs).where(jobs.c.id == job_id, jobs.c.status == 'Queued')
+            .values(status='Running', worker=worker, started_at=now, heartbeat_at=now,
+                    attempts=jobs.c.attempts + 1)).rowcount
+        db.session.commit()
+        if claimed:
+            return job_id
+        # Another worker claimed it between the SELECT and the UPDATE
+
+
+def update_claimed_job(job_id, worker, **values):
+    """Update a job this worker still holds, in the current transaction; ClaimLost otherwise"""
+    jobs = AIJob.__table__
+    updated = db.session.execute(
+        update(jobs).where(jobs.c.id == job_id, jobs.c.status == 'Running', jobs.c.worker == worker)
+        .values(**values)).rowcount
+    if not updated:
+        raise ClaimLost(job_id)
+
+
+def requeue_stale_jobs(lease_seconds):
+    """Queue again (or fail, after MAX_ATTEMPTS) jobs whose worker stopped renewing its lease"""
+    jobs = AIJob.__table__
+    cutoff = datetime.utcnow() - timedelta(seconds=lease_seconds)
+    stale = (jobs.c.status == 'Running', func.coalesce(jobs.c.heartbeat_at, jobs.c.started_at) < cutoff)
+    # Checked with a read first: idle workers call this on every poll
+    if db.session.execute(select(jobs.c.id).where(*stale).limit(1)).scalar() is None:
+        db.session.rollback()
+        return 0
+    failed = db.session.execute(
+        update(jobs).where(*stale, jobs.c.attempts >= MAX_ATTEMPTS)
+        .values(status='Failed', message='Worker stopped while generating', finished_at=datetime.utcnow())).rowcount
+    queued = db.session.execute(update(jobs).where(*stale).values(status='Queued', worker=None)).rowcount
+    db.session.commit()
+    logger.warning(f"⚠️ Requeued {queued} and failed {failed} AI jobs left running by stopped workers")
+    return queued
+
+
+def add_generated_case(case_data, project_id):
+    """Add a generated test case to the session as a Draft tagged ai-generated"""
+    test_case = TestCase(
+        title=case_data.get('title', 'AI Generated Test Case'),
+        description=case_data.get('description', ''),
+        expected_result=case_data.get('expected_result', ''),
+        priority=case_data.get('priority', 'Medium'),
+        status='Draft',
+        project_id=project_id,
+        created_by='ai-system'
+    )
+
+    # Handle steps and tags
+    if case_data.get('steps'):
+        test_case.set_steps(case_data.get('steps'))
+    if case_data.get('tags'):
+        test_case.set_tags(case_data.get('tags', []) + ['ai-generated'])
+    else:
+        test_case.set_tags(['ai-generated'])
+
+    db.session.add(test_case)
+    return test_case
+
+
+def run_ai_job(job_id, worker):
+    """Generate the test cases of a job claimed by worker, storing each one as the provider streams it
+
+    Each stored case commits together with the job's test_case_ids and a renewed
+    heartbeat; if the claim was lost meanwhile, that case is rolled back and the
+    worker stops.
+    """
+    from ai_service import ai_service
+
+    job = db.session.get(AIJob, job_id)
+    try:
+        # Jobs queued before project_id was required have nowhere to store their cases
+        if not job.project_id or db.session.get(Project, job.project_id) is None:
+            raise ValueError('Project not found')
+        update_claimed_job(job_id, worker, ai_provider=ai_service.get_provider_status()['primary_provider'])
+        db.session.commit()
+
+        # A retried job keeps the cases stored before its worker stopped and asks for the
+        # rest; that smaller count is a different cache key, so a retry never reads the cache
+        ids = job.get_test_case_ids()
+        remaining = job.count - len(ids)
+        generated_cases = ai_service.stream_test_cases(
+            requirements=job.requirements,
+            project_id=job.project_id,
+            test_type=job.test_type,
+            count=remaining,
+            use_cache=not job.bypass_cache and job.attempts <= 1
+        ) if remaining > 0 else []
+        for case_data in generated_cases:
+            test_case = add_generated_case(case_data, job.project_id)
+            db.session.flush()
+            ids.append(test_case.id)
+            update_claimed_job(job_id, worker, test_case_ids=json.dumps(ids), heartbeat_at=datetime.utcnow())
+            db.session.commit()
+            if len(ids) >= job.count:
+                break  # The model wrote more cases than asked for
+        update_claimed_job(job_id, worker, status='Completed', finished_at=datetime.utcnow())
+        db.session.commit()
+        logger.info(f"✅ AI job {job_id}: {len(ids)} test cases")
+    except ClaimLost:
+        db.session.rollback()
+        logger.warning(f"⚠️ AI job {job_id}: lease lapsed and the claim was lost, worker {worker} stopped")
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"❌ AI job {job_id} failed: {e}")
+        try:
+            update_claimed_job(job_id, worker, status='Failed', message=str(e), finished_at=datetime.utcnow())
+            db.session.commit()
+        except ClaimLost:
+            db.session.rollback()
+
+
+def ai_job_result(job):
+    """Job status; completed jobs carry the generated cases like the old synchronous response"""
+    from ai_service import ai_service
+
+    result = job.to_dict()
+    if job.status == 'Completed':
+        ids = job.get_test_case_ids()
+        cases = {tc.id: tc for tc in TestCase.query.filter(TestCase.id.in_(ids)).all()} if ids else {}
+        result['generated_cases'] = [cases[id].to_dict() for id in ids if id in cases]
+        result['provider_details'] = ai_service.get_provider_status().get('provider_details', {})
+    return result
+
+
+def sse_event(event, data, event_id=None):
+    """One Server-Sent Events message"""
+    lines = [f'id: {event_id}'] if event_id is not None else []
+    lines += [f'event: {event}', f'data: {json.dumps(data)}']
+    return '\n'.join(lines) + '\n\n'
+
+
+def job_events(job_id, last_event_id=None, poll_seconds=EVENT_POLL_SECONDS, stream_seconds=STREAM_SECONDS):
+    """SSE stream of a job: a test_case event per stored case, then done or failed
+
+    Event ids are case positions, so a reconnecting EventSource (Last-Event-ID)
+    resumes after the last case it received. Only the database is polled; the
+    provider is called by the worker thread. A response ends after
+    stream_seconds so it never pins a synchronous web worker for a whole
+    generation; EventSource reconnects and the next response picks up there.
+    """
+    jobs = AIJob.__table__
+    sent = int(last_event_id) + 1 if last_event_id and last_event_id.isdigit() else 0
+    started = idle_since = time.monotonic()
+    yield f'retry: {RECONNECT_MILLISECONDS}\n\n'
+    while True:
+        row = db.session.execute(
+            select(jobs.c.status, jobs.c.test_case_ids).where(jobs.c.id == job_id)).one_or_none()
+        # End the read transaction so the next poll sees the worker's commits
+        db.session.rollback()
+        if row is None:
+            yield sse_event('failed', {'id': job_id, 'status': 'Failed', 'message': 'Job not found'})
+            return
+        ids = json.loads(row.test_case_ids) if row.test_case_ids else []
+        if len(ids) > sent:
+            cases = {tc.id: tc for tc in TestCase.query.filter(TestCase.id.in_(ids[sent:])).all()}
+            for index in range(sent, len(ids)):
+                if ids[index] in cases:
+                    yield sse_event('test_case', cases[ids[index]].to_dict(), index)
+            sent = len(ids)
+            idle_since = time.monotonic()
+        if row.status in ('Completed', 'Failed'):
+            result = ai_job_result(db.session.get(AIJob, job_id))
+            result.pop('generated_cases', None)
+            yield sse_event('done' if row.status == 'Completed' else 'failed', result)
+            return
+        if time.monotonic() - started >= stream_seconds:
+            return  # The client reconnects with Last-Event-ID
+        if time.monotonic() - idle_since >= HEARTBEAT_SECONDS:
+            yield ': keep-alive\n\n'
+            idle_since = time.monotonic()
+        time.sleep(poll_seconds)
+
+
+class AIJobPool:
+    """Worker threads taking jobs from the ai_jobs table"""
+
+    def __init__(self, app, workers, poll_seconds=2, lease_seconds=300):
+        self.app = app
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def ensure_started(self):
+        """Start the threads on first use, so scripts importing the app run no workers"""
+        with self._lock:
+            if not self._threads:
+                self.start()
+
+    def start(self):
+        with self.app.app_context():
+            requeue_stale_jobs(self.lease_seconds)
+        for index in range(self.workers):
+            # Unique across hosts too: claims are checked by worker name
+            name = f'{socket.gethostname()}-{os.getpid()}-{index}'
+            thread = threading.Thread(target=self._work, args=(name,), name=f'ai-job-{name}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"✅ AI job pool started ({self.workers} workers)")
+
+    def notify(self):
+        """A job was queued in this process: stop waiting for the next poll"""
+        self._wake.set()
+
+    def _work(self, name):
+        while True:
+            try:
+                with self.app.app_context():
+                    job_id = claim_job(name)
+                    if job_id is not None:
+                        run_ai_job(job_id, name)
+                        continue
+                    requeue_stale_jobs(self.lease_seconds)
+            except Exception as e:
+                logger.error(f"❌ AI job worker {name} error: {e}")
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+    def join(self):
+        for thread in self._threads:
+            thread.join()
+
+
+# Pool of the current process, started by init_ai_jobs()
+job_pool = None
+
+
+def init_ai_jobs(app, config, workers=None):
+    """Set up the worker pool with the AI_JOB_* settings (none when AI_JOB_WORKERS is 0)
+
+    The threads start with the first job submitted or polled in this process.
+    """
+    global job_pool
+    workers = config.AI_JOB_WORKERS if workers is None else workers
+    if workers <= 0:
+        logger.info("ℹ️ No AI job workers in this process; run `python ai_jobs.py worker`")
+        return None
+    job_pool = AIJobPool(app, workers, config.AI_JOB_POLL_SECONDS, config.AI_JOB_LEASE_SECONDS)
+    return job_pool
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='AI generation job workers')
+    commands = parser.add_subparsers(dest='command', required=True)
+    worker_parser = commands.add_parser('worker', help='run a worker pool in the foreground')
+    worker_parser.add_argument('--workers', type=int, default=4)
+    commands.add_parser('status', help='list recent jobs')
+    args = parser.parse_args()
+
+    # The web app would start its own pool on import; this process runs only the requested one
+    os.environ['AI_JOB_WORKERS'] = '0'
+    from azure_config import get_config
+    from enterprise_test_platform_sqlite import app
+
+    if args.command == 'worker':
+        print(f"🤖 Running {args.workers} AI job workers (Ctrl+C to stop)")
+        pool = init_ai_jobs(app, get_config(), args.workers)
+        pool.start()
+        pool.join()
+    else:
+        with app.app_context():
+            for job in AIJob.query.order_by(AIJob.created_at.desc()).limit(20).all():
+                print(f"{job.status:10} {job.count:>3} {job.test_type:12} attempts={job.attempts}  "
+                      f"{job.created_at:%Y-%m-%d %H:%M:%S}  {job.id}")
@@ -5,14 +5,21 @@ Currently configured for Azure OpenAI with fallback options
 """
 
 import os
+import re
 import json
 import logging
+import queue
+import threading
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, NamedTuple
 from dataclasses import asdict
 from dotenv import load_dotenv
 
+from generation_cache import create_generation_cache, generation_key, estimate_tokens, CACHED_FIELDS
+from semantic_cache import create_semantic_index
+
 # Load environment variables
 load_dotenv()
 
@@ -20,6 +27,97 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# created_by of cases parsed from model output (mock and fallback cases are never cached)
+MODEL_CREATED_BY = 'AI Generator (Azure OpenAI)'
+
+# Aspects that shards of a large generation are steered toward, in turn, so they do not overlap
+SHARD_ASPECTS = {
+    'positive': 'valid inputs and successful, happy-path workflows',
+    'negative': 'invalid inputs, error handling and failure scenarios',
+    'boundary': 'boundary values, limits, empty and maximum inputs and edge cases',
+    'security': 'authentication, authorization, input sanitization and data exposure',
+    'workflow': 'multi-step workflows, state transitions and navigation between steps',
+    'data integrity': 'data persistence and consistency after creating, updating and deleting',
+    'concurrency': 'simultaneous users, repeated or duplicate submissions and race conditions',
+    'recovery': 'interruptions, timeouts, retries and failures of dependent services',
+    'usability': 'user feedback, messages, accessibility and ease of use',
+    'compatibility': 'browsers, devices, locales, time zones and character sets',
+    'performance': 'response times, load and large data volumes',
+    'integration': 'interaction with other modules, external services and APIs',
+}
+
+# When several shards share an aspect (more shards than aspects), each takes one priority tier
+SHARD_PRIORITIES = {2: ('High', 'Medium or Low'), 3: ('High', 'Medium', 'Low')}
+
+class Shard(NamedTuple):
+    """One provider call of a large generation: an aspect and, when it is shared, a priority tier"""
+    aspect: str
+    priority: Optional[str]
+    count: int
+
+# Start of the test case array in the generation JSON, whatever the whitespace
+_TEST_CASES_ARRAY = re.compile(r'"test_cases"\s*:\s*\[')
+
+class TestCaseStreamParser:
+    """
+    Incremental parser for the {"test_cases": [{...}, ...]} generation format
+    
+    feed() takes completion text as it streams in and returns each test case
+    object as soon as its closing brace arrives, by tracking string and
+    nesting state instead of re-parsing the whole text. Markdown fences or
+    text around the JSON are ignored.
+    """
+    
+    def __init__(self):
+        self.buffer = ''
+        self.done = False      # The array has closed
+        self._array_at = None  # Buffer offset just after the opening [
+        self._pos = 0
+        self._depth = 0
+        self._start = None     # Offset of the current object's {
+        self._in_string = False
+        self._escape = False
+    
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """Add streamed text; returns the test cases completed by it"""
+        self.buffer += text
+        if self._array_at is None:
+            match = _TEST_CASES_ARRAY.search(self.buffer)
+            if not match:
+                return []
+            self._array_at = self._pos = match.end()
+        
+        cases = []
+        buffer = self.buffer
+        while self._pos < len(buffer) and not self.done:
+            char = buffer[self._pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                if self._depth == 0 and char == '{':
+                    self._start = self._pos
+                self._depth += 1
+            elif char in '}]':
+                if self._depth == 0:
+                    self.done = True  # The test_cases array itself closed
+                else:
+                    self._depth -= 1
+                    if self._depth == 0 and self._start is not None:
+                        try:
+                            cases.append(json.loads(buffer[self._start:self._pos + 1]))
+                        except json.JSONDecodeError as e:
+                            logger.warning(f"⚠️ Skipping malformed streamed test case: {e}")
+                        self._start = None
+            self._pos += 1
+        return cases
+
 class AIService:
     """
     Flexible AI service that can work with multiple providers
@@ -29,6 +127,12 @@ class AIService:
     def __init__(self):
         self.primary_provider = os.getenv('AI_PRIMARY_PROVIDER', 'azure')
         self.setup_providers()
+        self.generation_cache = create_generation_cache()
+        self.semantic_index = create_semantic_index(self.generation_cache)
+        # Counts above shard_size are generated as concurrent shards (see _shards())
+        self.shard_size = max(1, int(os.getenv('AI_SHARD_SIZE', 5)))
+        self.shard_parallelism = max(1, int(os.getenv('AI_SHARD_PARALLELISM', 8)))
+        self.tokens_per_case = max(1, int(os.getenv('AI_TOKENS_PER_CASE', 250)))
     
     def setup_providers(self):
         """Initialize AI providers based on available credentials"""
@@ -108,7 +212,7 @@ class AIService:
         return bool(os.getenv('OPENAI_API_KEY'))
     
     def generate_test_cases(self, requirements: str, project_id: str, 
-                          test_type: str, count: int) -> List[Dict[str, Any]]:
+                          test_type: str, count: int, use_cache: bool = True) -> List[Dict[str, Any]]:
         """
         Generate test cases using AI based on requirements
         
@@ -117,16 +221,89 @@ class AIService:
             project_id: Target project ID
             test_type: Type of test (functional, api, performance, etc.)
             count: Number of test cases to generate
+            use_cache: False skips the generation cache lookups (the fresh
+                result still replaces the cached one)
             
         Returns:
             List of generated test case dictionaries
         """
+        key = self._generation_key(requirements, test_type, count)
+        if key and use_cache:
+            cached = self._cached_test_cases(key, requirements, test_type, count, project_id)
+            if cached is not None:
+                return cached
+        
+        if len(self._shards(count)) > 1:
+            test_cases = self._generate_sharded(requirements, project_id, test_type, count)
+        else:
+            test_cases = self._generate_uncached(requirements, project_id, test_type, count)
+        self._store_generation(key, requirements, test_type, count, test_cases)
+        return test_cases
+    
+    def _cases_per_call(self) -> int:
+        """Most cases one completion holds within AI_MAX_TOKENS, for the smallest provider budget"""
+        budgets = {'azure': int(os.getenv('AI_MAX_TOKENS', 2000)), 'openai': int(os.getenv('AI_MAX_TOKENS', 4000))}
+        budget = min((budgets[name] for name in self.providers if name in budgets), default=budgets['azure'])
+        return max(1, budget // self.tokens_per_case)
+    
+    def _shards(self, count: int) -> List[Optional[Shard]]:
+        """
+        Provider calls of a generation; [None] (one unsteered call) for small counts
+        
+        A count is spread over up to shard_parallelism shards (about
+        count / shard_parallelism cases each, at least shard_size), so they all
+        run in one round; more shards are used only when that would not fit in
+        AI_MAX_TOKENS. Shards take the aspects in turn; shards sharing an
+        aspect each take a priority tier, so prompts stay distinct up to
+        3 shards per aspect.
+        """
+        if not self.providers:
+            return [None]
+        shards = max(min(self.shard_parallelism, -(-count // self.shard_size)),
+                     -(-count // self._cases_per_call()))
+        if shards <= 1:
+            return [None]
+        aspects = list(SHARD_ASPECTS)
+        result = []
+        for i in range(shards):
+            sharing = len(range(i % len(aspects), shards, len(aspects)))
+            tiers = SHARD_PRIORITIES.get(min(sharing, 3), (None,))
+            result.append(Shard(aspect=aspects[i % len(aspects)], priority=tiers[i // len(aspects) % len(tiers)],
+                                count=count // shards + (1 if i < count % shards else 0)))
+        return result
+    
+    def _generate_sharded(self, requirements: str, project_id: str,
+                          test_type: str, count: int) -> List[Dict[str, Any]]:
+        """Generate each shard concurrently and merge them in shard order without duplicates"""
+        shards = self._shards(count)
+        logger.info(f"🧩 Generating {count} test cases as {len(shards)} shards "
+                    f"({self.shard_parallelism} at a time)")
+        with ThreadPoolExecutor(max_workers=min(self.shard_parallelism, len(shards))) as executor:
+            results = executor.map(
+                lambda shard: self._generate_uncached(requirements, project_id, test_type, shard.count, shard),
+                shards)
+            seen = set()
+            return [case for cases in results for case in cases if self._first_occurrence(case, seen)][:count]
+    
+    def _first_occurrence(self, case: Dict[str, Any], seen: set) -> bool:
+        """False for a model case whose title was already merged from another shard"""
+        if case.get('created_by') != MODEL_CREATED_BY:
+            return True  # Mock and fallback templates repeat titles by design
+        title = ' '.join(str(case.get('title', '')).lower().split())
+        if title in seen:
+            return False
+        seen.add(title)
+        return True
+    
+    def _generate_uncached(self, requirements: str, project_id: str, test_type: str,
+                           count: int, shard: Optional[Shard] = None) -> List[Dict[str, Any]]:
+        """Provider chain of generate_test_cases(): primary, fallbacks, then mock cases"""
         
         # Try primary provider first
         if self.primary_provider in self.providers:
             try:
                 return self._generate_with_provider(
-                    self.primary_provider, requirements, project_id, test_type, count
+                    self.primary_provider, requirements, project_id, test_type, count, shard
                 )
             except Exception as e:
                 logger.error(f"❌ Primary provider {self.primary_provider} failed: {e}")
@@ -137,7 +314,7 @@ class AIService:
                 try:
                     logger.info(f"🔄 Trying fallback provider: {provider_name}")
                     return self._generate_with_provider(
-                        provider_name, requirements, project_id, test_type, count
+                        provider_name, requirements, project_id, test_type, count, shard
                     )
                 except Exception as e:
                     logger.error(f"❌ Fallback provider {provider_name} failed: {e}")
@@ -146,19 +323,19 @@ class AIService:
         logger.warning("⚠️ All AI providers failed, using mock generation")
         return self._generate_mock_test_cases(requirements, project_id, test_type, count)
     
-    def _generate_with_provider(self, provider_name: str, requirements: str, 
-                              project_id: str, test_type: str, count: int) -> List[Dict[str, Any]]:
+    def _generate_with_provider(self, provider_name: str, requirements: str, project_id: str,
+                              test_type: str, count: int, shard: Optional[Shard] = None) -> List[Dict[str, Any]]:
         """Generate test cases using a specific AI provider"""
         
         if provider_name == 'azure':
-            return self._generate_with_azure(requirements, project_id, test_type, count)
+            return self._generate_with_azure(requirements, project_id, test_type, count, shard)
         elif provider_name == 'openai':
-            return self._generate_with_openai(requirements, project_id, test_type, count)
+            return self._generate_with_openai(requirements, project_id, test_type, count, shard)
         else:
             raise ValueError(f"Unsupported provider: {provider_name}")
     
-    def _generate_with_azure(self, requirements: str, project_id: str, 
-                           test_type: str, count: int) -> List[Dict[str, Any]]:
+    def _generate_with_azure(self, requirements: str, project_id: str, test_type: str,
+                           count: int, shard: Optional[Shard] = None) -> List[Dict[str, Any]]:
         """Generate test cases using Azure OpenAI with timeout and error handling"""
         
         client = self.providers['azure']
@@ -168,7 +345,7 @@ class AIService:
             logger.error("❌ AZURE_OPENAI_DEPLOYMENT not configured")
             raise ValueError("Azure OpenAI deployment name not configured")
         
-        prompt = self._create_test_generation_prompt(requirements, test_type, count)
+        prompt = self._create_test_generation_prompt(requirements, test_type, count, shard)
         
         try:
             logger.info(f"🤖 Generating {count} test cases using Azure OpenAI...")
@@ -193,14 +370,14 @@ class AIService:
             # Return fallback test cases if AI fails
             return self._generate_fallback_test_cases(requirements, test_type, count, project_id)
     
-    def _generate_with_openai(self, requirements: str, project_id: str, 
-                            test_type: str, count: int) -> List[Dict[str, Any]]:
+    def _generate_with_openai(self, requirements: str, project_id: str, test_type: str,
+                            count: int, shard: Optional[Shard] = None) -> List[Dict[str, Any]]:
         """Generate test cases using OpenAI"""
         
         client = self.providers['openai']
         model = os.getenv('OPENAI_MODEL', 'gpt-4')
         
-        prompt = self._create_test_generation_prompt(requirements, test_type, count)
+        prompt = self._create_test_generation_prompt(requirements, test_type, count, shard)
         
         response = client.chat.completions.create(
             model=model,
@@ -214,9 +391,228 @@ class AIService:
         
         return self._parse_ai_response(response.choices[0].message.content, project_id)
     
-    def _create_test_generation_prompt(self, requirements: str, test_type: str, count: int) -> str:
-        """Create a detailed prompt for AI test case generation"""
+    def stream_test_cases(self, requirements: str, project_id: str, test_type: str,
+                          count: int, use_cache: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Generate test cases like generate_test_cases(), yielding each one as
+        soon as the provider's streamed completion contains it
+        
+        A provider that fails before producing a case is skipped like in
+        generate_test_cases(); one that fails midway ends the stream with the
+        cases already yielded. Cached generations are yielded at once; large
+        counts stream their shards concurrently.
+        """
+        key = self._generation_key(requirements, test_type, count)
+        if key and use_cache:
+            cached = self._cached_test_cases(key, requirements, test_type, count, project_id)
+            if cached is not None:
+                yield from cached
+                return
+        
+        if len(self._shards(count)) > 1:
+            stream = self._stream_sharded(requirements, project_id, test_type, count)
+        else:
+            stream = self._stream_uncached(requirements, project_id, test_type, count)
+        test_cases = []
+        for case in stream:
+            test_cases.append(case)
+            if len(test_cases) == count:
+                # Stored before the last case is handed out: consumers may stop there
+                self._store_generation(key, requirements, test_type, count, test_cases)
+            yield case
+    
+    def _stream_sharded(self, requirements: str, project_id: str,
+                        test_type: str, count: int) -> Iterator[Dict[str, Any]]:
+        """Stream the shards concurrently, yielding cases as they arrive without duplicates"""
+        shards = self._shards(count)
+        logger.info(f"🧩 Streaming {count} test cases as {len(shards)} shards "
+                    f"({self.shard_parallelism} at a time)")
+        arrivals = queue.Queue()
+        stop = threading.Event()
+        finished = object()
+        
+        def stream_shard(shard):
+            try:
+                for case in self._stream_uncached(requirements, project_id, test_type, shard.count, shard):
+                    if stop.is_set():
+                        return
+                    arrivals.put(case)
+            finally:
+                arrivals.put(finished)
+        
+        executor = ThreadPoolExecutor(max_workers=min(self.shard_parallelism, len(shards)))
+        try:
+            for shard in shards:
+                executor.submit(stream_shard, shard)
+            seen, running, yielded = set(), len(shards), 0
+            while running and yielded < count:
+                case = arrivals.get()
+                if case is finished:
+                    running -= 1
+                elif self._first_occurrence(case, seen):
+                    yielded += 1
+                    yield case
+        finally:
+            # The consumer stopped or has every case: shards still queued or running give up
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _stream_uncached(self, requirements: str, project_id: str, test_type: str,
+                         count: int, shard: Optional[Shard] = None) -> Iterator[Dict[str, Any]]:
+        """Provider chain of stream_test_cases()"""
+        providers = [self.primary_provider] if self.primary_provider in self.providers else []
+        providers += [name for name in self.providers if name != self.primary_provider]
+        
+        for provider_name in providers:
+            yielded = 0
+            try:
+                for case in self._stream_with_provider(provider_name, requirements, project_id,
+                                                       test_type, count, shard):
+                    yielded += 1
+                    yield case
+                if yielded:
+                    return
+                logger.error(f"❌ Provider {provider_name} streamed no test cases")
+            except Exception as e:
+                logger.error(f"❌ Streaming from {provider_name} failed: {e}")
+                if yielded:
+                    return
+        
+        if self.providers:
+            yield from self._generate_fallback_test_cases(requirements, test_type, count, project_id)
+        else:
+            yield from self._generate_mock_test_cases(requirements, project_id, test_type, count)
+    
+    def _generation_parameters(self) -> Dict[str, Any]:
+        """Model settings that change what a prompt generates, part of the cache key"""
+        models = {
+            'azure': (os.getenv('AZURE_OPENAI_DEPLOYMENT'), int(os.getenv('AI_MAX_TOKENS', 2000))),
+            'openai': (os.getenv('OPENAI_MODEL', 'gpt-4'), int(os.getenv('AI_MAX_TOKENS', 4000))),
+        }
+        providers = [self.primary_provider] if self.primary_provider in self.providers else []
+        providers += [name for name in self.providers if name != self.primary_provider]
+        return {
+            'providers': [[name, *models.get(name, (None, None))] for name in providers],
+            'temperature': float(os.getenv('AI_TEMPERATURE', 0.7)),
+            'shards': [self.shard_size, self.shard_parallelism, self.tokens_per_case]
+        }
+    
+    def _generation_key(self, requirements: str, test_type: str, count: int) -> Optional[str]:
+        """Cache key of a generation, or None when there is nothing to cache (no cache or no provider)"""
+        if self.generation_cache is None or not self.providers:
+            return None
+        prompt = self._create_test_generation_prompt(requirements, test_type, count)
+        return generation_key(prompt, self._generation_parameters())
+    
+    def _generation_scope(self, test_type: str, count: int) -> str:
+        """Everything in a cache key but the requirements; semantic matches stay within one scope"""
+        prompt = self._create_test_generation_prompt('', test_type, count)
+        return generation_key(prompt, self._generation_parameters())
+    
+    def _cached_test_cases(self, key: str, requirements: str, test_type: str, count: int,
+                           project_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Cached generation as fresh test cases, or None on a miss
+        
+        The exact key is tried first, then the generation of the most similar
+        earlier requirements (same test type, count and model parameters).
+        """
+        try:
+            cached = self.generation_cache.get(key)
+            if cached is None and self.semantic_index is not None:
+                cached = self._similar_generation(requirements, test_type, count)
+        except Exception as e:
+            logger.error(f"❌ AI generation cache lookup failed: {e}")
+            return None
+        if cached is None:
+            return None
+        cases, tokens = cached
+        logger.info(f"🎯 AI generation cache hit: {len(cases)} test cases, ~{tokens} tokens saved")
+        return [self._format_test_case(case, i, project_id) for i, case in enumerate(cases)]
+    
+    def _similar_generation(self, requirements: str, test_type: str, count: int):
+        """(cases, tokens) generated for near-duplicate requirements, or None"""
+        match = self.semantic_index.match(requirements, self._generation_scope(test_type, count))
+        if match is None:
+            return None
+        key, similarity, matched = match
+        cached = self.generation_cache.get(key)
+        if cached is None:
+            # Expired or evicted from the generation cache since it was indexed
+            self.semantic_index.forget(key)
+            return None
+        logger.info(f"🧭 Semantic cache hit: similarity {similarity:.3f} >= {self.semantic_index.threshold} "
+                    f"with \"{matched[:80]}\"")
+        return cached
+    
+    def _store_generation(self, key: Optional[str], requirements: str, test_type: str, count: int,
+                          test_cases: List[Dict[str, Any]]):
+        """Cache a generation when it is complete model output"""
+        if not key or any(case.get('created_by') != MODEL_CREATED_BY for case in test_cases):
+            return
+        if not test_cases or len(test_cases) < count:
+            # Truncated or cut-off completion: the next identical request should try again
+            return
+        prompt = self._create_test_generation_prompt(requirements, test_type, count)
+        completion = json.dumps({'test_cases': [{name: case.get(name) for name in CACHED_FIELDS}
+                                                for case in test_cases]})
+        try:
+            self.generation_cache.set(key, test_cases, estimate_tokens(prompt) + estimate_tokens(completion))
+            if self.semantic_index is not None:
+                self.semantic_index.add(requirements, self._generation_scope(test_type, count), key)
+        except Exception as e:
+            logger.error(f"❌ AI generation cache store failed: {e}")
+    
+    def _stream_with_provider(self, provider_name: str, requirements: str, project_id: str, test_type: str,
+                              count: int, shard: Optional[Shard] = None) -> Iterator[Dict[str, Any]]:
+        """Stream one provider's chat completion through TestCaseStreamParser"""
+        if provider_name == 'azure':
+            model = os.getenv('AZURE_OPENAI_DEPLOYMENT')
+            if not model:
+                raise ValueError("Azure OpenAI deployment name not configured")
+            max_tokens = int(os.getenv('AI_MAX_TOKENS', 2000))
+        elif provider_name == 'openai':
+            model = os.getenv('OPENAI_MODEL', 'gpt-4')
+            max_tokens = int(os.getenv('AI_MAX_TOKENS', 4000))
+        else:
+            raise ValueError(f"Unsupported provider: {provider_name}")
+        
+        logger.info(f"🤖 Streaming {count} test cases from {provider_name}...")
+        stream = self.providers[provider_name].chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": "You are an expert test case generator for software applications. Generate comprehensive, realistic test cases in JSON format."},
+                {"role": "user", "content": self._create_test_generation_prompt(requirements, test_type, count, shard)}
+            ],
+            max_tokens=max_tokens,
+            temperature=float(os.getenv('AI_TEMPERATURE', 0.7)),
+            timeout=25,  # Same limit as the non-streaming call
+            stream=True
+        )
         
+        parser = TestCaseStreamParser()
+        index = 0
+        for chunk in stream:
+            # Azure sends chunks without choices (content filter results)
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            for case in parser.feed(chunk.choices[0].delta.content):
+                yield self._format_test_case(case, index, project_id)
+                index += 1
+            if parser.done:
+                break
+    
+    def _create_test_generation_prompt(self, requirements: str, test_type: str, count: int,
+                                       shard: Optional[Shard] = None) -> str:
+        """Create a detailed prompt for AI test case generation (one shard's when shard is set)"""
+        
+        focus = ''
+        if shard:
+            focus = (f"\n- Cover only {shard.aspect} scenarios ({SHARD_ASPECTS[shard.aspect]}); "
+                     f"other batches cover the remaining aspects")
+        if shard and shard.priority:
+            focus += (f"\n- Write only {shard.aspect} test cases that deserve {shard.priority} priority; "
+                      f"other batches write the remaining priorities")
         return f"""
 Generate {count} comprehensive test cases for {test_type} testing based on these requirements:
 
@@ -246,7 +642,7 @@ Guidelines:
 - Ensure steps are clear and sequential
 - Focus on {test_type} testing aspects
 - Use realistic data and scenarios
-- Vary priority levels appropriately
+- Vary priority levels appropriately{focus}
 
 Return only valid JSON without any markdown formatting or additional text.
 """
@@ -268,27 +664,7 @@ Return only valid JSON without any markdown formatting or additional text.
             test_cases = ai_response.get('test_cases', [])
             
             # Convert to our format
-            formatted_cases = []
-            for i, case in enumerate(test_cases):
-                import uuid
-                from datetime import datetime, timezone
-                
-                formatted_case = {
-                    'id': str(uuid.uuid4()),
-                    'title': case.get('title', f'AI Generated Test Case {i+1}'),
-                    'description': case.get('description', ''),
-                    'steps': case.get('steps', []),
-                    'expected_result': case.get('expected_result', ''),
-                    'priority': case.get('priority', 'Medium'),
-                    'status': 'Draft',
-                    'project_id': project_id,
-                    'created_by': 'AI Generator (Azure OpenAI)',
-                    'created_at': datetime.now(timezone.utc).isoformat(),
-                    'tags': case.get('tags', ['ai-generated'])
-                }
-                formatted_cases.append(formatted_case)
-            
-            return formatted_cases
+            return [self._format_test_case(case, i, project_id) for i, case in enumerate(test_cases)]
             
         except json.JSONDecodeError as e:
             logger.error(f"❌ Failed to parse AI response as JSON: {e}")
@@ -299,6 +675,22 @@ Return only valid JSON without any markdown formatting or additional text.
             logger.error(f"❌ Error processing AI response: {e}")
             return self._generate_mock_test_cases("AI processing failed", project_id, "functional", 3)
     
+    def _format_test_case(self, case: Dict[str, Any], index: int, project_id: str) -> Dict[str, Any]:
+        """One parsed AI test case in our format"""
+        return {
+            'id': str(uuid.uuid4()),
+            'title': case.get('title', f'AI Generated Test Case {index+1}'),
+            'description': case.get('description', ''),
+            'steps': case.get('steps', []),
+            'expected_result': case.get('expected_result', ''),
+            'priority': case.get('priority', 'Medium'),
+            'status': 'Draft',
+            'project_id': project_id,
+            'created_by': MODEL_CREATED_BY,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'tags': case.get('tags', ['ai-generated'])
+        }
+    
     def _generate_mock_test_cases(self, requirements: str, project_id: str, 
                                 test_type: str, count: int) -> List[Dict[str, Any]]:
         """Fallback mock test case generation"""
@@ -470,6 +862,17 @@ Return only valid JSON without any markdown formatting or additional text.
                 'model': os.getenv('OPENAI_MODEL')
             }
         
+        # Hit rate and estimated tokens saved by the generation cache
+        try:
+            status['generation_cache'] = (self.generation_cache.stats() if self.generation_cache
+                                          else {'enabled': False})
+        except Exception as e:
+            status['generation_cache'] = {'enabled': True, 'error': str(e)}
+        try:
+            status['semantic_cache'] = self.semantic_index.stats() if self.semantic_index else {'enabled': False}
+        except Exception as e:
+            status['semantic_cache'] = {'enabled': True, 'error': str(e)}
+        
         return status
 
 # Global AI service instance
@@ -0,0 +1,233 @@
+"""
+Test Run Archive for TestGenie Enterprise
+Moves old test runs and their results out of the hot tables into compressed NDJSON segments
+
+Finished runs created more than ARCHIVE_AFTER_DAYS ago are written, with
+their results, to a segment file under ARCHIVE_DIR: one gzip member per run,
+so the segment is a plain .ndjson.gz (zcat reads it whole) and a single run
+is read back by seeking to its member. Each run leaves an archived_runs row
+with its outcome counts for trend reports.
+
+Runs are moved in batches of ARCHIVE_BATCH_SIZE: the batch is appended to
+the segment and fsynced, then one short transaction inserts the summaries,
+deletes the runs and results and updates stats_rollup and table versions.
+A crash in between leaves unreferenced bytes in the segment, never a run
+without a copy. The dashboard and reports count live runs only.
+
+Usage:
+    python archive.py run [--days 180] [--batch 200]   - Archive runs older than --days
+    python archive.py show <run_id>                    - Print an archived run
+"""
+
+import gzip
+import json
+import logging
+import os
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, insert, delete, func
+
+from models import (db, TestSuite, TestRun, TestResult, ArchivedRun, chunked, add_stat_deltas,
+                    apply_stat_deltas, bump_table_versions)
+from export import TEST_RUN_COLUMNS, test_run_records, iso
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_BATCH_SIZE = 200
+
+# Runs still executing are never archived, whatever their age
+ACTIVE_STATUSES = ('In Progress',)
+
+
+def archivable_runs(connection, cutoff, limit):
+    """The oldest finished runs created before cutoff, as row mappings"""
+    runs = TestRun.__table__
+    rows = connection.execute(
+        select(*[runs.c[name] for name in TEST_RUN_COLUMNS])
+        .where(runs.c.created_at < cutoff, runs.c.status.notin_(ACTIVE_STATUSES))
+        .order_by(runs.c.created_at, runs.c.id)
+        .limit(limit))
+    return [row._mapping for row in rows]
+
+
+def suite_projects(connection, suite_ids):
+    suites = TestSuite.__table__
+    projects = {}
+    for ids in chunked(sorted(suite_ids)):
+        projects.update(connection.execute(
+            select(suites.c.id, suites.c.project_id).where(suites.c.id.in_(ids))).all())
+    return projects
+
+
+def summary_row(record, project_id, segment, offset, length, now):
+    """archived_runs row for an archived run record"""
+    outcomes = Counter(result['outcome'] for result in record['results'])
+    durations = [result['duration_ms'] for result in record['results'] if result['duration_ms'] is not None]
+    row = {name: record[name] for name in TEST_RUN_COLUMNS}
+    for name in ('started_at', 'completed_at', 'created_at'):
+        row[name] = datetime.fromisoformat(row[name]) if row[name] else None
+    row.update(project_id=project_id, results_count=len(record['results']),
+               outcome_counts=json.dumps(dict(outcomes)), duration_ms=sum(durations) if durations else None,
+               segment=segment, offset=offset, length=length, archived_at=now)
+    return row
+
+
+def archive_batch(rows, directory, segment):
+    """Append one batch of runs to the segment and remove them from the hot tables"""
+    connection = db.session.connection()
+    projects = suite_projects(connection, {row['test_suite_id'] for row in rows})
+    records = next(test_run_records(iter([rows])))
+    run_ids = [record['id'] for record in records]
+    now = datetime.utcnow()
+
+    summaries = []
+    path = os.path.join(directory, segment)
+    with open(path, 'ab') as stream:
+        for record in records:
+            member = gzip.compress((json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8'))
+            offset = stream.tell()
+            stream.write(member)
+            summaries.append(summary_row(record, projects.get(record['test_suite_id']), segment,
+                                         offset, len(member), now))
+        stream.flush()
+        os.fsync(stream.fileno())
+
+    # test_run_records ended the read transaction; the write starts here
+    connection = db.session.connection()
+    deltas = {}
+    for record in records:
+        project_id = projects.get(record['test_suite_id'])
+        add_stat_deltas(deltas, TestRun, project_id, record.get, -1)
+        for outcome, count in Counter(result['outcome'] for result in record['results']).items():
+            add_stat_deltas(deltas, TestResult, project_id, {'outcome': outcome}.get, -count)
+
+    try:
+        connection.execute(insert(ArchivedRun.__table__), summaries)
+        for ids in chunked(run_ids):
+            connection.execute(delete(TestResult.__table__).where(TestResult.__table__.c.test_run_id.in_(ids)))
+            connection.execute(delete(TestRun.__table__).where(TestRun.__table__.c.id.in_(ids)))
+        apply_stat_deltas(connection, deltas)
+        bump_table_versions(connection, ['test_runs', 'test_results', 'archived_runs'])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(run_ids), sum(row['results_count'] for row in summaries)
+
+
+def archive_test_runs(directory, older_than_days, batch_size=ARCHIVE_BATCH_SIZE, progress=None):
+    """Archive every finished run older than older_than_days; returns a summary"""
+    os.makedirs(directory, exist_ok=True)
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    segment = f"test-runs-{datetime.utcnow().strftime('%Y%m%d-%H%M%S-%f')}.ndjson.gz"
+    summary = {'segment': None, 'cutoff': cutoff.isoformat(), 'runs': 0, 'results': 0}
+
+    while True:
+        rows = archivable_runs(db.session.connection(), cutoff, batch_size)
+        if not rows:
+            db.session.rollback()
+            break
+        runs, results = archive_batch(rows, directory, segment)
+        logger.info(f"🗄️ Archived {runs} test runs created before {cutoff.date()} to {segment}")
+        summary['segment'] = segment
+        summary['runs'] += runs
+        summary['results'] += results
+        if progress:
+            progress(summary)
+    return summary
+
+
+def read_archived_run(directory, archived):
+    """Load one archived run from its segment, shaped like TestRun.to_dict()"""
+    with open(os.path.join(directory, archived.segment), 'rb') as stream:
+        stream.seek(archived.offset)
+        record = json.loads(gzip.decompress(stream.read(archived.length)))
+
+    run = {name: record[name] for name in TEST_RUN_COLUMNS}
+    run['started_at'] = run['started_at'] or ''
+    run['completed_at'] = run['completed_at'] or ''
+    run['results'] = {result['test_case_id']: result['outcome'] for result in record['results']}
+    run['result_details'] = record['results']
+    run['project_id'] = archived.project_id
+    run['archived'] = True
+    run['archived_at'] = iso(archived.archived_at)
+    return run
+
+
+def run_trends(project_id=None, since=None):
+    """Runs and result outcomes per day (run creation date), live and archived combined"""
+    suites = TestSuite.__table__
+    runs = TestRun.__table__
+    results = TestResult.__table__
+    archived = ArchivedRun.__table__
+
+    days = {}
+
+    def day(value):
+        return days.setdefault(str(value)[:10], {'runs': 0, 'archived_runs': 0, 'outcomes': Counter()})
+
+    live_filters = []
+    archived_filters = []
+    if project_id:
+        live_filters.append(runs.c.test_suite_id.in_(select(suites.c.id).where(suites.c.project_id == project_id)))
+        archived_filters.append(archived.c.project_id == project_id)
+    if since:
+        live_filters.append(runs.c.created_at >= since)
+        archived_filters.append(archived.c.created_at >= since)
+
+    run_day = func.date(runs.c.created_at)
+    for value, count in db.session.execute(
+            select(run_day, func.count()).where(*live_filters).group_by(run_day)):
+        day(value)['runs'] += count
+    for value, outcome, count in db.session.execute(
+            select(run_day, results.c.outcome, func.count())
+            .select_from(results.join(runs, runs.c.id == results.c.test_run_id))
+            .where(*live_filters).group_by(run_day, results.c.outcome)):
+        day(value)['outcomes'][outcome] += count
+    for created_at, outcome_counts in db.session.execute(
+            select(archived.c.created_at, archived.c.outcome_counts).where(*archived_filters)):
+        entry = day(created_at)
+        entry['runs'] += 1
+        entry['archived_runs'] += 1
+        entry['outcomes'].update(json.loads(outcome_counts) if outcome_counts else {})
+
+    return [dict(date=date, runs=entry['runs'], archived_runs=entry['archived_runs'],
+                 outcomes=dict(entry['outcomes']))
+            for date, entry in sorted(days.items()) if date != 'None']
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    from azure_config import get_config
+
+    config = get_config()
+    parser = argparse.ArgumentParser(description='Archive old test runs to compressed NDJSON segments')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help='archive finished runs older than --days')
+    run_parser.add_argument('--days', type=int, default=config.ARCHIVE_AFTER_DAYS)
+    run_parser.add_argument('--batch', type=int, default=ARCHIVE_BATCH_SIZE, help='runs per transaction')
+    show_parser = commands.add_parser('show', help='print an archived run as JSON')
+    show_parser.add_argument('run_id')
+    args = parser.parse_args()
+
+    from enterprise_test_platform_sqlite import app
+
+    with app.app_context():
+        if args.command == 'run':
+            print(f"🗄️ Archiving test runs older than {args.days} days to {config.ARCHIVE_DIR}")
+            summary = archive_test_runs(
+                config.ARCHIVE_DIR, args.days, args.batch,
+                lambda s: print(f"   📦 {s['runs']} runs, {s['results']} results", flush=True))
+            if summary['runs']:
+                print(f"✅ Archived {summary['runs']} runs and {summary['results']} results "
+                      f"to {summary['segment']}")
+            else:
+                print("✅ Nothing to archive")
+        else:
+            archived = db.session.get(ArchivedRun, args.run_id)
+            if archived is None:
+                sys.exit(f"❌ No archived test run {args.run_id}")
+            print(json.dumps(read_archived_run(config.ARCHIVE_DIR, archived), indent=2))
@@ -27,6 +27,9 @@ class Config:
         'pool_recycle': 300,
     }
     
+    # SQLite storage profile (see storage.py): production or baseline
+    SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE', 'production')
+    
     # AI Service Configuration
     AZURE_OPENAI_API_KEY = os.environ.get('AZURE_OPENAI_API_KEY')
     AZURE_OPENAI_ENDPOINT = os.environ.get('AZURE_OPENAI_ENDPOINT')
@@ -35,7 +38,24 @@ class Config:
     # Application Configuration
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file upload
     UPLOAD_FOLDER = 'uploads'
-    
+
+    # Test run archive (see archive.py): segment directory and age cut-off
+    ARCHIVE_DIR = os.environ.get('ARCHIVE_DIR', os.path.join('data', 'archive'))
+    ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 180))
+
+    # AI generation jobs (see ai_jobs.py): worker threads per web process, poll interval, retry lease
+    AI_JOB_WORKERS = int(os.environ.get('AI_JOB_WORKERS', 2))
+    AI_JOB_POLL_SECONDS = float(os.environ.get('AI_JOB_POLL_SECONDS', 2))
+    AI_JOB_LEASE_SECONDS = int(os.environ.get('AI_JOB_LEASE_SECONDS', 300))
+    # Most test cases one AI generation may ask for; large counts run as parallel shards (AI_SHARD_* in ai_service.py)
+    AI_GENERATE_MAX_COUNT = int(os.environ.get('AI_GENERATE_MAX_COUNT', 200))
+
+    # Response compression (see compression.py): gzip, and br when brotli is installed
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 5))
+
     # Security Configuration
     SESSION_COOKIE_SECURE = True
     SESSION_COOKIE_HTTPONLY = True
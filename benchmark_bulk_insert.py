@@ -0,0 +1,80 @@
+"""
+Bulk Insert Benchmark for TestGenie Enterprise
+Compares one POST /api/test-cases per case with POST /api/test-cases/bulk
+
+Both paths run through the Flask test client against a scratch SQLite file
+with the production storage profile, so timings include request parsing,
+validation, the FTS triggers, the tag index and the stats rollup.
+
+Usage:
+    python benchmark_bulk_insert.py [--rows 10000] [--single 500]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+
+def make_items(project_id, count, offset=0):
+    priorities = ['Low', 'Medium', 'High']
+    return [{
+        'title': f'Bulk benchmark case {offset + i}',
+        'description': 'Verify the checkout flow with a saved payment method',
+        'steps': ['Open the cart', 'Choose the saved card', 'Place the order'],
+        'expected_result': 'Order confirmation is shown',
+        'priority': priorities[i % 3],
+        'tags': ['benchmark', f'area-{i % 20}'],
+        'project_id': project_id
+    } for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk test case insert benchmark')
+    parser.add_argument('--rows', type=int, default=10000, help='test cases in the bulk request')
+    parser.add_argument('--single', type=int, default=500, help='test cases posted one by one')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='testgenie-bulk-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+    os.environ['CACHE_BACKEND'] = 'none'
+
+    try:
+        from enterprise_test_platform_sqlite import app
+        from models import db
+        import stats_rollup
+
+        client = app.test_client()
+        project_id = client.post('/api/projects', json={'name': 'Bulk benchmark',
+                                                         'description': ''}).get_json()['id']
+
+        print("⚡ TestGenie Bulk Insert Benchmark")
+        print("=" * 60)
+
+        started = time.perf_counter()
+        for item in make_items(project_id, args.single):
+            client.post('/api/test-cases', json=item)
+        single = time.perf_counter() - started
+        print(f"📝 {args.single} single POSTs:  {single:.2f}s "
+              f"({args.single / single:.0f} cases/s)")
+
+        items = make_items(project_id, args.rows, offset=args.single)
+        started = time.perf_counter()
+        response = client.post('/api/test-cases/bulk', json={'items': items})
+        bulk = time.perf_counter() - started
+        result = response.get_json()
+        print(f"📦 1 bulk POST of {args.rows}: {bulk:.2f}s "
+              f"({result['succeeded'] / bulk:.0f} cases/s, {result['failed']} failed)")
+        print(f"🚀 Speedup: {(result['succeeded'] / bulk) / (args.single / single):.1f}x per case")
+
+        with app.app_context():
+            mismatches = stats_rollup.verify(db.session.connection())
+        print(f"{'✅' if not mismatches else '❌'} stats_rollup matches live counts "
+              f"({len(mismatches)} mismatches)")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
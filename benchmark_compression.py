@@ -0,0 +1,84 @@
+"""
+Compression Benchmark for TestGenie Enterprise
+Bytes and latency saved by response compression on typical payloads
+
+Test cases are inserted into a scratch SQLite file, then each payload (a
+500-item test case page, the project list, the test cases HTML page and an
+NDJSON export) is fetched through the app with and without Accept-Encoding.
+Latency saved is the transfer time of the bytes saved at --mbps minus the
+time spent compressing, so it is an estimate for remote clients, not a
+measurement of a real network.
+
+Usage:
+    python benchmark_compression.py [--rows 5000] [--mbps 10 50] [--levels 1 6 9] [--repeat 3]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmark_serialization import make_items, best_of
+
+PAYLOADS = [
+    ('test case page (500, fields=all)', '/api/test-cases?limit=500&fields=all'),
+    ('test case page (500, default)', '/api/test-cases?limit=500'),
+    ('project list', '/api/projects?limit=500'),
+    ('test_cases.html', '/test-cases'),
+    ('NDJSON export (streamed)', '/api/export/test-cases?format=ndjson'),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Response compression benchmark')
+    parser.add_argument('--rows', type=int, default=5000, help='test cases in the scratch database')
+    parser.add_argument('--mbps', type=float, nargs='+', default=[10, 50], help='client bandwidths, Mbit/s')
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 6, 9], help='gzip levels to compare')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement (best is reported)')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='testgenie-compression-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+    os.environ['CACHE_BACKEND'] = 'none'
+
+    try:
+        from enterprise_test_platform_sqlite import app, compression
+        from compression import codings
+        from models import db, Project
+        from bulk import bulk_create_test_cases
+
+        with app.app_context():
+            for index in range(20):
+                project = Project(name=f'Compression benchmark {index}', description='Benchmark project ' * 10)
+                db.session.add(project)
+            db.session.commit()
+            bulk_create_test_cases(make_items(project.id, args.rows))
+
+        client = app.test_client()
+
+        def fetch(url, headers):
+            return client.get(url, headers=headers).get_data()
+
+        print("🗜️ TestGenie Compression Benchmark")
+        print(f"   codings: {', '.join(codings())}   rows: {args.rows}   "
+              f"bandwidth: {', '.join(f'{mbps:g}' for mbps in args.mbps)} Mbit/s")
+        print("=" * 100)
+        for label, url in PAYLOADS:
+            plain_time, plain = best_of(args.repeat, lambda: fetch(url, {}))
+            print(f"📄 {label}: {len(plain) / 1024:,.1f} KB in {plain_time * 1000:.0f} ms uncompressed")
+            for level in args.levels:
+                compression.level = level
+                gzip_time, body = best_of(args.repeat, lambda: fetch(url, {'Accept-Encoding': 'gzip'}))
+                overhead = gzip_time - plain_time
+                saved = [(len(plain) - len(body)) * 8 / (mbps * 1_000_000) - overhead for mbps in args.mbps]
+                print(f"   gzip {level}: {len(body) / 1024:8,.1f} KB ({len(body) / len(plain):5.1%})  "
+                      f"+{overhead * 1000:5.1f} ms CPU  saved "
+                      + '  '.join(f'{seconds * 1000:7.0f} ms @ {mbps:g} Mbit/s'
+                                  for seconds, mbps in zip(saved, args.mbps)))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Serialization Benchmark for TestGenie Enterprise
+Compares ORM objects + to_dict() + jsonify with Core rows + spliced JSON (serialize.py)
+
+Test cases are inserted into a scratch SQLite file, then each path reads
+and encodes the newest N rows in one go (the list APIs cap pages at 500;
+larger N makes the per-row cost visible). Both outputs are checked to
+decode to the same items.
+
+Usage:
+    python benchmark_serialization.py [--rows 10000 100000] [--repeat 3]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+
+def make_items(project_id, count):
+    priorities = ['Low', 'Medium', 'High']
+    return [{
+        'title': f'Serialization benchmark case {i}',
+        'description': 'Verify that a registered user can reset the password from the login page',
+        'steps': ['Open the login page', 'Click "Forgot password"', 'Enter the account e-mail',
+                  'Follow the link in the reset e-mail', 'Set a new password'],
+        'expected_result': 'The user can log in with the new password',
+        'priority': priorities[i % 3],
+        'tags': ['benchmark', f'area-{i % 20}', 'regression'],
+        'project_id': project_id
+    } for i in range(count)]
+
+
+def best_of(repeat, func):
+    """Fastest of repeat runs as (seconds, result)"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        if best is None or elapsed < best[0]:
+            best = (elapsed, result)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='List serialization benchmark')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000], help='rows per page read')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement (best is reported)')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='testgenie-serialize-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+    os.environ['CACHE_BACKEND'] = 'none'
+
+    try:
+        from flask import jsonify
+        from enterprise_test_platform_sqlite import app
+        from models import db, Project, TestCase
+        from bulk import bulk_create_test_cases
+        from queries import keyset
+        import serialize
+
+        with app.test_request_context():
+            project = Project(name='Serialization benchmark', description='')
+            db.session.add(project)
+            db.session.commit()
+            bulk_create_test_cases(make_items(project.id, max(args.rows)))
+
+            def orm_path(count):
+                db.session.expunge_all()
+                rows = keyset(TestCase.query, TestCase, {}).limit(count).all()
+                return jsonify({'items': [row.to_dict() for row in rows], 'next_cursor': None}).get_data()
+
+            def core_path(count):
+                query = TestCase.query.with_entities(*serialize.columns(TestCase, serialize.TEST_CASE_FIELDS))
+                rows = keyset(query, TestCase, {}).limit(count).all()
+                encode = serialize.item_encoder(serialize.TEST_CASE_FIELDS)
+                return serialize.encode_page([encode(row) for row in rows], None)
+
+            print("⚡ TestGenie Serialization Benchmark")
+            print(f"   encoder: {'orjson' if serialize.orjson else 'json (orjson not installed)'}")
+            print("=" * 60)
+            for count in args.rows:
+                orm_time, orm_body = best_of(args.repeat, lambda: orm_path(count))
+                core_time, core_body = best_of(args.repeat, lambda: core_path(count))
+                same = json.loads(orm_body) == json.loads(core_body)
+                print(f"📄 {count:>7} rows  to_dict + jsonify: {orm_time:6.2f}s   "
+                      f"Core rows + splice: {core_time:6.2f}s   "
+                      f"{orm_time / core_time:4.1f}x  {'✅ same output' if same else '❌ output differs'}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+SQLite Concurrency Benchmark for TestGenie Enterprise
+Compares read/write throughput of the storage profiles in storage.py with
+several worker processes hitting one database file, like gunicorn workers
+
+Each worker runs a mix of list-page reads and ORM test case inserts (which
+also maintain the tag index, stats rollup and table versions) for a fixed
+time against a fresh copy of the same seeded database.
+
+Usage:
+    python benchmark_sqlite_concurrency.py [--workers 4] [--duration 5]
+                                           [--write-ratio 0.2] [--rows 2000]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+
+
+def seed_database(path, rows):
+    """Create a database file with one project and `rows` test cases"""
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    os.environ['SQLITE_PROFILE'] = 'baseline'     # Template stays in rollback-journal mode
+    os.environ.setdefault('CACHE_BACKEND', 'none')
+
+    from enterprise_test_platform_sqlite import app
+    from models import db, Project, TestCase
+
+    with app.app_context():
+        project = Project(name='Benchmark', description='')
+        db.session.add(project)
+        db.session.flush()
+        for i in range(rows):
+            db.session.add(TestCase(
+                title=f'Seed case {i}', description='', project_id=project.id,
+                steps='[]', tags='["seed"]', priority=random.choice(['Low', 'Medium', 'High'])
+            ))
+        db.session.commit()
+        project_id = project.id
+        db.engine.dispose()
+    return project_id
+
+
+def worker(path, profile, project_id, duration, write_ratio, seed, results):
+    """Run reads and writes until the deadline; report counts and latencies"""
+    from sqlalchemy import create_engine, select
+    from sqlalchemy.exc import OperationalError
+    from sqlalchemy.orm import Session
+
+    from models import TestCase, StatsRollup
+    from storage import engine_options, apply_storage_profile
+
+    uri = f'sqlite:///{path}'
+    engine = create_engine(uri, **engine_options(uri, profile=profile))
+    apply_storage_profile(engine, profile)
+    rng = random.Random(seed)
+
+    stats = {'reads': 0, 'writes': 0, 'errors': 0, 'read_time': 0.0, 'write_time': 0.0}
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        started = time.monotonic()
+        is_write = rng.random() < write_ratio
+        try:
+            with Session(engine) as session:
+                if is_write:
+                    session.add(TestCase(
+                        title=f'Benchmark case {rng.random()}', description='', project_id=project_id,
+                        steps='["open", "check"]', tags='["benchmark"]'
+                    ))
+                    session.commit()
+                else:
+                    session.execute(
+                        select(TestCase).where(TestCase.project_id == project_id)
+                        .order_by(TestCase.created_at.desc(), TestCase.id.desc()).limit(50)
+                    ).scalars().all()
+                    session.execute(select(StatsRollup).where(StatsRollup.project_id == '')).all()
+        except OperationalError:
+            # "database is locked" after the busy timeout ran out
+            stats['errors'] += 1
+            continue
+        elapsed = time.monotonic() - started
+        if is_write:
+            stats['writes'] += 1
+            stats['write_time'] += elapsed
+        else:
+            stats['reads'] += 1
+            stats['read_time'] += elapsed
+
+    engine.dispose()
+    results.put(stats)
+
+
+def run_profile(template, profile, project_id, workers, duration, write_ratio):
+    """Benchmark one profile on a fresh copy of the template database"""
+    directory = tempfile.mkdtemp(prefix=f'testgenie-bench-{profile}-')
+    path = os.path.join(directory, 'bench.db')
+    shutil.copy(template, path)
+
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(path, profile, project_id, duration, write_ratio, n, results))
+        for n in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    totals = {'reads': 0, 'writes': 0, 'errors': 0, 'read_time': 0.0, 'write_time': 0.0}
+    for _ in processes:
+        for key, value in results.get().items():
+            totals[key] += value
+    for process in processes:
+        process.join()
+
+    shutil.rmtree(directory, ignore_errors=True)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SQLite storage profile concurrency benchmark')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--rows', type=int, default=2000)
+    args = parser.parse_args()
+
+    print("⚡ TestGenie SQLite Concurrency Benchmark")
+    print("=" * 60)
+    print(f"{args.workers} workers, {args.duration}s per profile, "
+          f"{args.write_ratio:.0%} writes, {args.rows} seeded test cases")
+
+    template_dir = tempfile.mkdtemp(prefix='testgenie-bench-')
+    template = os.path.join(template_dir, 'template.db')
+    try:
+        project_id = seed_database(template, args.rows)
+
+        print()
+        print(f"{'profile':<12}{'reads/s':>10}{'writes/s':>10}{'read ms':>10}{'write ms':>10}{'locked':>8}")
+        for profile in ('baseline', 'production'):
+            totals = run_profile(template, profile, project_id,
+                                 args.workers, args.duration, args.write_ratio)
+            read_ms = 1000 * totals['read_time'] / totals['reads'] if totals['reads'] else 0
+            write_ms = 1000 * totals['write_time'] / totals['writes'] if totals['writes'] else 0
+            print(f"{profile:<12}{totals['reads'] / args.duration:>10.0f}"
+                  f"{totals['writes'] / args.duration:>10.0f}"
+                  f"{read_ms:>10.2f}{write_ms:>10.2f}{totals['errors']:>8}")
+    finally:
+        shutil.rmtree(template_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
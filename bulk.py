@@ -0,0 +1,431 @@
+"""
+Bulk Test Case Operations for TestGenie Enterprise
+Create, update and delete thousands of test cases in one request
+
+Item lists: items are validated first (projects are looked up once per distinct ID), then
+written in chunks of executemany Core statements, one transaction per chunk.
+Core statements bypass the ORM flush hooks, so every chunk maintains the tag
+index, stats_rollup and table versions itself (see models.py).
+
+An invalid item is reported in `errors` with its index and never aborts the
+batch. If a chunk's transaction fails, all of its items are reported and the
+other chunks still commit.
+
+Filter-based updates: a status/priority change or tag additions/removals are
+applied to every test case matching the /api/test-cases filters with
+set-based UPDATE statements in one transaction, without loading any rows.
+"""
+
+import json
+import logging
+import uuid
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import select, insert, update, delete, bindparam, func, case, and_, or_, exists, literal, true, false
+
+from models import (db, Project, TestCase, TestSuiteCase, Tag, test_case_tags, chunked, tag_ids_by_name,
+                    sync_tag_index, add_stat_deltas, apply_stat_deltas, bump_table_versions, deleting_project_ids)
+
+logger = logging.getLogger(__name__)
+
+BULK_CHUNK_SIZE = 1000
+BULK_MAX_ITEMS = 50000
+
+# Fields a bulk patch may change (the same set PUT /api/test-cases/<id> accepts)
+PATCH_FIELDS = ('title', 'description', 'expected_result', 'priority', 'status', 'steps', 'tags')
+
+# Fields a filter-based update may set
+TRANSITION_FIELDS = ('status', 'priority')
+
+
+def encode_list(value):
+    """Store a steps/tags value the way TestCase.set_steps/set_tags do"""
+    return json.dumps(value) if isinstance(value, list) else str(value)
+
+
+def stored_list(text):
+    """Read a stored steps/tags value back the way TestCase.get_tags does"""
+    if not text:
+        return []
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return [text]
+
+
+def new_result():
+    return {'processed': 0, 'succeeded': 0, 'failed': 0, 'ids': [], 'errors': []}
+
+
+def finish(result, total):
+    result['processed'] = total
+    result['failed'] = len(result['errors'])
+    result['succeeded'] = len(result['ids'])
+    result['errors'].sort(key=lambda error: error['index'])
+    return result
+
+
+def existing_ids(connection, column, ids, *criteria):
+    """Subset of ids present in a primary key column, looked up in IN (...) chunks"""
+    found = set()
+    for chunk in chunked(sorted(ids)):
+        found.update(connection.execute(select(column).where(column.in_(chunk), *criteria)).scalars())
+    return found
+
+
+def case_rows(connection, ids):
+    """Current id/project/status/priority of test cases as {id: row mapping}"""
+    table = TestCase.__table__
+    rows = {}
+    for chunk in chunked(ids):
+        for row in connection.execute(
+                select(table.c.id, table.c.project_id, table.c.status, table.c.priority)
+                .where(table.c.id.in_(chunk), table.c.project_id.notin_(deleting_project_ids()))).mappings():
+            rows[row['id']] = row
+    return rows
+
+
+def grouped_stat_deltas(rows, sign):
+    """stats_rollup deltas for many test case rows, counted per (project, status, priority)"""
+    groups = Counter((row['project_id'], row['status'], row['priority']) for row in rows)
+    deltas = {}
+    for (project_id, status, priority), count in groups.items():
+        values = {'status': status, 'priority': priority}
+        add_stat_deltas(deltas, TestCase, project_id, values.get, sign * count)
+    return deltas
+
+
+def run_chunks(items, chunk_size, write, result):
+    """Write (index, item) pairs chunk by chunk, one transaction each
+
+    write(connection, chunk, result) returns the IDs it wrote and may report
+    per-item errors; if it raises, those are replaced by one error per item.
+    """
+    for start in range(0, len(items), chunk_size):
+        chunk = items[start:start + chunk_size]
+        reported = len(result['errors'])
+        try:
+            ids = write(db.session.connection(), chunk, result)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"❌ Bulk chunk of {len(chunk)} items failed: {e}")
+            del result['errors'][reported:]
+            result['errors'].extend({'index': index, 'error': f'Batch write failed: {e}'}
+                                    for index, _ in chunk)
+            continue
+        result['ids'].extend(ids)
+
+
+def bulk_create_test_cases(items, chunk_size=BULK_CHUNK_SIZE):
+    """Insert test cases from POST-style dicts; returns a summary with new IDs in item order"""
+    result = new_result()
+    now = datetime.utcnow()
+    rows = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            error = 'Item must be an object'
+        elif not isinstance(item.get('title'), str) or not item['title'].strip():
+            error = 'Test case title is required'
+        elif not item.get('project_id'):
+            error = 'Project ID is required'
+        else:
+            error = None
+        if error:
+            result['errors'].append({'index': index, 'error': error})
+            continue
+        rows.append((index, {
+            'id': str(uuid.uuid4()),
+            'title': item['title'].strip(),
+            'description': item.get('description', ''),
+            'expected_result': item.get('expected_result', ''),
+            'priority': item.get('priority', 'Medium'),
+            'status': item.get('status', 'Draft'),
+            'steps': encode_list(item['steps']) if item.get('steps') else None,
+            'tags': encode_list(item['tags']) if item.get('tags') else None,
+            'project_id': str(item['project_id']),
+            'created_by': item.get('created_by', 'system'),
+            'created_at': now,
+            'updated_at': now
+        }))
+
+    # One lookup per distinct project rather than one per item
+    projects = existing_ids(db.session.connection(), Project.__table__.c.id,
+                            {row['project_id'] for _, row in rows}, Project.__table__.c.deleting == false())
+    valid = []
+    for index, row in rows:
+        if row['project_id'] in projects:
+            valid.append((index, row))
+        else:
+            result['errors'].append({'index': index, 'error': 'Project not found'})
+
+    def write(connection, chunk, result):
+        values = [row for _, row in chunk]
+        connection.execute(insert(TestCase.__table__), values)
+        sync_tag_index(connection, [
+            (row['id'], row['project_id'], Tag.normalize(stored_list(row['tags']))) for row in values])
+        apply_stat_deltas(connection, grouped_stat_deltas(values, 1))
+        bump_table_versions(connection, ['test_cases'])
+        return [row['id'] for row in values]
+
+    run_chunks(valid, chunk_size, write, result)
+    return finish(result, len(items))
+
+
+def bulk_update_test_cases(items, chunk_size=BULK_CHUNK_SIZE):
+    """Apply PUT-style partial updates ({'id': ..., field: value}) to many test cases"""
+    result = new_result()
+    patches = []
+    seen = set()
+    for index, item in enumerate(items):
+        fields = {name: item[name] for name in PATCH_FIELDS if name in item} if isinstance(item, dict) else {}
+        if not isinstance(item, dict) or not isinstance(item.get('id'), str):
+            error = 'Item must be an object with a test case id'
+        elif item['id'] in seen:
+            error = 'Duplicate test case id in batch'
+        elif not fields:
+            error = f"No updatable fields (expected any of: {', '.join(PATCH_FIELDS)})"
+        elif 'title' in fields and (not isinstance(fields['title'], str) or not fields['title'].strip()):
+            error = 'Test case title is required'
+        else:
+            error = None
+        if error:
+            result['errors'].append({'index': index, 'error': error})
+            continue
+        seen.add(item['id'])
+        if 'title' in fields:
+            fields['title'] = fields['title'].strip()
+        for name in ('steps', 'tags'):
+            if name in fields:
+                fields[name] = encode_list(fields[name])
+        patches.append((index, (item['id'], fields)))
+
+    table = TestCase.__table__
+
+    def write(connection, chunk, result):
+        current = case_rows(connection, [case_id for _, (case_id, _) in chunk])
+        now = datetime.utcnow()
+        groups = {}
+        deltas = {}
+        retagged = []
+        written = []
+        for index, (case_id, fields) in chunk:
+            old = current.get(case_id)
+            if old is None:
+                result['errors'].append({'index': index, 'id': case_id, 'error': 'Test case not found'})
+                continue
+            params = {f'b_{name}': value for name, value in fields.items()}
+            params['b_id'] = case_id
+            params['b_updated_at'] = now
+            groups.setdefault(tuple(sorted(fields)), []).append(params)
+            if 'status' in fields or 'priority' in fields:
+                new = {**old, **fields}
+                add_stat_deltas(deltas, TestCase, old['project_id'], old.get, -1)
+                add_stat_deltas(deltas, TestCase, old['project_id'], new.get, 1)
+            if 'tags' in fields:
+                retagged.append((case_id, old['project_id'], Tag.normalize(stored_list(fields['tags']))))
+            written.append(case_id)
+
+        # One executemany per distinct set of patched fields
+        for names, params in groups.items():
+            values = {name: bindparam(f'b_{name}') for name in names + ('updated_at',)}
+            connection.execute(update(table).where(table.c.id == bindparam('b_id')).values(values), params)
+        sync_tag_index(connection, retagged)
+        apply_stat_deltas(connection, deltas)
+        if written:
+            bump_table_versions(connection, ['test_cases'])
+        return written
+
+    run_chunks(patches, chunk_size, write, result)
+    return finish(result, len(items))
+
+
+def bulk_delete_test_cases(ids, chunk_size=BULK_CHUNK_SIZE):
+    """Delete many test cases with their tag links and suite memberships"""
+    result = new_result()
+    targets = []
+    seen = set()
+    for index, case_id in enumerate(ids):
+        if not isinstance(case_id, str) or not case_id:
+            result['errors'].append({'index': index, 'error': 'Test case id must be a string'})
+        elif case_id not in seen:
+            seen.add(case_id)
+            targets.append((index, case_id))
+
+    table = TestCase.__table__
+    members = TestSuiteCase.__table__
+
+    def write(connection, chunk, result):
+        current = case_rows(connection, [case_id for _, case_id in chunk])
+        for index, case_id in chunk:
+            if case_id not in current:
+                result['errors'].append({'index': index, 'id': case_id, 'error': 'Test case not found'})
+        found = [case_id for _, case_id in chunk if case_id in current]
+        if not found:
+            return []
+
+        # Links first: foreign keys are enforced on SQLite and PostgreSQL
+        changed = ['test_cases']
+        for ids_chunk in chunked(found):
+            connection.execute(delete(test_case_tags).where(test_case_tags.c.test_case_id.in_(ids_chunk)))
+            if connection.execute(delete(members).where(members.c.test_case_id.in_(ids_chunk))).rowcount:
+                changed.append('test_suite_cases')
+            connection.execute(delete(table).where(table.c.id.in_(ids_chunk)))
+        apply_stat_deltas(connection, grouped_stat_deltas(current.values(), -1))
+        bump_table_versions(connection, changed)
+        return found
+
+    run_chunks(targets, chunk_size, write, result)
+    return finish(result, len(ids))
+
+
+def parse_transition(data):
+    """Validate a filter-based update body into (fields, add_tags, remove_tags)
+
+    Either {"set": {"status": ..., "priority": ...}} or {"add_tags": [...],
+    "remove_tags": [...]}. Raises ValueError for anything else.
+    """
+    fields = data.get('set') or {}
+    add_tags = data.get('add_tags') or []
+    remove_tags = data.get('remove_tags') or []
+
+    if not isinstance(fields, dict):
+        raise ValueError('set must be an object')
+    unknown = sorted(set(fields) - set(TRANSITION_FIELDS))
+    if unknown:
+        raise ValueError(f"Cannot set {', '.join(unknown)} (supported: {', '.join(TRANSITION_FIELDS)})")
+    for name, value in fields.items():
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError(f'{name} must be a non-empty string')
+    if not isinstance(add_tags, list) or not isinstance(remove_tags, list):
+        raise ValueError('add_tags and remove_tags must be lists')
+
+    add_tags, remove_tags = Tag.normalize(add_tags), Tag.normalize(remove_tags)
+    if set(add_tags) & set(remove_tags):
+        raise ValueError('A tag cannot be both added and removed')
+    if fields and (add_tags or remove_tags):
+        raise ValueError('Change fields or tags in one request, not both')
+    if not fields and not add_tags and not remove_tags:
+        raise ValueError('Nothing to change: give set, add_tags or remove_tags')
+    return {name: value.strip() for name, value in fields.items()}, add_tags, remove_tags
+
+
+def has_tag(tag_id):
+    """Correlated EXISTS: the outer test case carries the tag"""
+    return exists().where(test_case_tags.c.test_case_id == TestCase.__table__.c.id,
+                          test_case_tags.c.tag_id == tag_id)
+
+
+def tags_with_added(connection, tags, name):
+    """SQL for a tags JSON text column with one name appended"""
+    if connection.dialect.name == 'postgresql':
+        from sqlalchemy import Text, cast
+        from sqlalchemy.dialects.postgresql import JSONB
+        return case(
+            (func.coalesce(tags, '') == '', cast(func.jsonb_build_array(name), Text)),
+            (func.ltrim(tags).like('[%'), cast(cast(tags, JSONB).op('||')(func.jsonb_build_array(name)), Text)),
+            else_=cast(func.jsonb_build_array(tags, name), Text)
+        )
+    # Plain-text tags read as a one-element list (see TestCase.get_tags)
+    return case(
+        (func.coalesce(tags, '') == '', func.json_array(name)),
+        (and_(func.json_valid(tags), func.substr(func.ltrim(tags), 1, 1) == '['),
+         func.json_insert(tags, '$[#]', name)),
+        else_=func.json_array(tags, name)
+    )
+
+
+def tags_without(connection, tags, names):
+    """SQL for a tags JSON text column with the names removed, order kept"""
+    if connection.dialect.name == 'postgresql':
+        from sqlalchemy import Text, cast
+        from sqlalchemy.dialects.postgresql import JSONB, aggregate_order_by
+        elements = func.jsonb_array_elements_text(cast(tags, JSONB)).table_valued(
+            'value', with_ordinality='position')
+        kept = (
+            select(func.coalesce(func.jsonb_agg(aggregate_order_by(elements.c.value, elements.c.position)),
+                                 cast(literal('[]'), JSONB)))
+            .where(func.btrim(elements.c.value).not_in(names))
+            .scalar_subquery()
+        )
+        return case((func.ltrim(tags).like('[%'), cast(kept, Text)), else_='[]')
+    elements = func.json_each(tags).table_valued('value')
+    kept = (
+        select(func.json_group_array(elements.c.value))
+        .where(func.trim(elements.c.value).not_in(names))
+        .scalar_subquery()
+    )
+    # A plain-text tags value is the single (removed) tag itself
+    return case((and_(func.json_valid(tags), func.substr(func.ltrim(tags), 1, 1) == '['), kept), else_='[]')
+
+
+def update_matching_test_cases(query, fields=None, add_tags=(), remove_tags=(), dry_run=False):
+    """Apply a change to every test case a filtered TestCase query matches
+
+    Rows already in the target state are not rewritten. Returns
+    {'matched': rows matching the filters, 'affected': rows changed (or that
+    would change with dry_run), 'dry_run': bool}.
+    """
+    connection = db.session.connection()
+    cases = TestCase.__table__
+    # Executed on the connection, so projects being deleted are excluded here
+    matching = (query.with_entities(TestCase.id).filter(cases.c.project_id.notin_(deleting_project_ids()))
+                .statement.correlate(None))
+    in_scope = cases.c.id.in_(matching)
+
+    tag_ids = tag_ids_by_name(connection, list(add_tags) + list(remove_tags))
+    if fields:
+        changes = or_(*[cases.c[name].is_distinct_from(value) for name, value in fields.items()])
+    else:
+        # A tag not in the dictionary yet is missing from every test case
+        changes = or_(false(),
+                      *[~has_tag(tag_ids[name]) if name in tag_ids else true() for name in add_tags],
+                      *[has_tag(tag_ids[name]) for name in remove_tags if name in tag_ids])
+
+    result = {
+        'matched': connection.execute(select(func.count()).select_from(matching.subquery())).scalar(),
+        'affected': connection.execute(
+            select(func.count()).select_from(cases).where(in_scope, changes)).scalar(),
+        'dry_run': dry_run
+    }
+    if dry_run or not result['affected']:
+        return result
+
+    now = datetime.utcnow()
+    try:
+        if fields:
+            # Move the affected counts between rollup buckets, then one UPDATE
+            deltas = {}
+            for project_id, status, priority, count in connection.execute(
+                    select(cases.c.project_id, cases.c.status, cases.c.priority, func.count())
+                    .where(in_scope, changes)
+                    .group_by(cases.c.project_id, cases.c.status, cases.c.priority)):
+                old = {'status': status, 'priority': priority}
+                add_stat_deltas(deltas, TestCase, project_id, old.get, -count)
+                add_stat_deltas(deltas, TestCase, project_id, {**old, **fields}.get, count)
+            connection.execute(update(cases).where(in_scope, changes).values(**fields, updated_at=now))
+            apply_stat_deltas(connection, deltas)
+        else:
+            # Additions first: they never take a case out of a tag filter
+            tag_ids.update(tag_ids_by_name(connection, add_tags, create=True))
+            for name in add_tags:
+                missing = and_(in_scope, ~has_tag(tag_ids[name]))
+                connection.execute(update(cases).where(missing).values(
+                    tags=tags_with_added(connection, cases.c.tags, name), updated_at=now))
+                connection.execute(test_case_tags.insert().from_select(
+                    ['test_case_id', 'tag_id', 'project_id'],
+                    select(cases.c.id, literal(tag_ids[name]), cases.c.project_id).where(missing)))
+            removed = [tag_ids[name] for name in remove_tags if name in tag_ids]
+            if removed:
+                carrying = and_(in_scope, or_(*[has_tag(tag_id) for tag_id in removed]))
+                connection.execute(update(cases).where(carrying).values(
+                    tags=tags_without(connection, cases.c.tags, list(remove_tags)), updated_at=now))
+                connection.execute(delete(test_case_tags).where(
+                    test_case_tags.c.tag_id.in_(removed), test_case_tags.c.test_case_id.in_(matching)))
+        bump_table_versions(connection, ['test_cases'])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return result
@@ -0,0 +1,274 @@
+"""
+Response Cache for TestGenie Enterprise
+Read-through cache for GET APIs with write-driven invalidation
+
+Entries are keyed by the request path, the normalized query parameters and
+the current versions of the tables the endpoint reads (see TableVersion in
+models.py). Every committed write bumps its table's version, so stale
+entries are never served; they simply age out of the backend.
+
+The same key gives each response a strong ETag. A GET whose If-None-Match
+matches is answered 304 after reading only the table versions - before the
+view runs and whatever the backend - so polling clients re-download a list
+only when one of its tables changed. Tags of gzip/br copies made by
+compression.py match as well.
+
+Backends (CACHE_BACKEND):
+    memory  - In-process LRU with TTL (default)
+    redis   - Shared Redis, configured by RedisSettings in app/core/config.py
+    none    - Caching disabled
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import request, Response
+
+from compression import CONTENT_CODINGS, encoded_etag
+from models import TableVersion
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 300
+DEFAULT_MAX_ENTRIES = 1024
+
+# Part of every ETag; bump when response shapes change so clients refetch
+ETAG_FORMAT = '1'
+
+
+class MemoryCache:
+    """Thread-safe in-process LRU cache with per-entry TTL"""
+
+    name = 'memory'
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl_seconds=None):
+        expires_at = time.monotonic() + (ttl_seconds or self.ttl_seconds)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires_at)
+            self._size_bytes += len(value)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+
+    def _remove(self, key):
+        value, _ = self._entries.pop(key)
+        self._size_bytes -= len(value)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': self.name,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'size_bytes': self._size_bytes,
+                'ttl_seconds': self.ttl_seconds
+            }
+
+
+class RedisCache:
+    """Redis-backed cache shared by all workers; Redis handles TTL and eviction"""
+
+    name = 'redis'
+
+    def __init__(self, client=None, ttl_seconds=None, prefix='testgenie:cache:'):
+        if client is None or ttl_seconds is None:
+            settings = redis_settings()
+            if client is None:
+                import redis
+                client = redis.Redis.from_url(settings.redis_url, max_connections=settings.max_connections)
+            if ttl_seconds is None:
+                ttl_seconds = settings.ttl_seconds
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, key):
+        try:
+            value = self.client.get(self.prefix + key)
+        except Exception as e:
+            # A cache outage degrades to a miss, never to a failed request
+            logger.warning(f"⚠️ Redis cache get failed: {e}")
+            self._count('errors')
+            value = None
+        self._count('hits' if value is not None else 'misses')
+        return value
+
+    def set(self, key, value, ttl_seconds=None):
+        try:
+            self.client.setex(self.prefix + key, ttl_seconds or self.ttl_seconds, value)
+        except Exception as e:
+            logger.warning(f"⚠️ Redis cache set failed: {e}")
+            self._count('errors')
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+    def stats(self):
+        stats = {
+            'backend': self.name,
+            'hits': self.hits,
+            'misses': self.misses,
+            'errors': self.errors,
+            'ttl_seconds': self.ttl_seconds
+        }
+        # Evictions happen inside Redis (maxmemory policy); report its counters
+        try:
+            info = self.client.info('stats')
+            stats['evictions'] = info.get('evicted_keys', 0)
+            stats['expirations'] = info.get('expired_keys', 0)
+        except Exception as e:
+            logger.warning(f"⚠️ Redis cache stats unavailable: {e}")
+        return stats
+
+
+def redis_settings():
+    """RedisSettings from the enterprise configuration (REDIS_HOST, REDIS_PORT, ...)"""
+    from app.core.config import RedisSettings
+    return RedisSettings()
+
+
+def create_cache(backend=None):
+    """Build the cache backend selected by CACHE_BACKEND (or the argument)"""
+    backend = (backend or os.environ.get('CACHE_BACKEND', 'memory')).lower()
+    if backend == 'none':
+        return None
+    if backend == 'redis':
+        return RedisCache()
+    if backend != 'memory':
+        logger.warning(f"⚠️ Unknown CACHE_BACKEND '{backend}', using memory")
+    return MemoryCache(
+        max_entries=int(os.environ.get('CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES)),
+        ttl_seconds=int(os.environ.get('CACHE_TTL_SECONDS', DEFAULT_TTL_SECONDS))
+    )
+
+
+# Active backend, replaced by init_cache()
+response_cache = None
+
+
+def init_cache(backend=None):
+    """Select the response cache backend; returns it (None when disabled)"""
+    global response_cache
+    response_cache = create_cache(backend)
+    if response_cache is not None:
+        logger.info(f"✅ Response cache enabled ({response_cache.name})")
+    return response_cache
+
+
+def cache_key(tables):
+    """Cache key for the current request: path, sorted non-empty args and table versions"""
+    args = sorted((name, value) for name, value in request.args.items(multi=True) if value != '')
+    versions = TableVersion.current(tables)
+    parts = [request.path]
+    parts.extend(f'{name}={value}' for name, value in args)
+    parts.extend(f'@{name}:{versions[name]}' for name in sorted(versions))
+    return '&'.join(parts)
+
+
+def entity_tag(key):
+    """Strong ETag value for a cache key (the versions in the key make it change on write)"""
+    return hashlib.sha1(f'{ETAG_FORMAT}|{key}'.encode('utf-8')).hexdigest()[:32]
+
+
+def tagged(response, etag):
+    """Mark a response with its ETag; clients must revalidate before reusing it"""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def cached_response(*tables):
+    """Cache successful GET responses of a view until one of the tables changes
+
+    Also answers conditional GETs: a matching If-None-Match gets 304 Not
+    Modified without running the view.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != 'GET':
+                return view(*args, **kwargs)
+
+            key = cache_key(tables)
+            etag = entity_tag(key)
+            # Compressed copies carry a suffixed tag (see compression.py); echo the one the client holds
+            for tag in [etag] + [encoded_etag(etag, coding) for coding in CONTENT_CODINGS]:
+                if request.if_none_match.contains_weak(tag):
+                    return tagged(Response(status=304), tag)
+
+            if response_cache is not None:
+                cached = response_cache.get(key)
+                if cached is not None:
+                    mimetype, _, body = cached.partition(b'\n')
+                    return tagged(Response(body, mimetype=mimetype.decode()), etag)
+
+            response = view(*args, **kwargs)
+            result = response if isinstance(response, Response) else None
+            if result is not None and result.status_code == 200 and not result.direct_passthrough:
+                if response_cache is not None:
+                    response_cache.set(key, result.mimetype.encode() + b'\n' + result.get_data())
+                tagged(result, etag)
+            return response
+        return wrapper
+    return decorator
+
+
+def cache_stats():
+    """Hit/miss/eviction counters of the active backend"""
+    if response_cache is None:
+        return {'backend': 'none'}
+    return response_cache.stats()
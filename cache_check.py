@@ -0,0 +1,257 @@
+"""
+Response Cache Check for TestGenie Enterprise
+Exercises both cache backends, the write-driven invalidation and conditional
+GETs (ETag / If-None-Match) end to end
+
+The Redis backend is checked against a real server when CACHE_CHECK_REDIS_URL
+is set (e.g. redis://localhost:6379/15), otherwise against an in-process
+stand-in implementing the few commands RedisCache uses.
+
+Usage:
+    python cache_check.py
+"""
+
+import fnmatch
+import os
+import sys
+import time
+
+# Checks run against a scratch database built from the current models
+os.environ['DATABASE_URL'] = os.environ.get('CACHE_CHECK_DATABASE_URL', 'sqlite://')
+
+
+class StandInRedis:
+    """Minimal in-process Redis substitute: GET, SETEX, DELETE, SCAN, INFO"""
+
+    def __init__(self):
+        self.data = {}
+        self.expired_keys = 0
+
+    def _live(self, key):
+        entry = self.data.get(key)
+        if entry and entry[1] <= time.monotonic():
+            del self.data[key]
+            self.expired_keys += 1
+            return None
+        return entry
+
+    def get(self, key):
+        entry = self._live(key)
+        return entry[0] if entry else None
+
+    def setex(self, key, seconds, value):
+        self.data[key] = (value, time.monotonic() + seconds)
+
+    def delete(self, *keys):
+        return sum(1 for key in keys if self.data.pop(key, None) is not None)
+
+    def scan_iter(self, match='*'):
+        return [key for key in list(self.data) if fnmatch.fnmatch(key, match)]
+
+    def info(self, section=None):
+        return {'evicted_keys': 0, 'expired_keys': self.expired_keys}
+
+
+def check(condition, label, failures):
+    print(f"{'✅' if condition else '❌'} {label}")
+    if not condition:
+        failures.append(label)
+
+
+def check_backend(backend, failures):
+    """Basic get/set/TTL behaviour shared by every backend"""
+    print(f"\n🔍 {backend.name} backend")
+    backend.clear()
+    check(backend.get('a') is None, 'miss on empty cache', failures)
+    backend.set('a', b'one')
+    check(backend.get('a') == b'one', 'hit after set', failures)
+    backend.set('short', b'x', ttl_seconds=1)
+    time.sleep(1.1)
+    check(backend.get('short') is None, 'entry expires after its TTL', failures)
+    stats = backend.stats()
+    check(stats['hits'] == 1 and stats['misses'] == 2, f"hit/miss counters {stats}", failures)
+
+
+def check_lru(failures):
+    from cache import MemoryCache
+
+    print("\n🔍 memory LRU eviction")
+    lru = MemoryCache(max_entries=2, ttl_seconds=60)
+    lru.set('a', b'1')
+    lru.set('b', b'2')
+    lru.get('a')            # 'b' is now least recently used
+    lru.set('c', b'3')
+    check(lru.get('b') is None and lru.get('a') == b'1', 'least recently used entry evicted', failures)
+    check(lru.stats()['evictions'] == 1, 'eviction counted', failures)
+
+
+def check_invalidation(backend, failures):
+    """Cached API responses change as soon as a write commits"""
+    import cache
+    from enterprise_test_platform_sqlite import app
+    from models import db, TestCase, TestSuite
+
+    print(f"\n🔍 invalidation through the API ({backend.name})")
+    backend.clear()
+    cache.response_cache = backend
+    client = app.test_client()
+
+    project = client.post('/api/projects', json={'name': f'Cache check {backend.name}',
+                                                  'description': ''}).get_json()
+    first = client.get('/api/projects?limit=10').get_json()
+    hits = backend.stats()['hits']
+    again = client.get('/api/projects?limit=10&cursor=').get_json()
+    check(again == first and backend.stats()['hits'] == hits + 1,
+          'repeat GET (empty params ignored) served from cache', failures)
+
+    client.post('/api/projects', json={'name': f'Cache check {backend.name} 2', 'description': ''})
+    after = client.get('/api/projects?limit=10').get_json()
+    check(len(after['items']) == len(first['items']) + 1, 'project create invalidates /api/projects', failures)
+
+    case = client.post('/api/test-cases', json={'title': 'Cached case', 'project_id': project['id']}).get_json()
+    client.get('/api/projects?limit=10')
+    counts = {p['id']: p['test_cases_count'] for p in client.get('/api/projects?limit=10').get_json()['items']}
+    check(counts[project['id']] == 1, 'test case create invalidates project counts', failures)
+
+    suite = client.post('/api/test-suites', json={'name': 'S', 'project_id': project['id']}).get_json()
+    before = client.get(f"/api/test-suites?project_id={project['id']}").get_json()['items'][0]
+    client.post(f"/api/test-suites/{suite['id']}/cases", json={'test_case_ids': [case['id']]})
+    after = client.get(f"/api/test-suites?project_id={project['id']}").get_json()['items'][0]
+    check(before['test_cases_count'] == 0 and after['test_cases_count'] == 1,
+          'suite membership change invalidates /api/test-suites', failures)
+
+    extra = client.post('/api/test-cases', json={'title': 'Deleted case', 'project_id': project['id']}).get_json()
+    client.post(f"/api/test-suites/{suite['id']}/cases", json={'test_case_ids': [extra['id']]})
+    before = client.get(f"/api/test-suites?project_id={project['id']}").get_json()['items'][0]
+    client.delete(f"/api/test-cases/{extra['id']}")
+    after = client.get(f"/api/test-suites?project_id={project['id']}").get_json()['items'][0]
+    check(before['test_cases_count'] == 2 and after['test_cases_count'] == 1,
+          'test case delete (suite links removed in before_flush) invalidates /api/test-suites', failures)
+
+    approved = client.get('/api/dashboard-stats').get_json()['test_case_stats']['approved']
+    with app.app_context():
+        tc = db.session.get(TestCase, case['id'])
+        tc.status = 'Approved'
+        db.session.commit()
+    stats = client.get('/api/dashboard-stats').get_json()
+    check(stats['test_case_stats']['approved'] == approved + 1,
+          'ORM update invalidates /api/dashboard-stats', failures)
+
+    other = client.post('/api/projects', json={'name': f'Cache check {backend.name} 3',
+                                                'description': ''}).get_json()
+    client.post('/api/test-runs', json={'name': 'Trend run', 'test_suite_id': suite['id']})
+    trends = f"/api/test-runs/trends?project_id={other['id']}"
+    before = client.get(trends).get_json()['days']
+    with app.app_context():
+        db.session.get(TestSuite, suite['id']).project_id = other['id']
+        db.session.commit()
+    after = client.get(trends).get_json()['days']
+    check(not before and sum(day['runs'] for day in after) == 1,
+          'moving a suite to another project invalidates /api/test-runs/trends', failures)
+
+    print(f"📊 {client.get('/api/cache-stats').get_json()}")
+
+
+def check_conditional(backend, failures):
+    """ETags stay put until a write and a matching If-None-Match skips the view"""
+    import cache
+    from enterprise_test_platform_sqlite import app
+
+    name = backend.name if backend else 'none'
+    print(f"\n🔍 conditional GET ({name})")
+    cache.response_cache = backend
+    client = app.test_client()
+
+    project = client.post('/api/projects', json={'name': f'ETag check {name}', 'description': ''}).get_json()
+    url = f"/api/test-cases?project_id={project['id']}"
+    first = client.get(url)
+    etag = first.headers.get('ETag')
+    check(first.status_code == 200 and etag and not etag.startswith('W/'), f'strong ETag {etag}', failures)
+    check(client.get(url).headers.get('ETag') == etag, 'same ETag while nothing changes', failures)
+
+    misses = backend.stats()['misses'] if backend else 0
+    unchanged = client.get(url, headers={'If-None-Match': etag})
+    check(unchanged.status_code == 304 and not unchanged.data and unchanged.headers.get('ETag') == etag,
+          'matching If-None-Match returns an empty 304', failures)
+    check((backend.stats()['misses'] if backend else 0) == misses, '304 does not touch the cache body', failures)
+    check(client.get('/api/dashboard-stats', headers={'If-None-Match': etag}).status_code == 200,
+          'ETag of one URL does not match another', failures)
+
+    client.post('/api/test-cases', json={'title': 'ETag case', 'project_id': project['id']})
+    changed = client.get(url, headers={'If-None-Match': etag})
+    check(changed.status_code == 200 and changed.headers.get('ETag') != etag
+          and len(changed.get_json()['items']) == 1, 'write changes the ETag and returns 200', failures)
+
+    stats = client.get('/api/dashboard-stats')
+    check(client.get('/api/dashboard-stats', headers={'If-None-Match': stats.headers['ETag']}).status_code == 304,
+          '/api/dashboard-stats revalidates with 304', failures)
+
+
+def check_compressed(backend, failures):
+    """A cache hit reuses the encoded body stored under its -gzip ETag instead of compressing again"""
+    import gzip
+    import cache
+    import compression
+    from enterprise_test_platform_sqlite import app
+
+    print(f"\n🔍 compressed cache hits ({backend.name})")
+    backend.clear()
+    cache.response_cache = backend
+    client = app.test_client()
+
+    project = client.post('/api/projects', json={'name': f'Compression check {backend.name}',
+                                                  'description': ''}).get_json()
+    client.post('/api/test-cases/bulk', json={'items': [
+        {'title': f'Compressed case {index}', 'description': 'Long enough to compress ' * 4,
+         'project_id': project['id']} for index in range(20)]})
+    url = f"/api/test-cases?project_id={project['id']}&limit=50"
+
+    calls = []
+    compress_bytes = compression.compress_bytes
+    compression.compress_bytes = lambda *args: calls.append(args[1]) or compress_bytes(*args)
+    try:
+        first = client.get(url, headers={'Accept-Encoding': 'gzip'})
+        second = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    finally:
+        compression.compress_bytes = compress_bytes
+    check(first.headers.get('Content-Encoding') == 'gzip' and second.data == first.data
+          and second.headers.get('ETag') == first.headers.get('ETag'),
+          'repeat compressed GET returns the same encoded body and ETag', failures)
+    check(calls == ['gzip'], f'body compressed once, not on every hit ({len(calls)} times)', failures)
+    check(gzip.decompress(second.data) == client.get(url).data, 'encoded body decodes to the identity body',
+          failures)
+
+
+def main():
+    from cache import MemoryCache, RedisCache
+
+    redis_url = os.environ.get('CACHE_CHECK_REDIS_URL')
+    if redis_url:
+        import redis
+        redis_client = redis.Redis.from_url(redis_url)
+    else:
+        redis_client = StandInRedis()
+
+    backends = [MemoryCache(ttl_seconds=60),
+                RedisCache(client=redis_client, ttl_seconds=60, prefix='testgenie:cache-check:')]
+
+    print("🧪 TestGenie Response Cache Check")
+    print("=" * 50)
+    failures = []
+    for backend in backends:
+        check_backend(backend, failures)
+    check_lru(failures)
+    for backend in backends:
+        check_invalidation(backend, failures)
+    for backend in backends + [None]:
+        check_conditional(backend, failures)
+    for backend in backends:
+        check_compressed(backend, failures)
+
+    print()
+    print(f"📊 {len(failures)} failed checks")
+    return failures
+
+
+if __name__ == '__main__':
+    sys.exit(1 if main() else 0)
@@ -0,0 +1,249 @@
+"""
+Response Compression for TestGenie Enterprise
+Negotiated gzip/brotli compression of JSON, HTML and text responses
+
+An after_request hook compresses responses whose mimetype is compressible
+when the client accepts gzip or br (br is preferred, and only offered when
+the optional brotli package is installed). Buffered bodies smaller than
+COMPRESS_MIN_SIZE are left alone; streamed bodies (NDJSON/CSV exports) are
+compressed chunk by chunk with a flush after each one, so chunked output
+keeps flowing. Responses that already carry a Content-Encoding, ranges and
+attachments that are compressed files themselves (export ?gzip=1) pass
+through untouched.
+
+A compressed response's ETag gets a -gzip / -br suffix, since its bytes
+differ from the identity body; cache.py accepts the suffixed tags in
+If-None-Match. Buffered responses with a strong ETag (those of cached
+views) keep their encoded bytes in the response cache under the suffixed
+tag, so a cache hit is not compressed again.
+
+Static files are served from a precompressed sibling (app.js.br, app.js.gz)
+when one exists and is not older than the file; `python compression.py
+precompress` writes them.
+
+Settings (Config in azure_config.py):
+    COMPRESS_ENABLED        - true/false (default true)
+    COMPRESS_MIN_SIZE       - smallest buffered body compressed, bytes (default 1024)
+    COMPRESS_LEVEL          - gzip level 1-9 (default 6)
+    COMPRESS_BROTLI_QUALITY - brotli quality 0-11 (default 5)
+
+Usage:
+    python compression.py precompress [folder]   - Write .gz/.br copies of static assets
+"""
+
+import gzip
+import logging
+import mimetypes
+import os
+import zlib
+
+from flask import request, send_from_directory
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # Optional; gzip is always available
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Mimetypes worth compressing; images, archives and event streams are not
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'application/x-ndjson', 'application/javascript', 'application/xml',
+    'text/html', 'text/css', 'text/csv', 'text/plain', 'text/javascript', 'text/xml', 'image/svg+xml',
+}
+
+# Content codings in order of preference, and their precompressed file extensions
+CONTENT_CODINGS = ('br', 'gzip')
+STATIC_EXTENSIONS = {'br': '.br', 'gzip': '.gz'}
+
+
+def codings():
+    """Content codings this process can produce, preferred first"""
+    return [coding for coding in CONTENT_CODINGS if coding != 'br' or brotli is not None]
+
+
+def encoded_etag(etag, coding):
+    """ETag of the coding's representation of a response tagged etag"""
+    return f'{etag}-{coding}'
+
+
+def negotiate(accept_encodings, available=None):
+    """Best content coding the client accepts (q > 0), or None for identity"""
+    for coding in available or codings():
+        if accept_encodings[coding] > 0:
+            return coding
+    return None
+
+
+class Compressor:
+    """Streaming gzip or brotli compressor with one interface"""
+
+    def __init__(self, coding, level, brotli_quality):
+        self.coding = coding
+        if coding == 'br':
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data, flush=True):
+        """Compress a chunk; flush makes everything so far decodable by the client"""
+        if self.coding == 'br':
+            out = self._compressor.process(data)
+            return out + self._compressor.flush() if flush else out
+        out = self._compressor.compress(data)
+        return out + self._compressor.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self):
+        if self.coding == 'br':
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+def compress_bytes(data, coding, level, brotli_quality):
+    if coding == 'br':
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def compressed_chunks(chunks, compressor):
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def add_vary(response):
+    if 'accept-encoding' not in {value.lower() for value in response.vary}:
+        response.vary.add('Accept-Encoding')
+
+
+class ResponseCompression:
+    """Registers the compression hook and the precompressed static view on an app"""
+
+    def __init__(self, enabled=True, min_size=1024, level=6, brotli_quality=5):
+        self.enabled = enabled
+        self.min_size = min_size
+        self.level = level
+        self.brotli_quality = brotli_quality
+
+    def init_app(self, app):
+        if not self.enabled:
+            logger.info("ℹ️ Response compression disabled")
+            return
+        app.after_request(self.compress_response)
+        if app.has_static_folder and 'static' in app.view_functions:
+            app.view_functions['static'] = lambda filename: self.send_static(app, filename)
+        logger.info(f"✅ Response compression enabled ({', '.join(codings())}, "
+                    f"min {self.min_size} bytes, gzip level {self.level})")
+
+    def compressible(self, response):
+        return (response.mimetype in COMPRESSIBLE_MIMETYPES
+                and 200 <= response.status_code < 300 and response.status_code not in (204, 206)
+                and request.method != 'HEAD'
+                and 'Content-Encoding' not in response.headers
+                and 'no-transform' not in response.headers.get('Cache-Control', '')
+                and not response.direct_passthrough)
+
+    def compress_response(self, response):
+        if not self.compressible(response):
+            return response
+        add_vary(response)
+        coding = negotiate(request.accept_encodings)
+        if coding is None:
+            return response
+
+        if response.is_streamed:
+            compressor = Compressor(coding, self.level, self.brotli_quality)
+            response.response = compressed_chunks(response.response, compressor)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            response.set_data(self.encoded_body(response, data, coding))
+
+        response.headers['Content-Encoding'] = coding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(encoded_etag(etag, coding), weak)
+        return response
+
+    def encoded_body(self, response, data, coding):
+        """Compressed data, reused from the response cache when the response has a strong ETag"""
+        import cache  # cache.py imports this module
+
+        etag, weak = response.get_etag()
+        if not etag or weak or cache.response_cache is None:
+            return compress_bytes(data, coding, self.level, self.brotli_quality)
+        setting = self.brotli_quality if coding == 'br' else self.level
+        key = f'encoded:{encoded_etag(etag, coding)}:{setting}'
+        body = cache.response_cache.get(key)
+        if body is None:
+            body = compress_bytes(data, coding, self.level, self.brotli_quality)
+            cache.response_cache.set(key, body)
+        return body
+
+    def send_static(self, app, filename):
+        """Static file, from a precompressed sibling when the client accepts its coding"""
+        path = safe_join(app.static_folder, filename)
+        # Serving a stored .br needs no brotli package; a sibling older than its source is stale
+        available = [coding for coding, extension in STATIC_EXTENSIONS.items()
+                     if path and os.path.isfile(path) and os.path.isfile(path + extension)
+                     and os.path.getmtime(path + extension) >= os.path.getmtime(path)]
+        coding = negotiate(request.accept_encodings, available) if available else None
+        if coding is None:
+            response = app.send_static_file(filename)
+        else:
+            mimetype, _ = mimetypes.guess_type(filename)
+            response = send_from_directory(app.static_folder, filename + STATIC_EXTENSIONS[coding],
+                                           mimetype=mimetype or 'application/octet-stream',
+                                           max_age=app.get_send_file_max_age(filename))
+            response.headers['Content-Encoding'] = coding
+        if available:
+            add_vary(response)
+        return response
+
+
+def init_compression(app, config):
+    """Enable response compression with the COMPRESS_* settings of config"""
+    compression = ResponseCompression(enabled=config.COMPRESS_ENABLED, min_size=config.COMPRESS_MIN_SIZE,
+                                      level=config.COMPRESS_LEVEL, brotli_quality=config.COMPRESS_BROTLI_QUALITY)
+    compression.init_app(app)
+    return compression
+
+
+def precompress_static(folder, level=9, brotli_quality=11, min_size=1024):
+    """Write .gz (and .br when brotli is installed) next to each compressible static file"""
+    written = 0
+    for root, _, files in os.walk(folder):
+        for name in files:
+            if name.endswith(tuple(STATIC_EXTENSIONS.values())):
+                continue
+            mimetype, _ = mimetypes.guess_type(name)
+            path = os.path.join(root, name)
+            if mimetype not in COMPRESSIBLE_MIMETYPES or os.path.getsize(path) < min_size:
+                continue
+            with open(path, 'rb') as stream:
+                data = stream.read()
+            for coding in codings():
+                with open(path + STATIC_EXTENSIONS[coding], 'wb') as stream:
+                    stream.write(compress_bytes(data, coding, level, brotli_quality))
+                written += 1
+    return written
+
+
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) < 2 or sys.argv[1] != 'precompress':
+        print(__doc__)
+        sys.exit(1)
+    folder = sys.argv[2] if len(sys.argv) > 2 else 'static'
+    if not os.path.isdir(folder):
+        sys.exit(f"❌ No static folder {folder}")
+    print(f"✅ Wrote {precompress_static(folder)} precompressed files under {folder}"
+          f"{'' if brotli else ' (gzip only; brotli not installed)'}")
@@ -120,7 +120,7 @@ def view_table_details(table_name):
         print(f"❌ Database error: {e}")
 
 def search_test_cases(search_term=""):
-    """Search test cases by title or description"""
+    """Search test cases (full-text when the search index exists, else title/description LIKE)"""
     
     print(f"🔍 Searching test cases for: '{search_term}'")
     print("=" * 50)
@@ -130,7 +130,23 @@ def search_test_cases(search_term=""):
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
-        if search_term:
+        has_fts = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'test_cases_fts'"
+        ).fetchone()
+        
+        if search_term and has_fts:
+            from search import fts_query, BM25_WEIGHTS
+            # Ranked full-text search over title, description, steps and expected result
+            query = f"""
+            SELECT tc.*, p.name as project_name 
+            FROM test_cases_fts f
+            JOIN test_cases tc ON tc.search_rowid = f.rowid
+            LEFT JOIN projects p ON tc.project_id = p.id
+            WHERE test_cases_fts MATCH ?
+            ORDER BY bm25(test_cases_fts, {', '.join(map(str, BM25_WEIGHTS))})
+            """
+            cursor.execute(query, (fts_query(search_term) or '""',))
+        elif search_term:
             query = """
             SELECT tc.*, p.name as project_name 
             FROM test_cases tc 
@@ -36,14 +36,17 @@ def test_ai_generator():
         print(f"   ❌ Cannot start server: {e}")
         return
     
+    project_id = None
     try:
-        # Test projects API
+        # Test projects API (paginated: {items, next_cursor})
         print("3. Testing projects API...")
         projects_response = requests.get('http://localhost:5000/api/projects', timeout=5)
         
         if projects_response.status_code == 200:
-            projects_data = projects_response.json()
-            print(f"   ✅ Projects API working - Found {len(projects_data)} projects")
+            projects_data = projects_response.json()['items']
+            print(f"   ✅ Projects API working - Found {len(projects_data)} projects on the first page")
+            if projects_data:
+                project_id = projects_data[0]['id']
             
             if len(projects_data) == 0:
                 print("   ⚠️  No projects found - creating a test project...")
@@ -55,6 +58,7 @@ def test_ai_generator():
                 create_response = requests.post('http://localhost:5000/api/projects', 
                                               json=new_project, timeout=5)
                 if create_response.status_code == 201:
+                    project_id = create_response.json()['id']
                     print("   ✅ Test project created successfully")
                 else:
                     print(f"   ❌ Failed to create test project: {create_response.status_code}")
@@ -85,7 +89,7 @@ def test_ai_generator():
         print("5. Testing AI generation...")
         test_request = {
             'requirements': 'Test user login functionality',
-            'project_id': 'test-project',
+            'project_id': project_id,
             'test_type': 'functional',
             'count': 3
         }
@@ -93,9 +97,17 @@ def test_ai_generator():
         ai_gen_response = requests.post('http://localhost:5000/api/ai-generate', 
                                        json=test_request, timeout=30)
         
-        if ai_gen_response.status_code == 200:
-            ai_result = ai_gen_response.json()
-            print(f"   ✅ AI Generation working - Generated {len(ai_result.get('generated_cases', []))} test cases")
+        if ai_gen_response.status_code == 202:
+            # Generation is queued; poll the job until a worker finishes it
+            job_url = 'http://localhost:5000' + ai_gen_response.json()['status_url']
+            ai_result = requests.get(job_url, timeout=10).json()
+            for _ in range(30):
+                if ai_result['status'] in ('Completed', 'Failed'):
+                    break
+                time.sleep(1)
+                ai_result = requests.get(job_url, timeout=10).json()
+            print(f"   ✅ AI Generation job {ai_result['status']} - "
+                  f"Generated {len(ai_result.get('generated_cases', []))} test cases")
         else:
             print(f"   ❌ AI Generation failed: {ai_gen_response.status_code}")
             print(f"   Response: {ai_gen_response.text[:200]}...")
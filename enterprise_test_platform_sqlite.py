@@ -3,11 +3,13 @@ TestGenie Enterprise - Full Test Management Platform
 Enhanced version with test management capabilities 
 Now with Real AI Integration (Azure OpenAI) and SQLite Database
 """
-from flask import Flask, render_template, request, flash, jsonify, redirect, url_for
+from flask import (Flask, render_template, request, flash, jsonify, redirect, url_for, abort, Response,
+                   stream_with_context)
 import os
 import json
 import time
-from datetime import datetime, timezone
+import threading
+from datetime import datetime, timedelta, timezone
 import uuid
 from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
@@ -16,46 +18,106 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Import database models and AI service
-from models import db, Project, TestCase, TestSuite, TestRun, User
+from models import (db, Project, TestCase, TestSuite, TestSuiteCase, TestRun, TestResult, Tag, User,
+                    StatsRollup, ImportJob, ArchivedRun, ProjectDeletion, AIJob, test_case_tags, unique_ids,
+                    chunked, deleting_project_ids, WITH_COUNTS)
+from migrations import run_migrations
+from queries import (test_case_query, filtered_test_cases, test_run_query, archived_run_query, project_query,
+                     test_suite_query, fetch_page, TEST_CASE_FILTERS)
+from search import search_result_dict
+from export import export_stream
+from serialize import json_response, test_case_page, test_run_page, project_page, test_suite_page
+from importer import detect_format, run_import_job, PARSERS
+from archive import read_archived_run, run_trends
+from project_deletion import start_project_deletion, run_project_deletion
+from bulk import (bulk_create_test_cases, bulk_update_test_cases, bulk_delete_test_cases, BULK_MAX_ITEMS,
+                  parse_transition, update_matching_test_cases)
 from ai_service import ai_service
+from ai_jobs import init_ai_jobs, submit_ai_job, ai_job_result, job_events
+from cache import init_cache, cached_response, cache_stats
+from compression import init_compression
+from azure_config import get_config
+from storage import engine_options, apply_storage_profile
 
 app = Flask(__name__)
 app.secret_key = 'testgenie-enterprise-secret'
 
 # Database configuration
+app_config = get_config()
 app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL') or 'sqlite:///testgenie.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(
+    app.config['SQLALCHEMY_DATABASE_URI'], app_config, app_config.SQLITE_PROFILE)
 
-# Initialize database
+# Initialize database (SQLite PRAGMAs are set on every new connection)
 db.init_app(app)
+with app.app_context():
+    apply_storage_profile(db.engine, app_config.SQLITE_PROFILE)
+
+# Response cache for GET APIs (CACHE_BACKEND=memory|redis|none)
+init_cache()
+
+# Negotiated gzip/brotli compression of JSON, HTML and exports (COMPRESS_* settings)
+compression = init_compression(app, app_config)
+
+# Worker pool for queued AI generation jobs (AI_JOB_* settings)
+ai_job_pool = init_ai_jobs(app, app_config)
 
 # Create directories
 os.makedirs('uploads', exist_ok=True)
 os.makedirs('data', exist_ok=True)
 
-# Create database tables if they don't exist
+# Create database tables if they don't exist and apply pending migrations
 with app.app_context():
     db.create_all()
+    run_migrations()
 
 # Helper functions
-def calculate_test_execution_stats():
+@app.template_global()
+def next_page_url(next_cursor):
+    """URL of the next cursor page of the current view, keeping its filters"""
+    args = request.args.to_dict()
+    args['cursor'] = next_cursor
+    return url_for(request.endpoint, **request.view_args, **args)
+
+def rollup_count(totals, dimension, value=''):
+    """One count from StatsRollup.totals()"""
+    return totals.get(dimension, {}).get(value, 0)
+
+def test_case_total(args):
+    """Test cases matching the /test-cases filters; from stats_rollup unless tags, search or two columns filter"""
+    filtered = [name for name in TEST_CASE_FILTERS if name != 'project_id' and args.get(name)]
+    if not filtered or (len(filtered) == 1 and filtered[0] in ('status', 'priority')):
+        totals = StatsRollup.totals(args.get('project_id') or StatsRollup.ALL_PROJECTS)
+        if not filtered:
+            return rollup_count(totals, 'test_cases')
+        return rollup_count(totals, f'test_case_{filtered[0]}', args.get(filtered[0]))
+    query, _ = filtered_test_cases(args)
+    return query.order_by(None).count()
+
+def test_run_total(args):
+    """Test runs matching the /test-runs status filter, from stats_rollup"""
+    if args.get('status'):
+        return rollup_count(StatsRollup.totals(), 'test_run_status', args['status'])
+    return rollup_count(StatsRollup.totals(), 'test_runs')
+
+def calculate_test_execution_stats(totals=None):
     """Calculate test execution statistics from all test runs"""
     passed_tests = 0
     failed_tests = 0
     
-    # Get results from all test runs
-    test_runs = TestRun.query.all()
-    for run in test_runs:
-        results = run.get_results()
-        if results:
-            for test_id, result in results.items():
-                if result.lower() == 'passed':
-                    passed_tests += 1
-                elif result.lower() == 'failed':
-                    failed_tests += 1
+    # Outcome counts are kept in stats_rollup as results are written
+    if totals is None:
+        totals = StatsRollup.totals()
+    
+    for outcome, count in totals.get('test_result_outcome', {}).items():
+        if outcome.lower() == 'passed':
+            passed_tests += count
+        elif outcome.lower() == 'failed':
+            failed_tests += count
     
     # If no test execution data, provide sample data for demonstration
-    total_test_cases = TestCase.query.count()
+    total_test_cases = rollup_count(totals, 'test_cases')
     if passed_tests == 0 and failed_tests == 0 and total_test_cases > 0:
         # Use some sample data based on test case counts for demonstration
         passed_tests = max(0, total_test_cases - 2)  # Assume most tests would pass
@@ -67,29 +129,33 @@ def calculate_test_execution_stats():
 @app.route('/')
 def dashboard():
     """Main dashboard like TestRail/Zephyr"""
+    totals = StatsRollup.totals()
     stats = {
-        'total_projects': Project.query.count(),
-        'total_test_cases': TestCase.query.count(),
-        'total_test_suites': TestSuite.query.count(),
-        'active_test_runs': TestRun.query.filter_by(status="In Progress").count()
+        'total_projects': rollup_count(totals, 'projects'),
+        'total_test_cases': rollup_count(totals, 'test_cases'),
+        'total_test_suites': rollup_count(totals, 'test_suites'),
+        'active_test_runs': rollup_count(totals, 'test_run_status', 'In Progress')
     }
-    recent_projects = Project.query.order_by(Project.created_at.desc()).limit(5).all()
+    recent_projects = Project.query.options(WITH_COUNTS).order_by(Project.created_at.desc()).limit(5).all()
     projects_data = [p.to_dict() for p in recent_projects]
     return render_template('dashboard.html', stats=stats, projects=projects_data)
 
 @app.route('/projects')
 def projects_list():
     """Project management"""
-    all_projects = Project.query.order_by(Project.created_at.desc()).all()
-    projects_data = [p.to_dict() for p in all_projects]
-    return render_template('projects.html', projects=projects_data)
+    try:
+        projects, next_cursor = fetch_page(project_query(request.args).options(WITH_COUNTS), request.args)
+    except ValueError as e:
+        abort(400, str(e))
+    projects_data = [p.to_dict() for p in projects]
+    return render_template('projects.html', projects=projects_data, next_cursor=next_cursor)
 
 @app.route('/projects/<project_id>')
 def project_detail(project_id):
     """Project detail view"""
-    project = Project.query.get_or_404(project_id)
+    project = Project.query.options(WITH_COUNTS).get_or_404(project_id)
     project_test_cases = TestCase.query.filter_by(project_id=project_id).all()
-    project_test_suites = TestSuite.query.filter_by(project_id=project_id).all()
+    project_test_suites = TestSuite.query.options(WITH_COUNTS).filter_by(project_id=project_id).all()
     
     return render_template('project_detail.html', 
                          project=project.to_dict(),
@@ -99,9 +165,13 @@ def project_detail(project_id):
 @app.route('/test-cases')
 def test_cases_list():
     """Test case management"""
-    all_test_cases = TestCase.query.order_by(TestCase.created_at.desc()).all()
-    test_cases_data = [tc.to_dict() for tc in all_test_cases]
-    return render_template('test_cases.html', test_cases=test_cases_data)
+    try:
+        test_cases, next_cursor = fetch_page(test_case_query(request.args), request.args)
+    except ValueError as e:
+        abort(400, str(e))
+    test_cases_data = [search_result_dict(row) for row in test_cases]
+    return render_template('test_cases.html', test_cases=test_cases_data,
+                           next_cursor=next_cursor, total_count=test_case_total(request.args))
 
 @app.route('/test-case/<test_case_id>')
 def test_case_detail(test_case_id):
@@ -112,9 +182,14 @@ def test_case_detail(test_case_id):
 @app.route('/test-runs')
 def test_runs_list():
     """Test execution management"""
-    all_test_runs = TestRun.query.order_by(TestRun.created_at.desc()).all()
-    test_runs_data = [tr.to_dict() for tr in all_test_runs]
-    return render_template('test_runs.html', test_runs=test_runs_data)
+    try:
+        test_runs, next_cursor = fetch_page(
+            test_run_query(request.args).options(db.selectinload(TestRun.test_results)), request.args)
+    except ValueError as e:
+        abort(400, str(e))
+    test_runs_data = [tr.to_dict() for tr in test_runs]
+    return render_template('test_runs.html', test_runs=test_runs_data,
+                           next_cursor=next_cursor, total_count=test_run_total(request.args))
 
 @app.route('/ai-generator')
 def ai_generator():
@@ -129,24 +204,25 @@ def settings():
 @app.route('/reports')
 def reports():
     """Analytics and reports"""
-    # Calculate comprehensive statistics
-    total_projects = Project.query.count()
-    total_test_cases = TestCase.query.count()
-    total_test_suites = TestSuite.query.count()
-    total_test_runs = TestRun.query.count()
+    # Calculate comprehensive statistics from the rollup (one small query)
+    totals = StatsRollup.totals()
+    total_projects = rollup_count(totals, 'projects')
+    total_test_cases = rollup_count(totals, 'test_cases')
+    total_test_suites = rollup_count(totals, 'test_suites')
+    total_test_runs = rollup_count(totals, 'test_runs')
     
     # Test case statistics by status
     test_case_stats = {}
     for status in ['Draft', 'Under Review', 'Approved', 'Obsolete']:
-        test_case_stats[status] = TestCase.query.filter_by(status=status).count()
+        test_case_stats[status] = rollup_count(totals, 'test_case_status', status)
     
     # Test case statistics by priority
     priority_stats = {}
     for priority in ['Low', 'Medium', 'High']:
-        priority_stats[priority] = TestCase.query.filter_by(priority=priority).count()
+        priority_stats[priority] = rollup_count(totals, 'test_case_priority', priority)
     
     # Calculate test execution statistics
-    passed_tests, failed_tests = calculate_test_execution_stats()
+    passed_tests, failed_tests = calculate_test_execution_stats(totals)
     
     stats = {
         'total_projects': total_projects,
@@ -171,6 +247,11 @@ def health_check():
         'version': '1.0.0'
     })
 
+@app.route('/api/cache-stats')
+def api_cache_stats():
+    """Response cache hit/miss/eviction counters for sizing the cache"""
+    return jsonify(cache_stats())
+
 @app.route('/api/ai-status')
 def ai_status_check():
     """AI provider status diagnostic - safe endpoint"""
@@ -284,11 +365,14 @@ def api_ai_debug():
 
 # Projects API
 @app.route('/api/projects', methods=['GET', 'POST'])
+@cached_response('projects', 'test_cases', 'test_suites')
 def api_projects():
     """Projects CRUD API"""
     if request.method == 'GET':
-        all_projects = Project.query.order_by(Project.created_at.desc()).all()
-        return jsonify([p.to_dict() for p in all_projects])
+        try:
+            return json_response(project_page(request.args))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
     
     elif request.method == 'POST':
         try:
@@ -319,32 +403,36 @@ def api_projects():
             db.session.rollback()
             return jsonify({'error': f'Error creating project: {str(e)}'}), 500
 
+@app.route('/api/projects/<project_id>', methods=['DELETE'])
+def api_project_detail(project_id):
+    """Delete a project: hidden at once, its rows removed in the background"""
+    project = Project.query.get_or_404(project_id)
+    
+    try:
+        job = start_project_deletion(project)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Error deleting project: {str(e)}'}), 500
+    
+    threading.Thread(target=run_project_deletion, args=(app, job.id), daemon=True).start()
+    return jsonify(job.to_dict()), 202
+
+@app.route('/api/project-deletions/<job_id>')
+def api_project_deletion(job_id):
+    """Progress of a deletion started with DELETE /api/projects/<id>"""
+    return jsonify(ProjectDeletion.query.get_or_404(job_id).to_dict())
+
 # Test Cases API
 @app.route('/api/test-cases', methods=['GET', 'POST'])
+@cached_response('test_cases')
 def api_test_cases():
     """Test cases CRUD API with filtering"""
     if request.method == 'GET':
-        # Get query parameters for filtering
-        project_id = request.args.get('project_id')
-        status = request.args.get('status')
-        priority = request.args.get('priority')
-        search = request.args.get('search', '').strip()
-        
-        # Build query
-        query = TestCase.query
-        
-        if project_id:
-            query = query.filter_by(project_id=project_id)
-        if status:
-            query = query.filter_by(status=status)
-        if priority:
-            query = query.filter_by(priority=priority)
-        if search:
-            query = query.filter(TestCase.title.contains(search))
-        
-        # Execute query
-        test_cases = query.order_by(TestCase.created_at.desc()).all()
-        return jsonify([tc.to_dict() for tc in test_cases])
+        # Filtered query shared with query_plan_check.py, serialized from plain rows
+        try:
+            return json_response(test_case_page(request.args))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
     
     elif request.method == 'POST':
         try:
@@ -388,6 +476,58 @@ def api_test_cases():
             db.session.rollback()
             return jsonify({'error': f'Error creating test case: {str(e)}'}), 500
 
+@app.route('/api/test-cases', methods=['PATCH'])
+def api_test_cases_transition():
+    """Change status/priority or add/remove tags on every test case matching the list filters"""
+    data = request.get_json(silent=True) or {}
+    if not any(request.args.get(name, '').strip() for name in TEST_CASE_FILTERS):
+        return jsonify({'error': f"At least one filter is required ({', '.join(TEST_CASE_FILTERS)})"}), 400
+
+    try:
+        fields, add_tags, remove_tags = parse_transition(data)
+        query, rank = filtered_test_cases(request.args)
+        if request.args.get('search', '').strip() and rank is None:
+            raise ValueError('search has no searchable terms')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        result = update_matching_test_cases(query, fields, add_tags, remove_tags,
+                                            dry_run=bool(data.get('dry_run')))
+    except Exception as e:
+        return jsonify({'error': f'Error updating test cases: {str(e)}'}), 500
+    return jsonify(result)
+
+@app.route('/api/test-cases/bulk', methods=['POST', 'PATCH', 'DELETE'])
+def api_test_cases_bulk():
+    """Bulk create (POST), update (PATCH) or delete (DELETE) test cases"""
+    data = request.get_json(silent=True) or {}
+    key = 'ids' if request.method == 'DELETE' else 'items'
+    items = data.get(key)
+
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': f'A non-empty "{key}" list is required'}), 400
+    if len(items) > BULK_MAX_ITEMS:
+        return jsonify({'error': f'At most {BULK_MAX_ITEMS} {key} per request'}), 400
+
+    try:
+        if request.method == 'POST':
+            result = bulk_create_test_cases(items)
+        elif request.method == 'PATCH':
+            result = bulk_update_test_cases(items)
+        else:
+            result = bulk_delete_test_cases(items)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Error in bulk operation: {str(e)}'}), 500
+
+    # 201/200 when everything was written, 207 when some items failed
+    if result['failed']:
+        status = 207
+    else:
+        status = 201 if request.method == 'POST' else 200
+    return jsonify(result), status
+
 @app.route('/api/test-cases/<test_case_id>', methods=['GET', 'PUT', 'DELETE'])
 def api_test_case_detail(test_case_id):
     """Individual test case operations"""
@@ -436,10 +576,201 @@ def api_test_case_detail(test_case_id):
             db.session.rollback()
             return jsonify({'error': f'Error deleting test case: {str(e)}'}), 500
 
+# Test Suites API
+def split_suite_case_ids(suite, ids_list):
+    """Split requested IDs into test cases of the suite's project and unknown IDs"""
+    ids = unique_ids(ids_list)
+    valid = set()
+    for chunk in chunked(ids):
+        valid.update(db.session.execute(
+            db.select(TestCase.id)
+            .where(TestCase.id.in_(chunk))
+            .where(TestCase.project_id == suite.project_id)
+        ).scalars())
+    return [i for i in ids if i in valid], [i for i in ids if i not in valid]
+
+def parse_suite_index(data):
+    """Read the optional 0-based insertion index from a request body"""
+    index = data.get('index')
+    if index is None:
+        return None
+    index = int(index)
+    if index < 0:
+        raise ValueError('index must be >= 0')
+    return index
+
+@app.route('/api/test-suites', methods=['GET', 'POST'])
+@cached_response('test_suites', 'test_suite_cases', 'test_runs')
+def api_test_suites():
+    """Test suites CRUD API"""
+    if request.method == 'GET':
+        try:
+            return json_response(test_suite_page(request.args))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    
+    elif request.method == 'POST':
+        try:
+            data = request.get_json()
+            
+            # Validation
+            if not data or not data.get('name', '').strip():
+                return jsonify({'error': 'Test suite name is required'}), 400
+            
+            if not data.get('project_id'):
+                return jsonify({'error': 'Project ID is required'}), 400
+            
+            project = Project.query.get(data.get('project_id'))
+            if not project:
+                return jsonify({'error': 'Project not found'}), 404
+            
+            test_suite = TestSuite(
+                name=data.get('name').strip(),
+                description=data.get('description', ''),
+                project_id=project.id,
+                created_by=data.get('created_by', 'system')
+            )
+            
+            valid_ids, unknown_ids = split_suite_case_ids(test_suite, data.get('test_case_ids', []))
+            if unknown_ids:
+                return jsonify({'error': 'Test cases not found in project', 'test_case_ids': unknown_ids}), 400
+            
+            test_suite.set_test_case_ids(valid_ids)
+            db.session.add(test_suite)
+            db.session.commit()
+            
+            return jsonify(test_suite.to_dict()), 201
+            
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'error': f'Error creating test suite: {str(e)}'}), 500
+
+@app.route('/api/test-suites/<test_suite_id>', methods=['GET', 'DELETE'])
+def api_test_suite_detail(test_suite_id):
+    """Individual test suite operations"""
+    test_suite = TestSuite.query.options(WITH_COUNTS).get_or_404(test_suite_id)
+    
+    if request.method == 'GET':
+        return jsonify(test_suite.to_dict())
+    
+    elif request.method == 'DELETE':
+        try:
+            db.session.delete(test_suite)
+            db.session.commit()
+            return jsonify({'message': 'Test suite deleted successfully'})
+            
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'error': f'Error deleting test suite: {str(e)}'}), 500
+
+@app.route('/api/test-suites/<test_suite_id>/cases', methods=['POST', 'DELETE'])
+def api_test_suite_cases(test_suite_id):
+    """Bulk add or remove test cases; only the affected membership rows are written"""
+    test_suite = TestSuite.query.get_or_404(test_suite_id)
+    data = request.get_json() or {}
+    
+    if not isinstance(data.get('test_case_ids'), list) or not data['test_case_ids']:
+        return jsonify({'error': 'test_case_ids must be a non-empty list'}), 400
+    
+    try:
+        if request.method == 'POST':
+            try:
+                index = parse_suite_index(data)
+            except (TypeError, ValueError):
+                return jsonify({'error': 'index must be a non-negative integer'}), 400
+            
+            valid_ids, unknown_ids = split_suite_case_ids(test_suite, data['test_case_ids'])
+            added = test_suite.add_test_cases(valid_ids, index)
+            db.session.commit()
+            
+            return jsonify({
+                'message': f'Added {len(added)} test cases',
+                'added': added,
+                'not_found': unknown_ids
+            })
+        
+        elif request.method == 'DELETE':
+            removed = test_suite.remove_test_cases(data['test_case_ids'])
+            db.session.commit()
+            
+            return jsonify({'message': f'Removed {removed} test cases', 'removed': removed})
+            
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Error updating test suite: {str(e)}'}), 500
+
+@app.route('/api/test-suites/<test_suite_id>/cases/order', methods=['PUT'])
+def api_test_suite_reorder(test_suite_id):
+    """Move test cases (in the given order) to start at an index in the suite"""
+    test_suite = TestSuite.query.get_or_404(test_suite_id)
+    data = request.get_json() or {}
+    
+    if not isinstance(data.get('test_case_ids'), list) or not data['test_case_ids']:
+        return jsonify({'error': 'test_case_ids must be a non-empty list'}), 400
+    
+    try:
+        index = parse_suite_index(data)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'index must be a non-negative integer'}), 400
+    if index is None:
+        return jsonify({'error': 'index is required'}), 400
+    
+    try:
+        moved = test_suite.move_test_cases(data['test_case_ids'], index)
+        db.session.commit()
+        
+        return jsonify({'message': f'Moved {len(moved)} test cases', 'moved': moved})
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Error reordering test suite: {str(e)}'}), 500
+
+@app.route('/api/test-cases/<test_case_id>/suites')
+def api_test_case_suites(test_case_id):
+    """Suites containing a test case, answered from the membership index"""
+    TestCase.query.get_or_404(test_case_id)
+    
+    test_suites = TestSuite.query.options(WITH_COUNTS).join(
+        TestSuiteCase, TestSuiteCase.test_suite_id == TestSuite.id
+    ).filter(TestSuiteCase.test_case_id == test_case_id).order_by(TestSuite.name).all()
+    
+    return jsonify([ts.to_dict(include_test_cases=False) for ts in test_suites])
+
+# Tags API
+@app.route('/api/tags')
+@cached_response('test_cases')
+def api_tags():
+    """Per-project tag counts served from the tag index"""
+    project_id = request.args.get('project_id')
+    
+    query = db.session.query(
+        test_case_tags.c.project_id,
+        Tag.name,
+        db.func.count().label('count')
+    ).join(Tag, Tag.id == test_case_tags.c.tag_id).filter(
+        test_case_tags.c.project_id.notin_(deleting_project_ids()))
+    
+    if project_id:
+        query = query.filter(test_case_tags.c.project_id == project_id)
+    
+    rows = query.group_by(test_case_tags.c.project_id, Tag.name).all()
+    
+    projects = {}
+    for row_project_id, name, count in rows:
+        projects.setdefault(row_project_id, []).append({'name': name, 'count': count})
+    
+    return jsonify([
+        {
+            'project_id': row_project_id,
+            'tags': sorted(tags, key=lambda tag: (-tag['count'], tag['name']))
+        }
+        for row_project_id, tags in projects.items()
+    ])
+
 # AI Generation API
 @app.route('/api/ai-generate', methods=['POST'])
 def api_ai_generate():
-    """AI test case generation with SQLite storage"""
+    """Queue AI test case generation; poll /api/ai-jobs/<id> for the stored cases"""
     try:
         data = request.get_json()
         
@@ -448,93 +779,78 @@ def api_ai_generate():
         project_id = data.get('project_id', '')
         test_type = data.get('test_type', 'functional')
         count = int(data.get('count', data.get('num_cases', 3)))
+        bypass_cache = bool(data.get('bypass_cache', False))  # Skip the AI generation cache lookup
         
         # Validate input
         if not requirements.strip():
             return jsonify({'error': 'Requirements cannot be empty'}), 400
         
-        if count > 20:  # Limit to prevent excessive API costs
-            count = 20
-        
-        # Verify project exists if provided
-        if project_id:
-            project = Project.query.get(project_id)
-            if not project:
-                return jsonify({'error': 'Project not found'}), 404
-        
-        # Generate test cases using AI service
-        generated_cases = ai_service.generate_test_cases(
-            requirements=requirements,
-            project_id=project_id,
-            test_type=test_type,
-            count=count
-        )
-        
-        # Store generated test cases in SQLite database
-        stored_cases = []
-        for case_data in generated_cases:
-            test_case = TestCase(
-                title=case_data.get('title', 'AI Generated Test Case'),
-                description=case_data.get('description', ''),
-                expected_result=case_data.get('expected_result', ''),
-                priority=case_data.get('priority', 'Medium'),
-                status='Draft',
-                project_id=project_id,
-                created_by='ai-system'
-            )
-            
-            # Handle steps and tags
-            if case_data.get('steps'):
-                test_case.set_steps(case_data.get('steps'))
-            if case_data.get('tags'):
-                test_case.set_tags(case_data.get('tags', []) + ['ai-generated'])
-            else:
-                test_case.set_tags(['ai-generated'])
-            
-            db.session.add(test_case)
-            stored_cases.append(test_case)
-        
-        # Commit all test cases
-        db.session.commit()
+        # Generated cases are stored in the project (test_cases.project_id is a foreign key)
+        if not project_id:
+            return jsonify({'error': 'project_id is required'}), 400
         
-        # Convert to dictionaries for response
-        response_cases = [tc.to_dict() for tc in stored_cases]
+        if count < 1:
+            return jsonify({'error': 'Count must be at least 1'}), 400
+        # Limit to prevent excessive API costs; counts above AI_SHARD_SIZE are generated in parallel shards
+        count = min(count, app_config.AI_GENERATE_MAX_COUNT)
         
-        # Get AI provider status for response
-        provider_status = ai_service.get_provider_status()
+        # Verify project exists
+        project = Project.query.get(project_id)
+        if not project:
+            return jsonify({'error': 'Project not found'}), 404
         
-        return jsonify({
-            'generated_cases': response_cases,
-            'count': len(response_cases),
-            'generated_at': datetime.now(timezone.utc).isoformat(),
-            'status': 'success',
-            'ai_provider': provider_status['primary_provider'],
-            'provider_details': provider_status.get('provider_details', {}),
-            'stored_in_database': True
-        })
+        # A worker thread calls the AI provider; this request only queues the job
+        job = submit_ai_job(requirements, project_id, test_type, count, bypass_cache)
+        result = job.to_dict()
+        result['status_url'] = url_for('api_ai_job', job_id=job.id)
+        return jsonify(result), 202
         
     except Exception as e:
         db.session.rollback()
         return jsonify({
-            'error': f'Failed to generate test cases: {str(e)}',
+            'error': f'Failed to queue test case generation: {str(e)}',
             'status': 'failed',
             'generated_at': datetime.now(timezone.utc).isoformat()
         }), 500
 
+@app.route('/api/ai-jobs/<job_id>')
+def api_ai_job(job_id):
+    """Status of a generation queued with POST /api/ai-generate, with its test cases once completed"""
+    job = AIJob.query.get_or_404(job_id)
+    if job.status == 'Queued' and ai_job_pool is not None:
+        ai_job_pool.ensure_started()
+    return jsonify(ai_job_result(job))
+
+@app.route('/api/ai-jobs/<job_id>/events')
+def api_ai_job_events(job_id):
+    """Server-Sent Events: each test case of a generation job as soon as it is stored"""
+    job = AIJob.query.get_or_404(job_id)
+    if job.status == 'Queued' and ai_job_pool is not None:
+        ai_job_pool.ensure_started()
+    events = job_events(job.id, request.headers.get('Last-Event-ID'))
+    return Response(stream_with_context(events), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'     # Let reverse proxies pass events through
+    })
+
 # Test Runs API
 @app.route('/api/test-runs', methods=['GET', 'POST'])
+@cached_response('test_runs', 'test_results', 'archived_runs')
 def api_test_runs():
-    """Test runs CRUD API"""
+    """Test runs CRUD API (?archived=1 lists archived run summaries)"""
     if request.method == 'GET':
-        # Filter by status if provided
-        status = request.args.get('status')
-        
-        query = TestRun.query
-        if status:
-            query = query.filter_by(status=status)
+        # Build filtered query (shared with query_plan_check.py) and fetch one page
+        try:
+            if request.args.get('archived') not in ('1', 'true'):
+                return json_response(test_run_page(request.args))
+            test_runs, next_cursor = fetch_page(archived_run_query(request.args), request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        test_runs = query.order_by(TestRun.created_at.desc()).all()
-        return jsonify([tr.to_dict() for tr in test_runs])
+        return jsonify({
+            'items': [tr.to_dict() for tr in test_runs],
+            'next_cursor': next_cursor
+        })
     
     elif request.method == 'POST':
         try:
@@ -544,6 +860,9 @@ def api_test_runs():
             if not data or not data.get('name', '').strip():
                 return jsonify({'error': 'Test run name is required'}), 400
             
+            if not data.get('test_suite_id') or not db.session.get(TestSuite, data['test_suite_id']):
+                return jsonify({'error': 'A valid test_suite_id is required'}), 400
+            
             # Create new test run
             test_run = TestRun(
                 name=data.get('name', '').strip(),
@@ -566,6 +885,30 @@ def api_test_runs():
             db.session.rollback()
             return jsonify({'error': f'Error creating test run: {str(e)}'}), 500
 
+@app.route('/api/test-runs/trends')
+@cached_response('test_runs', 'test_results', 'archived_runs', 'test_suites')
+def api_test_run_trends():
+    """Runs and result outcomes per day, including archived runs (?project_id=, ?days=)"""
+    try:
+        days = int(request.args.get('days', 90))
+    except ValueError:
+        return jsonify({'error': 'days must be an integer'}), 400
+    since = datetime.utcnow() - timedelta(days=days) if days > 0 else None
+    return jsonify({'days': run_trends(request.args.get('project_id'), since)})
+
+@app.route('/api/test-runs/<test_run_id>')
+def api_test_run_detail(test_run_id):
+    """One test run; runs moved to the archive are read back from their segment"""
+    test_run = db.session.get(TestRun, test_run_id)
+    if test_run is not None:
+        return jsonify(test_run.to_dict())
+    
+    archived = ArchivedRun.query.get_or_404(test_run_id)
+    try:
+        return jsonify(read_archived_run(app_config.ARCHIVE_DIR, archived))
+    except (OSError, ValueError) as e:
+        return jsonify({'error': f'Error reading archived test run: {str(e)}'}), 500
+
 @app.route('/api/test-runs/<test_run_id>/start', methods=['POST'])
 def api_start_test_run(test_run_id):
     """Start a test run"""
@@ -620,21 +963,71 @@ def api_complete_test_run(test_run_id):
         db.session.rollback()
         return jsonify({'error': f'Error completing test run: {str(e)}'}), 500
 
+# Import API
+@app.route('/api/import/test-cases', methods=['POST'])
+def api_import_test_cases():
+    """Upload a CSV, NDJSON or TestRail/Zephyr XML file; imports in the background"""
+    upload = request.files.get('file')
+    project_id = request.form.get('project_id')
+    if upload is None or not upload.filename:
+        return jsonify({'error': 'A file upload is required'}), 400
+    if not project_id or not Project.query.get(project_id):
+        return jsonify({'error': 'Project not found'}), 404
+    import_format = request.form.get('format') or detect_format(upload.filename)
+    if import_format not in PARSERS:
+        return jsonify({'error': f"Unsupported format; use one of: {', '.join(PARSERS)}"}), 400
+    
+    try:
+        job = ImportJob(filename=upload.filename, format=import_format, project_id=project_id)
+        db.session.add(job)
+        db.session.flush()
+        path = os.path.join('uploads', f'import-{job.id}')
+        upload.save(path)
+        job.bytes_total = os.path.getsize(path)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Error saving upload: {str(e)}'}), 500
+    
+    threading.Thread(target=run_import_job, args=(app, job.id, path), daemon=True).start()
+    return jsonify(job.to_dict()), 202
+
+@app.route('/api/import/jobs/<job_id>')
+def api_import_job(job_id):
+    """Progress of an import started with POST /api/import/test-cases"""
+    return jsonify(ImportJob.query.get_or_404(job_id).to_dict())
+
+# Export API
+@app.route('/api/export/<any("test-cases", "test-runs"):kind>')
+def api_export(kind):
+    """Stream test cases or test runs as NDJSON or CSV (?format=, ?gzip=1, ?after_id= to resume)"""
+    try:
+        body, mimetype, filename = export_stream(kind, request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return Response(stream_with_context(body), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'X-Accel-Buffering': 'no'     # Let reverse proxies pass chunks through
+    })
+
 @app.route('/api/dashboard-stats')
+@cached_response('projects', 'test_cases', 'test_suites', 'test_runs', 'test_results')
 def api_dashboard_stats():
     """Dashboard statistics API"""
     try:
+        totals = StatsRollup.totals()
         stats = {
-            'total_projects': Project.query.count(),
-            'total_test_cases': TestCase.query.count(),
-            'total_test_suites': TestSuite.query.count(),
-            'total_test_runs': TestRun.query.count(),
-            'active_test_runs': TestRun.query.filter_by(status='In Progress').count(),
+            'total_projects': rollup_count(totals, 'projects'),
+            'total_test_cases': rollup_count(totals, 'test_cases'),
+            'total_test_suites': rollup_count(totals, 'test_suites'),
+            'total_test_runs': rollup_count(totals, 'test_runs'),
+            'active_test_runs': rollup_count(totals, 'test_run_status', 'In Progress'),
             'recent_activity': [],
             'test_case_stats': {
-                'draft': TestCase.query.filter_by(status='Draft').count(),
-                'approved': TestCase.query.filter_by(status='Approved').count(),
-                'under_review': TestCase.query.filter_by(status='Under Review').count()
+                'draft': rollup_count(totals, 'test_case_status', 'Draft'),
+                'approved': rollup_count(totals, 'test_case_status', 'Approved'),
+                'under_review': rollup_count(totals, 'test_case_status', 'Under Review')
             },
             'health': 'healthy',
             'database': 'sqlite',
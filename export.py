@@ -0,0 +1,196 @@
+"""
+Streaming Export for TestGenie Enterprise
+NDJSON and CSV exports of test cases and test runs with flat memory use
+
+Rows are read in keyset chunks of EXPORT_CHUNK_SIZE plain Core rows (no ORM
+objects) and written to the response chunk by chunk, so worker memory does
+not grow with the size of the export. Each chunk is its own short read
+transaction: a long export never pins a SQLite WAL snapshot.
+
+Exports run newest first on (created_at, id) like the list APIs. To resume an
+interrupted export pass `after_id` (the last id received) or a list-API
+`cursor`; `gzip=1` streams a .gz file instead of plain text.
+"""
+
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+
+from sqlalchemy import select
+
+from models import db, TestCase, TestSuite, TestRun, TestResult, chunked
+from queries import keyset, encode_cursor, filtered_test_cases
+from bulk import stored_list
+
+EXPORT_CHUNK_SIZE = 1000
+
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv', 'csv'),
+}
+
+TEST_CASE_COLUMNS = ('id', 'title', 'description', 'steps', 'expected_result', 'priority', 'status',
+                     'tags', 'project_id', 'created_by', 'created_at', 'updated_at')
+TEST_RUN_COLUMNS = ('id', 'name', 'test_suite_id', 'status', 'executed_by', 'started_at',
+                    'completed_at', 'created_at')
+TEST_RESULT_COLUMNS = ('test_case_id', 'outcome', 'duration_ms', 'recorded_at')
+
+
+def iso(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def resume_cursor(model, args):
+    """Keyset cursor to start from: ?cursor= as given, or the position of ?after_id="""
+    after_id = args.get('after_id')
+    if not after_id:
+        return args.get('cursor')
+    created_at = db.session.execute(
+        select(model.created_at).where(model.id == after_id)).scalar_one_or_none()
+    if created_at is None:
+        raise ValueError('after_id not found')
+    return encode_cursor(created_at, after_id)
+
+
+def keyset_chunks(query, model, columns, cursor=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield lists of row mappings in keyset order, one short query per chunk"""
+    while True:
+        # Mapped attributes (not table columns) keep the query subject to ORM criteria
+        page = keyset(query, model, {'cursor': cursor}).with_entities(
+            *[getattr(model, name) for name in columns]).limit(chunk_size)
+        rows = [row._mapping for row in page]
+        # End the read transaction between chunks
+        db.session.rollback()
+        if not rows:
+            return
+        yield rows
+        if len(rows) < chunk_size:
+            return
+        cursor = encode_cursor(rows[-1]['created_at'], rows[-1]['id'])
+
+
+def test_case_export_query(args):
+    """Test cases matching the /api/test-cases filters (search narrows, order stays by date)"""
+    query, _ = filtered_test_cases(args)
+    return query
+
+
+def test_run_export_query(args):
+    """Test runs filtered by ?status=, ?test_suite_id= and ?project_id="""
+    query = TestRun.query
+    if args.get('status'):
+        query = query.filter(TestRun.status == args['status'])
+    if args.get('test_suite_id'):
+        query = query.filter(TestRun.test_suite_id == args['test_suite_id'])
+    if args.get('project_id'):
+        suites = select(TestSuite.id).where(TestSuite.project_id == args['project_id'])
+        query = query.filter(TestRun.test_suite_id.in_(suites))
+    return query
+
+
+def test_case_records(chunks):
+    """Chunks of test case rows as to_dict()-shaped records"""
+    for rows in chunks:
+        records = []
+        for row in rows:
+            record = {name: iso(row[name]) for name in TEST_CASE_COLUMNS}
+            record['steps'] = stored_list(row['steps'])
+            record['tags'] = stored_list(row['tags'])
+            records.append(record)
+        yield records
+
+
+def test_run_records(chunks):
+    """Chunks of test run rows with their results attached (one query per chunk)"""
+    results = TestResult.__table__
+    for rows in chunks:
+        by_run = {}
+        for ids in chunked([row['id'] for row in rows]):
+            for result in db.session.execute(
+                    select(results.c.test_run_id, *[results.c[name] for name in TEST_RESULT_COLUMNS])
+                    .where(results.c.test_run_id.in_(ids))
+                    .order_by(results.c.test_run_id, results.c.id)):
+                by_run.setdefault(result.test_run_id, []).append(
+                    {name: iso(result._mapping[name]) for name in TEST_RESULT_COLUMNS})
+        db.session.rollback()
+        yield [dict({name: iso(row[name]) for name in TEST_RUN_COLUMNS}, results=by_run.get(row['id'], []))
+               for row in rows]
+
+
+def ndjson_chunks(record_chunks):
+    """One JSON document per line"""
+    for records in record_chunks:
+        yield ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records)
+
+
+def csv_chunks(record_chunks, columns, nested=None, nested_columns=(), nested_prefix=''):
+    """CSV with a header row; lists are written as JSON text
+
+    With nested (e.g. 'results') every nested item becomes its own row,
+    repeating the parent columns; parents without items get one row.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(list(columns) + [nested_prefix + name for name in nested_columns])
+    yield buffer.getvalue()
+    for records in record_chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        for record in records:
+            parent = [json.dumps(record[name]) if isinstance(record[name], list) else record[name]
+                      for name in columns]
+            children = (record[nested] or [{}]) if nested else [{}]
+            for child in children:
+                writer.writerow(parent + [child.get(name) for name in nested_columns])
+        yield buffer.getvalue()
+
+
+def gzip_chunks(text_chunks):
+    """Compress a text stream to gzip, flushing after every chunk so output keeps flowing"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for text in text_chunks:
+        data = compressor.compress(text.encode('utf-8')) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def encoded_chunks(text_chunks):
+    for text in text_chunks:
+        yield text.encode('utf-8')
+
+
+def export_stream(kind, args):
+    """(body iterator, mimetype, filename) for an export of 'test-cases' or 'test-runs'
+
+    Raises ValueError for invalid parameters before anything is streamed.
+    """
+    export_format = args.get('format', 'ndjson').lower()
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    mimetype, extension = EXPORT_FORMATS[export_format]
+
+    if kind == 'test-cases':
+        model, columns = TestCase, TEST_CASE_COLUMNS
+        query = test_case_export_query(args)
+    else:
+        model, columns = TestRun, TEST_RUN_COLUMNS
+        query = test_run_export_query(args)
+    cursor = resume_cursor(model, args)
+
+    chunks = keyset_chunks(query, model, columns, cursor)
+    records = test_case_records(chunks) if kind == 'test-cases' else test_run_records(chunks)
+    if export_format == 'csv':
+        if kind == 'test-cases':
+            text = csv_chunks(records, columns)
+        else:
+            text = csv_chunks(records, columns, 'results', TEST_RESULT_COLUMNS, 'result_')
+    else:
+        text = ndjson_chunks(records)
+
+    filename = f'{kind}.{extension}'
+    if args.get('gzip') in ('1', 'true'):
+        return gzip_chunks(text), 'application/gzip', filename + '.gz'
+    return encoded_chunks(text), mimetype, filename
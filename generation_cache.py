@@ -0,0 +1,231 @@
+"""
+AI Generation Cache for TestGenie Enterprise
+Content-addressed cache of generated test cases, in front of the AI providers
+
+Entries are keyed by a SHA-256 of the normalized generation prompt (which
+already holds the requirements, test type and count) and the model
+parameters (providers, models, temperature, max tokens), so an identical
+request is answered without calling the provider. Two tiers:
+
+    memory  - In-process LRU (AI_CACHE_MEMORY_ENTRIES entries)
+    sqlite  - A separate SQLite file (AI_CACHE_PATH) shared by every process,
+              trimmed to AI_CACHE_MAX_MB by least recent use
+
+Entries expire after AI_CACHE_TTL_SECONDS in both tiers. Only complete model
+output is cached - never mock or fallback cases, nor a completion that stopped
+short of the requested count - and only the test case fields, so every hit
+gets fresh ids and timestamps. Token savings are estimated at four characters
+per token of prompt plus completion.
+
+Settings (environment):
+    AI_CACHE_ENABLED        - true/false (default true)
+    AI_CACHE_PATH           - SQLite file (default data/ai_cache.db)
+    AI_CACHE_TTL_SECONDS    - entry lifetime (default 604800, 7 days)
+    AI_CACHE_MAX_MB         - SQLite tier size limit (default 50)
+    AI_CACHE_MEMORY_ENTRIES - memory tier size (default 256)
+
+Usage:
+    python generation_cache.py stats   - Entries and size of the SQLite tier
+    python generation_cache.py clear   - Empty both tiers and the semantic index (semantic_cache.py)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Test case fields kept in the cache; ids, timestamps and project come from the request
+CACHED_FIELDS = ('title', 'description', 'steps', 'expected_result', 'priority', 'tags')
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_prompt(prompt):
+    """Prompt with whitespace runs collapsed, so formatting differences share an entry"""
+    return _WHITESPACE.sub(' ', prompt).strip()
+
+
+def generation_key(prompt, parameters):
+    """Content address of a generation: normalized prompt plus model parameters"""
+    payload = json.dumps({'prompt': normalize_prompt(prompt), 'parameters': parameters}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token for English text)"""
+    return max(1, len(text) // 4)
+
+
+class GenerationCache:
+    """Memory LRU over a SQLite file, both with TTL"""
+
+    def __init__(self, path, ttl_seconds=604800, max_bytes=50 * 1024 * 1024, memory_entries=256):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()  # key -> (expires_at, cases, tokens)
+        self._lock = threading.Lock()
+        self._stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0,
+                       'expirations': 0, 'saved_tokens': 0}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS generations ('
+                ' key TEXT PRIMARY KEY, cases TEXT NOT NULL, tokens INTEGER NOT NULL,'
+                ' size INTEGER NOT NULL, created_at REAL NOT NULL, last_used REAL NOT NULL, hits INTEGER DEFAULT 0)')
+            connection.execute('CREATE INDEX IF NOT EXISTS ix_generations_last_used ON generations (last_used)')
+
+    @contextmanager
+    def _connect(self):
+        """Short-lived connection; one transaction, committed on success"""
+        connection = sqlite3.connect(self.path, timeout=10)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def _remember(self, key, expires_at, cases, tokens):
+        with self._lock:
+            self._memory[key] = (expires_at, cases, tokens)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def get(self, key):
+        """(cases, tokens) stored for key, or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self._stats['memory_hits'] += 1
+                    self._stats['saved_tokens'] += entry[2]
+                    return entry[1], entry[2]
+                del self._memory[key]
+                self._stats['expirations'] += 1
+
+        with self._connect() as connection:
+            row = connection.execute('SELECT cases, tokens, created_at FROM generations WHERE key = ?',
+                                     (key,)).fetchone()
+            if row is not None and row[2] + self.ttl_seconds <= now:
+                connection.execute('DELETE FROM generations WHERE key = ?', (key,))
+                self._count('expirations')
+                row = None
+            if row is None:
+                self._count('misses')
+                return None
+            connection.execute('UPDATE generations SET last_used = ?, hits = hits + 1 WHERE key = ?', (now, key))
+
+        cases, tokens = json.loads(row[0]), row[1]
+        self._remember(key, row[2] + self.ttl_seconds, cases, tokens)
+        self._count('disk_hits')
+        self._count('saved_tokens', tokens)
+        return cases, tokens
+
+    def set(self, key, cases, tokens):
+        """Store generated cases (only CACHED_FIELDS are kept) in both tiers"""
+        cases = [{name: case[name] for name in CACHED_FIELDS if name in case} for case in cases]
+        payload = json.dumps(cases)
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO generations (key, cases, tokens, size, created_at, last_used) '
+                'VALUES (?, ?, ?, ?, ?, ?)', (key, payload, tokens, len(payload), now, now))
+            self._trim(connection, now)
+        self._remember(key, now + self.ttl_seconds, cases, tokens)
+        self._count('stores')
+
+    def _trim(self, connection, now):
+        """Drop expired rows, then least recently used ones until the file tier fits max_bytes"""
+        expired = connection.execute('DELETE FROM generations WHERE created_at <= ?',
+                                     (now - self.ttl_seconds,)).rowcount
+        self._count('expirations', expired)
+        total = connection.execute('SELECT COALESCE(SUM(size), 0) FROM generations').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in connection.execute('SELECT key, size FROM generations ORDER BY last_used').fetchall():
+            if total <= self.max_bytes:
+                break
+            connection.execute('DELETE FROM generations WHERE key = ?', (key,))
+            total -= size
+            evicted += 1
+        self._count('evictions', evicted)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        with self._connect() as connection:
+            connection.execute('DELETE FROM generations')
+
+    def stats(self):
+        """Counters of this process plus the size of the SQLite tier"""
+        with self._lock:
+            stats = dict(self._stats, memory_entries=len(self._memory))
+        with self._connect() as connection:
+            entries, size = connection.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM generations').fetchone()
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats.update(enabled=True, disk_entries=entries, disk_bytes=size, max_bytes=self.max_bytes,
+                     ttl_seconds=self.ttl_seconds,
+                     hit_rate=round((stats['memory_hits'] + stats['disk_hits']) / lookups, 4) if lookups else None)
+        return stats
+
+
+def create_generation_cache():
+    """Cache configured by the AI_CACHE_* environment variables, or None when disabled"""
+    if os.getenv('AI_CACHE_ENABLED', 'true').lower() != 'true':
+        return None
+    try:
+        return GenerationCache(
+            os.getenv('AI_CACHE_PATH', os.path.join('data', 'ai_cache.db')),
+            ttl_seconds=int(os.getenv('AI_CACHE_TTL_SECONDS', 604800)),
+            max_bytes=int(float(os.getenv('AI_CACHE_MAX_MB', 50)) * 1024 * 1024),
+            memory_entries=int(os.getenv('AI_CACHE_MEMORY_ENTRIES', 256))
+        )
+    except Exception as e:
+        logger.error(f"❌ AI generation cache unavailable: {e}")
+        return None
+
+
+if __name__ == '__main__':
+    import sys
+
+    command = sys.argv[1] if len(sys.argv) > 1 else ''
+    cache = create_generation_cache()
+    if cache is None:
+        sys.exit("❌ AI generation cache is disabled (AI_CACHE_ENABLED)")
+    if command == 'stats':
+        stats = cache.stats()
+        print(f"🗃️ {stats['disk_entries']} cached generations, {stats['disk_bytes'] / 1024:,.1f} KB "
+              f"in {cache.path}")
+    elif command == 'clear':
+        from semantic_cache import create_semantic_index
+
+        cache.clear()
+        index = create_semantic_index(cache)
+        if index is not None:
+            index.clear()
+        print(f"✅ Cleared {cache.path}")
+    else:
+        print(__doc__)
+        sys.exit(1)
@@ -0,0 +1,78 @@
+"""
+AI Generation Sharding Check for TestGenie Enterprise
+Checks how large generation counts are split into shards (ai_service.py)
+
+For every count up to AI_GENERATE_MAX_COUNT, the shards must add up to the
+count, each fit in AI_MAX_TOKENS, run in one round of AI_SHARD_PARALLELISM
+calls whenever the token budget allows, and send pairwise different prompts
+steered by aspect (never by a slice of the requirements), so no provider call
+repeats another one. No provider is called: a stand-in client only makes the
+service take the sharded path.
+
+Usage:
+    python generation_check.py
+"""
+
+import os
+import sys
+
+os.environ['AI_CACHE_ENABLED'] = 'false'
+
+
+def check(condition, label, failures):
+    print(f"{'✅' if condition else '❌'} {label}")
+    if not condition:
+        failures.append(label)
+
+
+def main():
+    from azure_config import get_config
+    from ai_service import ai_service
+
+    ai_service.providers = {'azure': object()}
+    ai_service.primary_provider = 'azure'
+    max_count = get_config().AI_GENERATE_MAX_COUNT
+
+    print("🧪 TestGenie Generation Sharding Check")
+    per_call = ai_service._cases_per_call()
+    print(f"   shard size: {ai_service.shard_size}   parallelism: {ai_service.shard_parallelism}   "
+          f"cases per call: {per_call}   counts: 1-{max_count}")
+    print("=" * 50)
+    failures = []
+    wrong_totals, oversized, extra_rounds, repeated, sliced = [], [], [], [], []
+    for count in range(1, max_count + 1):
+        shards = ai_service._shards(count)
+        if sum(shard.count if shard else count for shard in shards) != count:
+            wrong_totals.append(count)
+        if len(shards) > 1 and max(shard.count for shard in shards) > per_call:
+            oversized.append(count)
+        if len(shards) > max(ai_service.shard_parallelism, -(-count // per_call)):
+            extra_rounds.append(count)
+        prompts = [ai_service._create_test_generation_prompt('Users log in with e-mail and password', 'functional',
+                                                             shard.count if shard else count, shard)
+                   for shard in shards]
+        if len(set(prompts)) != len(prompts):
+            repeated.append(count)
+        if any('part' in prompt.split('Guidelines:')[1] for prompt in prompts):
+            sliced.append(count)
+
+    check(not wrong_totals, f'shards add up to the requested count {wrong_totals[:5]}', failures)
+    check(not oversized, f'no shard exceeds the {per_call} cases that fit in AI_MAX_TOKENS {oversized[:5]}', failures)
+    check(not extra_rounds, f'shards need more than one round only when AI_MAX_TOKENS requires it '
+                            f'{extra_rounds[:5]}', failures)
+    check(not repeated, f'prompts within one generation are all different {repeated[:5]}', failures)
+    check(not sliced, f'prompts never split the requirements into parts {sliced[:5]}', failures)
+    largest = ai_service._shards(max_count)
+    check(largest[0].count >= min(per_call, -(-max_count // ai_service.shard_parallelism)),
+          f'{max_count} cases use {len(largest)} shards of up to {largest[0].count}', failures)
+    unsharded = ai_service._create_test_generation_prompt('x', 'functional', ai_service.shard_size)
+    check(ai_service._shards(ai_service.shard_size) == [None] and 'Cover only' not in unsharded,
+          'small counts keep the single unsteered prompt', failures)
+
+    print()
+    print(f"📊 {len(failures)} failed checks")
+    return failures
+
+
+if __name__ == '__main__':
+    sys.exit(1 if main() else 0)
@@ -0,0 +1,366 @@
+"""
+Test Case Import for TestGenie Enterprise
+Streams CSV, NDJSON and TestRail / Zephyr Scale XML exports into a project
+
+Files are parsed incrementally (csv reader, one JSON document per line,
+iterparse for XML with every case element freed once read) and written with
+bulk.bulk_create_test_cases in batches of IMPORT_BATCH_SIZE, one short
+transaction per batch. Memory stays bounded by the batch size and other
+writers get the SQLite write lock between batches.
+
+Columns are mapped to TestCase fields by name (FIELD_ALIASES), so exports
+from /api/export, TestRail and Zephyr Scale CSVs import without a mapping.
+
+Usage:
+    python importer.py <file> --project <project_id> [--format csv|ndjson|xml]
+                       [--batch 1000] [--map title=Summary ...]
+"""
+
+import csv
+import io
+import json
+import logging
+import os
+import re
+import sys
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+from models import db, Project, ImportJob
+from bulk import bulk_create_test_cases
+
+logger = logging.getLogger(__name__)
+
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+IMPORT_FORMATS = {
+    '.csv': 'csv',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+    '.xml': 'xml',
+}
+
+# Column names (normalized: lower case, spaces for _ and -) per TestCase field
+FIELD_ALIASES = {
+    'title': ('title', 'name', 'summary', 'test case', 'test case name', 'case'),
+    'description': ('description', 'objective', 'preconditions', 'precondition', 'preconds'),
+    'steps': ('steps', 'test steps', 'step', 'steps separated', 'test script (step by step) step'),
+    'expected_result': ('expected result', 'expected results', 'expected', 'expectedresult',
+                        'test script (step by step) expected result'),
+    'priority': ('priority',),
+    'status': ('status', 'state'),
+    'tags': ('tags', 'labels', 'label', 'section', 'folder', 'component', 'components'),
+    'created_by': ('created by', 'author', 'owner'),
+}
+
+PRIORITIES = {
+    'critical': 'High', 'highest': 'High', 'urgent': 'High', 'high': 'High',
+    'medium': 'Medium', 'normal': 'Medium',
+    'low': 'Low', 'lowest': 'Low',
+}
+
+
+class CountingReader(io.RawIOBase):
+    """Binary file wrapper counting the bytes consumed, for progress reporting"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.raw.read(len(buffer))
+        buffer[:len(data)] = data
+        self.bytes_read += len(data)
+        return len(data)
+
+
+def detect_format(filename):
+    return IMPORT_FORMATS.get(os.path.splitext(filename or '')[1].lower())
+
+
+def normalize_header(name):
+    return re.sub(r'\s+', ' ', str(name).replace('_', ' ').replace('-', ' ')).strip().lower()
+
+
+def column_mapping(headers, overrides=None):
+    """{source column: TestCase field} for a set of headers; overrides map field -> column"""
+    mapping = {}
+    taken = set()
+    for field, column in (overrides or {}).items():
+        mapping[column] = field
+        taken.add(field)
+    for header in headers:
+        if header in mapping:
+            continue
+        name = normalize_header(header)
+        for field, aliases in FIELD_ALIASES.items():
+            if field not in taken and name in aliases:
+                mapping[header] = field
+                taken.add(field)
+                break
+    return mapping
+
+
+def parse_list(value, separators):
+    """A list from a JSON array, a list, or text split on the separator pattern"""
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if str(item).strip()]
+    text = str(value).strip()
+    if text.startswith('['):
+        try:
+            return parse_list(json.loads(text), separators)
+        except json.JSONDecodeError:
+            pass
+    return [part.strip() for part in re.split(separators, text) if part.strip()]
+
+
+def to_item(fields):
+    """Clean mapped values into a bulk_create_test_cases item"""
+    item = {}
+    for field in ('title', 'description', 'expected_result', 'status', 'created_by'):
+        value = fields.get(field)
+        if value is not None and str(value).strip():
+            item[field] = str(value).strip()
+    if fields.get('priority'):
+        priority = str(fields['priority']).strip()
+        # TestRail numbers its priorities ("1 - Critical")
+        key = priority.split('-', 1)[-1].strip().lower()
+        item['priority'] = PRIORITIES.get(key, priority)
+    steps = parse_list(fields.get('steps'), r'\r?\n')
+    if steps:
+        item['steps'] = steps
+    tags = parse_list(fields.get('tags'), r'[,;\r\n]')
+    if tags:
+        item['tags'] = tags
+    return item
+
+
+def iter_csv(stream, overrides=None):
+    """(row number, item) for each CSV row; the header row maps the columns"""
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    mapping = column_mapping(reader.fieldnames or [], overrides)
+    for row in reader:
+        yield reader.line_num, to_item({field: row.get(column) for column, field in mapping.items()})
+
+
+def iter_ndjson(stream, overrides=None):
+    """(line number, item) for each JSON object line; invalid lines yield an error string"""
+    mapping, keys = None, None
+    for number, line in enumerate(io.TextIOWrapper(stream, encoding='utf-8-sig'), start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield number, f'Invalid JSON: {e}'
+            continue
+        if not isinstance(record, dict):
+            yield number, 'Line is not a JSON object'
+            continue
+        if list(record) != keys:
+            keys = list(record)
+            mapping = column_mapping(keys, overrides)
+        yield number, to_item({field: record.get(column) for column, field in mapping.items()})
+
+
+def local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def child_text(element, path):
+    found = element.find(path)
+    return found.text.strip() if found is not None and found.text else None
+
+
+def testrail_item(case, section):
+    """Item from a TestRail <case> element (steps from custom/steps_separated or custom/steps)"""
+    steps, expected = [], []
+    for step in case.iterfind('custom/steps_separated/step'):
+        if child_text(step, 'content'):
+            steps.append(child_text(step, 'content'))
+        if child_text(step, 'expected'):
+            expected.append(child_text(step, 'expected'))
+    return to_item({
+        'title': child_text(case, 'title'),
+        'description': child_text(case, 'custom/preconds'),
+        'steps': steps or child_text(case, 'custom/steps'),
+        'expected_result': child_text(case, 'custom/expected') or '\n'.join(expected),
+        'priority': child_text(case, 'priority'),
+        'tags': [section] if section else None,
+    })
+
+
+def zephyr_item(case):
+    """Item from a Zephyr Scale <testCase> element"""
+    steps, expected = [], []
+    for step in case.iterfind('testScript/steps/step'):
+        if child_text(step, 'description'):
+            steps.append(child_text(step, 'description'))
+        if child_text(step, 'expectedResult'):
+            expected.append(child_text(step, 'expectedResult'))
+    labels = [label.text.strip() for label in case.iterfind('labels/label') if label.text]
+    folder = child_text(case, 'folder')
+    return to_item({
+        'title': child_text(case, 'name'),
+        'description': child_text(case, 'objective') or child_text(case, 'precondition'),
+        'steps': steps,
+        'expected_result': '\n'.join(expected),
+        'priority': child_text(case, 'priority'),
+        'status': child_text(case, 'status'),
+        'tags': labels + ([folder.strip('/')] if folder else []),
+    })
+
+
+def iter_xml(stream, overrides=None):
+    """(case number, item) for each TestRail <case> or Zephyr Scale <testCase>
+
+    Each case element is removed from the tree once read, so memory does not
+    grow with the file.
+    """
+    path = []          # Open elements, outermost first
+    sections = []      # Names of the open TestRail sections
+    number = 0
+    for event, element in ET.iterparse(stream, events=('start', 'end')):
+        tag = local_name(element.tag)
+        if event == 'start':
+            path.append(element)
+            if tag == 'section':
+                sections.append(None)
+            continue
+
+        path.pop()
+        parent = path[-1] if path else None
+        if tag == 'name' and parent is not None and local_name(parent.tag) == 'section' and sections:
+            sections[-1] = (element.text or '').strip()
+        elif tag == 'section':
+            sections.pop()
+            if parent is not None:
+                parent.remove(element)
+        elif tag in ('case', 'testCase'):
+            number += 1
+            section = next((name for name in reversed(sections) if name), None)
+            yield number, testrail_item(element, section) if tag == 'case' else zephyr_item(element)
+            if parent is not None:
+                parent.remove(element)
+
+
+PARSERS = {'csv': iter_csv, 'ndjson': iter_ndjson, 'xml': iter_xml}
+
+
+def import_test_cases(stream, project_id, import_format, batch_size=IMPORT_BATCH_SIZE,
+                      overrides=None, progress=None):
+    """Import test cases from a binary stream into a project
+
+    progress(summary) is called after every committed batch. Returns the
+    summary: records read, imported and failed, the first errors (with the
+    record's line or case number) and bytes read.
+    """
+    if import_format not in PARSERS:
+        raise ValueError(f"format must be one of: {', '.join(PARSERS)}")
+    if db.session.get(Project, project_id) is None:
+        raise ValueError('Project not found')
+
+    reader = CountingReader(stream)
+    summary = {'records_read': 0, 'imported': 0, 'failed': 0, 'errors': [], 'bytes_read': 0}
+
+    def report(position, error):
+        summary['failed'] += 1
+        if len(summary['errors']) < MAX_REPORTED_ERRORS:
+            summary['errors'].append({'record': position, 'error': error})
+
+    def flush(batch):
+        result = bulk_create_test_cases([item for _, item in batch], chunk_size=batch_size)
+        summary['imported'] += result['succeeded']
+        for error in result['errors']:
+            report(batch[error['index']][0], error['error'])
+        summary['bytes_read'] = reader.bytes_read
+        if progress:
+            progress(summary)
+
+    batch = []
+    for position, item in PARSERS[import_format](io.BufferedReader(reader), overrides):
+        summary['records_read'] += 1
+        if isinstance(item, str):
+            report(position, item)
+            continue
+        item['project_id'] = project_id
+        batch.append((position, item))
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    flush(batch)
+    return summary
+
+
+def run_import_job(app, job_id, path):
+    """Import an uploaded file for an ImportJob, recording progress on the job row"""
+    with app.app_context():
+        job = db.session.get(ImportJob, job_id)
+        job.status = 'Running'
+        db.session.commit()
+
+        def progress(summary):
+            job.records_read = summary['records_read']
+            job.imported = summary['imported']
+            job.failed = summary['failed']
+            job.bytes_read = summary['bytes_read']
+            job.errors = json.dumps(summary['errors'])
+            db.session.commit()
+
+        try:
+            with open(path, 'rb') as stream:
+                summary = import_test_cases(stream, job.project_id, job.format, progress=progress)
+            progress(summary)
+            job.status = 'Completed'
+            logger.info(f"✅ Import {job_id}: {summary['imported']} test cases, {summary['failed']} failed")
+        except Exception as e:
+            db.session.rollback()
+            job.status = 'Failed'
+            job.message = str(e)
+            logger.error(f"❌ Import {job_id} failed: {e}")
+        finally:
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Import test cases from CSV, NDJSON or TestRail/Zephyr XML')
+    parser.add_argument('file')
+    parser.add_argument('--project', required=True, help='target project id')
+    parser.add_argument('--format', choices=sorted(PARSERS), help='default: from the file extension')
+    parser.add_argument('--batch', type=int, default=IMPORT_BATCH_SIZE, help='test cases per transaction')
+    parser.add_argument('--map', action='append', default=[], metavar='FIELD=COLUMN',
+                        help='map a source column to a test case field')
+    args = parser.parse_args()
+
+    import_format = args.format or detect_format(args.file)
+    if import_format is None:
+        sys.exit(f"❌ Cannot tell the format of {args.file}; pass --format")
+    overrides = dict(entry.split('=', 1) for entry in args.map)
+    total = os.path.getsize(args.file)
+
+    from enterprise_test_platform_sqlite import app
+
+    def show(summary):
+        print(f"📥 {summary['bytes_read'] / total:6.1%}  read {summary['records_read']}, "
+              f"imported {summary['imported']}, failed {summary['failed']}", flush=True)
+
+    with app.app_context():
+        print(f"🚀 Importing {args.file} ({import_format}) into project {args.project}")
+        try:
+            with open(args.file, 'rb') as stream:
+                summary = import_test_cases(stream, args.project, import_format, args.batch, overrides, show)
+        except ValueError as e:
+            sys.exit(f"❌ {e}")
+        for error in summary['errors']:
+            print(f"⚠️ Record {error['record']}: {error['error']}")
+        print(f"✅ Imported {summary['imported']} test cases ({summary['failed']} failed)")
@@ -16,25 +16,33 @@ def init_database():
     # Import Flask and models
     from flask import Flask
     from models import db, Project, TestCase, TestSuite, TestRun, User
+    from migrations import run_migrations
+    from azure_config import get_config
+    from storage import engine_options, apply_storage_profile
     
     # Create Flask app
     app = Flask(__name__)
+    app_config = get_config()
     
     # Configure database
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///testgenie.db'
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(
+        app.config['SQLALCHEMY_DATABASE_URI'], app_config, app_config.SQLITE_PROFILE)
     
     # Initialize database
     db.init_app(app)
     
     with app.app_context():
+        apply_storage_profile(db.engine, app_config.SQLITE_PROFILE)
         print("🗄️ Creating database tables...")
         
         # Drop all tables (for clean start)
         db.drop_all()
         
-        # Create all tables
+        # Create all tables and mark migrations as applied
         db.create_all()
+        run_migrations()
         
         print("✅ Database tables created successfully!")
         
@@ -194,6 +202,9 @@ def init_database():
         for tc in test_cases:
             db.session.add(tc)
         
+        # Flush to assign test case IDs before building suites
+        db.session.flush()
+        
         # Create sample test suite
         regression_suite = TestSuite(
             name='Regression Test Suite',
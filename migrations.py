@@ -0,0 +1,287 @@
+"""
+Schema Migrations for TestGenie Enterprise
+Ordered, idempotent data migrations applied after db.create_all()
+
+db.create_all() only creates missing tables. Anything that has to touch
+existing rows (backfills, new indexes on old tables) lives here and is
+recorded in the schema_migrations table so it runs exactly once.
+
+Usage:
+    python migrations.py            - Apply pending migrations
+    python migrations.py status     - Show applied / pending migrations
+"""
+
+import json
+import logging
+from datetime import datetime
+
+from sqlalchemy import select, insert, inspect
+
+from models import (db, TestCase, TestSuite, TestSuiteCase, TestRun, TestResult, Tag,
+                    test_case_tags, sync_tag_index, unique_ids, chunked)
+import search
+import stats_rollup
+
+logger = logging.getLogger(__name__)
+
+# Registered migrations as (version, description, function)
+MIGRATIONS = []
+
+BATCH_SIZE = 1000
+
+
+class SchemaMigration(db.Model):
+    __tablename__ = 'schema_migrations'
+
+    version = db.Column(db.Integer, primary_key=True)
+    description = db.Column(db.String(200))
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+def migration(version, description):
+    """Register a migration function taking a SQLAlchemy connection"""
+    def decorator(func):
+        MIGRATIONS.append((version, description, func))
+        MIGRATIONS.sort(key=lambda entry: entry[0])
+        return func
+    return decorator
+
+
+def applied_versions():
+    """Return the set of migration versions already applied"""
+    SchemaMigration.__table__.create(db.engine, checkfirst=True)
+    return {row[0] for row in db.session.execute(select(SchemaMigration.version))}
+
+
+def create_missing_indexes(connection):
+    """Create indexes declared on the models that an older database lacks
+
+    Indexes on columns the database does not have yet are left for the
+    migration that adds those columns.
+    """
+    inspector = inspect(connection)
+    for table in db.metadata.sorted_tables:
+        columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for index in table.indexes:
+            if all(column.name in columns for column in index.columns):
+                index.create(connection, checkfirst=True)
+
+
+def run_migrations():
+    """Apply all pending migrations, each in its own transaction"""
+    done = applied_versions()
+    db.session.commit()
+
+    applied = []
+    for version, description, func in MIGRATIONS:
+        if version in done:
+            continue
+
+        logger.info(f"🔧 Applying migration {version}: {description}")
+        with db.engine.begin() as connection:
+            func(connection)
+            connection.execute(insert(SchemaMigration.__table__).values(
+                version=version,
+                description=description,
+                applied_at=datetime.utcnow()
+            ))
+        applied.append(version)
+
+    if applied:
+        logger.info(f"✅ Applied migrations: {applied}")
+    return applied
+
+
+# Migrations
+
+@migration(1, 'Backfill test_results from legacy TestRun.results JSON')
+def backfill_test_results(connection):
+    runs = TestRun.__table__
+    results = TestResult.__table__
+
+    # Runs that already have normalized rows are skipped
+    already_done = select(results.c.test_run_id).distinct()
+    query = (
+        select(runs.c.id, runs.c.results, runs.c.completed_at, runs.c.started_at, runs.c.created_at)
+        .where(runs.c.results.isnot(None))
+        .where(runs.c.results != '')
+        .where(runs.c.id.notin_(already_done))
+    )
+
+    batch = []
+    for run_id, blob, completed_at, started_at, created_at in connection.execute(
+            query.execution_options(yield_per=BATCH_SIZE)):
+        try:
+            legacy = json.loads(blob)
+        except (json.JSONDecodeError, TypeError):
+            logger.warning(f"⚠️ Skipping unreadable results for test run {run_id}")
+            continue
+        if not isinstance(legacy, dict):
+            continue
+
+        recorded_at = completed_at or started_at or created_at or datetime.utcnow()
+        for test_case_id, value in legacy.items():
+            outcome, duration_ms = TestResult.parse_value(value)
+            batch.append({
+                'test_run_id': run_id,
+                'test_case_id': str(test_case_id),
+                'outcome': outcome,
+                'duration_ms': duration_ms,
+                'recorded_at': recorded_at
+            })
+
+        if len(batch) >= BATCH_SIZE:
+            connection.execute(insert(results), batch)
+            batch = []
+
+    if batch:
+        connection.execute(insert(results), batch)
+
+
+@migration(2, 'Backfill tag index from TestCase.tags JSON')
+def backfill_tag_index(connection):
+    cases = TestCase.__table__
+    already_done = select(test_case_tags.c.test_case_id).distinct()
+    query = (
+        select(cases.c.id, cases.c.project_id, cases.c.tags)
+        .where(cases.c.tags.isnot(None))
+        .where(cases.c.tags != '')
+        .where(cases.c.id.notin_(already_done))
+    )
+
+    # Collect first: sync_tag_index writes to the table being read
+    pending = []
+    for test_case_id, project_id, blob in connection.execute(query).all():
+        try:
+            tags_list = json.loads(blob)
+        except json.JSONDecodeError:
+            tags_list = [blob]
+        if not isinstance(tags_list, list):
+            tags_list = [tags_list]
+        names = Tag.normalize(tags_list)
+        if names:
+            pending.append((test_case_id, project_id, names))
+
+    for start in range(0, len(pending), BATCH_SIZE):
+        sync_tag_index(connection, pending[start:start + BATCH_SIZE])
+
+
+@migration(3, 'Backfill test_suite_cases from TestSuite.test_case_ids JSON')
+def backfill_suite_membership(connection):
+    suites = TestSuite.__table__
+    cases = TestCase.__table__
+    members = TestSuiteCase.__table__
+    already_done = select(members.c.test_suite_id).distinct()
+    query = (
+        select(suites.c.id, suites.c.test_case_ids)
+        .where(suites.c.test_case_ids.isnot(None))
+        .where(suites.c.test_case_ids != '')
+        .where(suites.c.id.notin_(already_done))
+    )
+
+    for suite_id, blob in connection.execute(query).all():
+        try:
+            ids = json.loads(blob)
+        except json.JSONDecodeError:
+            continue
+        ids = unique_ids(ids) if isinstance(ids, list) else []
+
+        # Dangling IDs (deleted test cases) are dropped
+        existing = set()
+        for chunk in chunked(ids):
+            existing.update(connection.execute(
+                select(cases.c.id).where(cases.c.id.in_(chunk))).scalars())
+        rows = [
+            {'test_suite_id': suite_id, 'test_case_id': test_case_id, 'position': position}
+            for position, test_case_id in enumerate(i for i in ids if i in existing)
+        ]
+        for start in range(0, len(rows), BATCH_SIZE):
+            connection.execute(insert(members), rows[start:start + BATCH_SIZE])
+
+
+@migration(4, 'Index foreign keys used for child counts')
+def index_foreign_keys(connection):
+    create_missing_indexes(connection)
+
+
+@migration(5, 'Composite filter/sort indexes for test cases and test runs')
+def composite_filter_indexes(connection):
+    # Superseded by the (project_id, ...) composite indexes
+    connection.exec_driver_sql('DROP INDEX IF EXISTS ix_test_cases_project_id')
+    create_missing_indexes(connection)
+
+
+@migration(6, 'Extend created_at indexes with id for keyset pagination')
+def keyset_pagination_indexes(connection):
+    for name in ('ix_test_cases_project_status_created', 'ix_test_cases_project_created',
+                 'ix_test_cases_status_created', 'ix_test_cases_priority_created',
+                 'ix_test_cases_created', 'ix_test_runs_status_created', 'ix_test_runs_created'):
+        connection.exec_driver_sql(f'DROP INDEX IF EXISTS {name}')
+    create_missing_indexes(connection)
+
+
+@migration(7, 'Full-text search index over test cases')
+def full_text_search_index(connection):
+    try:
+        search.install(connection)
+    except Exception as e:
+        if connection.dialect.name != 'sqlite' or 'fts5' not in str(e).lower():
+            raise
+        # SQLite built without FTS5: search falls back to LIKE matching
+        logger.warning(f"⚠️ FTS5 is not available, full-text search disabled: {e}")
+
+
+
+@migration(8, 'Build stats_rollup from existing rows')
+def build_stats_rollup(connection):
+    stats_rollup.rebuild(connection)
+
+
+@migration(9, 'Add projects.deleting for background project deletion')
+def project_deleting_flag(connection):
+    columns = {column['name'] for column in inspect(connection).get_columns('projects')}
+    if 'deleting' not in columns:
+        connection.exec_driver_sql('ALTER TABLE projects ADD COLUMN deleting BOOLEAN NOT NULL DEFAULT FALSE')
+    create_missing_indexes(connection)
+
+
+@migration(10, 'Add ai_jobs.bypass_cache for the AI generation cache')
+def ai_job_bypass_cache(connection):
+    columns = {column['name'] for column in inspect(connection).get_columns('ai_jobs')}
+    if 'bypass_cache' not in columns:
+        connection.exec_driver_sql('ALTER TABLE ai_jobs ADD COLUMN bypass_cache BOOLEAN NOT NULL DEFAULT FALSE')
+
+
+@migration(11, 'Add ai_jobs.heartbeat_at for renewable AI job leases')
+def ai_job_heartbeat(connection):
+    columns = {column['name'] for column in inspect(connection).get_columns('ai_jobs')}
+    if 'heartbeat_at' not in columns:
+        connection.exec_driver_sql('ALTER TABLE ai_jobs ADD COLUMN heartbeat_at DATETIME')
+    connection.exec_driver_sql(
+        "UPDATE ai_jobs SET heartbeat_at = started_at WHERE status = 'Running' AND heartbeat_at IS NULL")
+
+
+@migration(12, 'Key the search index on test_cases.search_rowid instead of the implicit rowid')
+def stable_search_rowid(connection):
+    if search.backend(connection) != 'fts5':
+        return
+    search.uninstall(connection)
+    search.install(connection)
+
+
+if __name__ == '__main__':
+    import sys
+    from enterprise_test_platform_sqlite import app
+
+    with app.app_context():
+        if len(sys.argv) > 1 and sys.argv[1] == 'status':
+            done = applied_versions()
+            print("🗄️ Schema migrations")
+            print("=" * 50)
+            for version, description, _ in MIGRATIONS:
+                marker = '✅' if version in done else '⏳'
+                print(f"{marker} {version:>3}  {description}")
+        else:
+            # Importing the app already applies pending migrations on startup
+            applied = run_migrations()
+            print(f"✅ Database is up to date ({len(MIGRATIONS)} migrations known)")
@@ -4,20 +4,38 @@ SQLAlchemy models to replace in-memory storage
 """
 
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, select, delete, update, func, true, false
+from sqlalchemy.orm import (Session, attributes, object_session, column_property, with_loader_criteria,
+                            undefer_group)
 from datetime import datetime
 import uuid
 import json
 
 db = SQLAlchemy()
 
+def dialect_insert(table, connection):
+    """INSERT construct for the connection's dialect (supports ON CONFLICT)"""
+    if connection.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
 class Project(db.Model):
     __tablename__ = 'projects'
+    __table_args__ = (
+        db.Index('ix_projects_created', 'created_at', 'id'),
+        # Partial: only the few projects being deleted are indexed
+        db.Index('ix_projects_deleting', 'deleting', sqlite_where=db.text('deleting = 1'),
+                 postgresql_where=db.text('deleting')),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
     created_by = db.Column(db.String(50), default='system')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    deleting = db.Column(db.Boolean, nullable=False, default=False, server_default=false())  # See project_deletion.py
     
     # Relationships
     test_cases = db.relationship('TestCase', backref='project', lazy=True, cascade='all, delete-orphan')
@@ -30,24 +48,37 @@ class Project(db.Model):
             'description': self.description,
             'created_by': self.created_by,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'test_cases_count': len(self.test_cases),
-            'test_suites_count': len(self.test_suites)
+            'test_cases_count': self.test_cases_count or 0,
+            'test_suites_count': self.test_suites_count or 0
         }
 
 class TestCase(db.Model):
     __tablename__ = 'test_cases'
+    # Every /api/test-cases filter combination (project_id, status, priority)
+    # is served by one of these in (created_at, id) order without a sort step,
+    # which keeps keyset pages constant-cost; verified by query_plan_check.py
+    __table_args__ = (
+        db.Index('ix_test_cases_project_status_created', 'project_id', 'status', 'created_at', 'id'),
+        db.Index('ix_test_cases_project_created', 'project_id', 'created_at', 'id'),
+        db.Index('ix_test_cases_status_created', 'status', 'created_at', 'id'),
+        db.Index('ix_test_cases_priority_created', 'priority', 'created_at', 'id'),
+        db.Index('ix_test_cases_created', 'created_at', 'id'),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
     steps = db.Column(db.Text)  # JSON string for steps array
     expected_result = db.Column(db.Text)
-    priority = db.Column(db.String(20), default='Medium')
-    status = db.Column(db.String(20), default='Draft')
+    # active_history: stats_rollup needs the value being replaced, even when
+    # the attribute was expired at the time it was set
+    priority = column_property(db.Column(db.String(20), default='Medium'), active_history=True)
+    status = column_property(db.Column(db.String(20), default='Draft'), active_history=True)
     tags = db.Column(db.Text)  # JSON string for tags array
     
     # Foreign Keys
-    project_id = db.Column(db.String(36), db.ForeignKey('projects.id'), nullable=False)
+    project_id = column_property(db.Column(db.String(36), db.ForeignKey('projects.id'), nullable=False),
+                                 active_history=True)
     
     created_by = db.Column(db.String(50), default='system')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -101,16 +132,92 @@ class TestCase(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+class Tag(db.Model):
+    """Tag dictionary; test cases link to it through test_case_tags"""
+    __tablename__ = 'tags'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)
+    
+    @staticmethod
+    def normalize(tags_list):
+        """Clean a tags list into unique, non-empty names (order preserved)"""
+        names = []
+        for tag in tags_list or []:
+            name = str(tag).strip()[:100]
+            if name and name not in names:
+                names.append(name)
+        return names
+
+# Tag index: project_id is denormalized so per-project tag counts and
+# tag filters inside a project are answered from the index alone
+test_case_tags = db.Table(
+    'test_case_tags',
+    db.Column('test_case_id', db.String(36), db.ForeignKey('test_cases.id'), primary_key=True),
+    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id'), primary_key=True),
+    db.Column('project_id', db.String(36), nullable=False),
+    db.Index('ix_test_case_tags_tag_case', 'tag_id', 'test_case_id'),
+    db.Index('ix_test_case_tags_project_tag', 'project_id', 'tag_id')
+)
+
+def tag_ids_by_name(connection, names, create=False):
+    """{name: tag id} for tag names, inserting missing tags first when create is set"""
+    names = sorted(set(names))
+    if not names:
+        return {}
+    
+    tag_table = Tag.__table__
+    if create:
+        connection.execute(
+            dialect_insert(tag_table, connection).on_conflict_do_nothing(index_elements=['name']),
+            [{'name': name} for name in names]
+        )
+    
+    tag_ids = {}
+    for start in range(0, len(names), 500):
+        rows = connection.execute(select(tag_table.c.name, tag_table.c.id).where(
+            tag_table.c.name.in_(names[start:start + 500])))
+        tag_ids.update(dict(rows.all()))
+    return tag_ids
+
+def sync_tag_index(connection, test_cases):
+    """Rewrite test_case_tags rows for (test_case_id, project_id, names) tuples"""
+    if not test_cases:
+        return
+    
+    ids = [test_case_id for test_case_id, _, _ in test_cases]
+    for start in range(0, len(ids), 500):
+        connection.execute(delete(test_case_tags).where(
+            test_case_tags.c.test_case_id.in_(ids[start:start + 500])))
+    
+    all_names = sorted({name for _, _, names in test_cases for name in names})
+    if not all_names:
+        return
+    
+    tag_ids = tag_ids_by_name(connection, all_names, create=True)
+    
+    links = [
+        {'test_case_id': test_case_id, 'tag_id': tag_ids[name], 'project_id': project_id}
+        for test_case_id, project_id, names in test_cases
+        for name in names
+    ]
+    if links:
+        connection.execute(test_case_tags.insert(), links)
+
 class TestSuite(db.Model):
     __tablename__ = 'test_suites'
+    __table_args__ = (
+        db.Index('ix_test_suites_created', 'created_at', 'id'),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
-    test_case_ids = db.Column(db.Text)  # JSON string for test case IDs array
+    test_case_ids = db.Column(db.Text)  # Legacy JSON array, superseded by test_suite_cases (kept for backfill)
     
     # Foreign Keys
-    project_id = db.Column(db.String(36), db.ForeignKey('projects.id'), nullable=False)
+    project_id = column_property(db.Column(db.String(36), db.ForeignKey('projects.id'), nullable=False, index=True),
+                                 active_history=True)
     
     created_by = db.Column(db.String(50), default='system')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -119,64 +226,237 @@ class TestSuite(db.Model):
     test_runs = db.relationship('TestRun', backref='test_suite', lazy=True, cascade='all, delete-orphan')
     
     def get_test_case_ids(self):
-        """Get test case IDs as a list"""
-        if self.test_case_ids:
-            try:
-                return json.loads(self.test_case_ids)
-            except json.JSONDecodeError:
-                return []
-        return []
+        """Get test case IDs as a list, in suite order"""
+        pending = getattr(self, '_pending_case_ids', None)
+        if pending is not None:
+            return list(pending)
+        
+        session = object_session(self)
+        if session is None or self.id is None:
+            return []
+        
+        members = TestSuiteCase.__table__
+        return list(session.execute(
+            select(members.c.test_case_id)
+            .where(members.c.test_suite_id == self.id)
+            .order_by(members.c.position)
+        ).scalars())
     
     def set_test_case_ids(self, ids_list):
-        """Set test case IDs from a list"""
-        if isinstance(ids_list, list):
-            self.test_case_ids = json.dumps(ids_list)
-        else:
-            self.test_case_ids = '[]'
+        """Set test case IDs from a list, replacing the current membership"""
+        ids = unique_ids(ids_list) if isinstance(ids_list, list) else []
+        
+        session = object_session(self)
+        if session is None or self.id is None or self in session.new:
+            # Written by the after_flush hook once the suite row exists
+            self._pending_case_ids = ids
+            return
+        
+        session.execute(delete(TestSuiteCase.__table__).where(
+            TestSuiteCase.test_suite_id == self.id))
+        self.add_test_cases(ids)
     
-    def to_dict(self):
-        return {
+    def add_test_cases(self, ids_list, index=None):
+        """Insert test cases at an index (default: append); existing members are skipped
+        
+        Returns the list of IDs actually added.
+        """
+        members = TestSuiteCase.__table__
+        session = object_session(self)
+        ids = unique_ids(ids_list)
+        if not ids:
+            return []
+        
+        current = set()
+        for chunk in chunked(ids):
+            current.update(session.execute(
+                select(members.c.test_case_id)
+                .where(members.c.test_suite_id == self.id)
+                .where(members.c.test_case_id.in_(chunk))
+            ).scalars())
+        ids = [test_case_id for test_case_id in ids if test_case_id not in current]
+        if not ids:
+            return []
+        
+        start = self._open_gap(index, len(ids))
+        session.execute(members.insert(), [
+            {'test_suite_id': self.id, 'test_case_id': test_case_id, 'position': start + offset}
+            for offset, test_case_id in enumerate(ids)
+        ])
+        return ids
+    
+    def remove_test_cases(self, ids_list):
+        """Remove test cases from the suite; returns the number of rows removed"""
+        members = TestSuiteCase.__table__
+        session = object_session(self)
+        removed = 0
+        for chunk in chunked(unique_ids(ids_list)):
+            removed += session.execute(
+                delete(members)
+                .where(members.c.test_suite_id == self.id)
+                .where(members.c.test_case_id.in_(chunk))
+            ).rowcount
+        return removed
+    
+    def move_test_cases(self, ids_list, index):
+        """Move existing members so they start at the given index, keeping their given order
+        
+        Returns the list of IDs moved.
+        """
+        members = TestSuiteCase.__table__
+        session = object_session(self)
+        ids = unique_ids(ids_list)
+        
+        present = set()
+        for chunk in chunked(ids):
+            present.update(session.execute(
+                select(members.c.test_case_id)
+                .where(members.c.test_suite_id == self.id)
+                .where(members.c.test_case_id.in_(chunk))
+            ).scalars())
+        ids = [test_case_id for test_case_id in ids if test_case_id in present]
+        if not ids:
+            return []
+        
+        # Park the moved rows out of the way, then reopen a gap for them
+        self.remove_test_cases(ids)
+        start = self._open_gap(index, len(ids))
+        session.execute(members.insert(), [
+            {'test_suite_id': self.id, 'test_case_id': test_case_id, 'position': start + offset}
+            for offset, test_case_id in enumerate(ids)
+        ])
+        return ids
+    
+    def _open_gap(self, index, size):
+        """Make room for `size` rows before the member at `index`; returns the first free position"""
+        members = TestSuiteCase.__table__
+        session = object_session(self)
+        
+        at_position = None
+        if index is not None and index >= 0:
+            at_position = session.execute(
+                select(members.c.position)
+                .where(members.c.test_suite_id == self.id)
+                .order_by(members.c.position)
+                .limit(1).offset(index)
+            ).scalar()
+        
+        if at_position is None:
+            # Append after the current last member
+            last = session.execute(
+                select(func.max(members.c.position)).where(members.c.test_suite_id == self.id)
+            ).scalar()
+            return 0 if last is None else last + 1
+        
+        # Only rows at or after the insertion point are shifted
+        session.execute(
+            update(members)
+            .where(members.c.test_suite_id == self.id)
+            .where(members.c.position >= at_position)
+            .values(position=members.c.position + size)
+        )
+        return at_position
+    
+    def to_dict(self, include_test_cases=True):
+        data = {
             'id': self.id,
             'name': self.name,
             'description': self.description,
-            'test_cases': self.get_test_case_ids(),
             'project_id': self.project_id,
             'created_by': self.created_by,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'test_runs_count': len(self.test_runs)
+            'test_cases_count': self.test_cases_count or 0,
+            'test_runs_count': self.test_runs_count or 0
         }
+        if include_test_cases:
+            data['test_cases'] = self.get_test_case_ids()
+        return data
+
+class TestSuiteCase(db.Model):
+    """Ordered suite membership: one row per (suite, test case)"""
+    __tablename__ = 'test_suite_cases'
+    __table_args__ = (
+        db.Index('ix_test_suite_cases_suite_position', 'test_suite_id', 'position'),
+    )
+    
+    test_suite_id = db.Column(db.String(36), db.ForeignKey('test_suites.id'), primary_key=True)
+    test_case_id = db.Column(db.String(36), db.ForeignKey('test_cases.id'), primary_key=True, index=True)
+    position = db.Column(db.Integer, nullable=False)
+
+def unique_ids(ids_list):
+    """Drop empty and duplicate IDs, keeping order"""
+    seen = set()
+    ids = []
+    for value in ids_list or []:
+        if value and str(value) not in seen:
+            seen.add(str(value))
+            ids.append(str(value))
+    return ids
+
+def chunked(values, size=500):
+    """Split a list into chunks small enough for an IN (...) clause"""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
 
 class TestRun(db.Model):
     __tablename__ = 'test_runs'
+    __table_args__ = (
+        db.Index('ix_test_runs_status_created', 'status', 'created_at', 'id'),
+        db.Index('ix_test_runs_created', 'created_at', 'id'),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     name = db.Column(db.String(100), nullable=False)
-    status = db.Column(db.String(20), default='Not Started')
+    status = column_property(db.Column(db.String(20), default='Not Started'), active_history=True)
     executed_by = db.Column(db.String(50))
     started_at = db.Column(db.DateTime)
     completed_at = db.Column(db.DateTime)
-    results = db.Column(db.Text)  # JSON string for test_case_id -> result mapping
+    results = db.Column(db.Text)  # Legacy JSON blob, superseded by test_results (kept for backfill)
     
     # Foreign Keys
-    test_suite_id = db.Column(db.String(36), db.ForeignKey('test_suites.id'), nullable=False)
+    test_suite_id = column_property(db.Column(db.String(36), db.ForeignKey('test_suites.id'), nullable=False, index=True),
+                                    active_history=True)
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Relationships
+    test_results = db.relationship('TestResult', backref='test_run', lazy=True,
+                                   cascade='all, delete-orphan', order_by='TestResult.id')
+    
     def get_results(self):
-        """Get results as a dictionary"""
-        if self.results:
-            try:
-                return json.loads(self.results)
-            except json.JSONDecodeError:
-                return {}
-        return {}
+        """Get results as a test_case_id -> outcome dictionary"""
+        return {result.test_case_id: result.outcome for result in self.test_results}
     
     def set_results(self, results_dict):
-        """Set results from a dictionary"""
-        if isinstance(results_dict, dict):
-            self.results = json.dumps(results_dict)
-        else:
-            self.results = '{}'
+        """Set results from a test_case_id -> outcome dictionary
+        
+        Values may be plain outcome strings ('Passed', 'Failed', ...) or dicts
+        with an 'outcome' (or 'status') key and an optional 'duration_ms'.
+        """
+        if not isinstance(results_dict, dict):
+            results_dict = {}
+        
+        existing = {result.test_case_id: result for result in self.test_results}
+        now = datetime.utcnow()
+        
+        for test_case_id, value in results_dict.items():
+            outcome, duration_ms = TestResult.parse_value(value)
+            result = existing.pop(str(test_case_id), None)
+            if result is None:
+                self.test_results.append(TestResult(
+                    test_case_id=str(test_case_id),
+                    outcome=outcome,
+                    duration_ms=duration_ms,
+                    recorded_at=now
+                ))
+            elif result.outcome != outcome or result.duration_ms != duration_ms:
+                result.outcome = outcome
+                result.duration_ms = duration_ms
+                result.recorded_at = now
+        
+        # Results no longer present in the mapping are removed (delete-orphan)
+        for result in existing.values():
+            self.test_results.remove(result)
     
     def to_dict(self):
         return {
@@ -191,6 +471,338 @@ class TestRun(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
+class TestResult(db.Model):
+    """One row per (test run, test case) outcome"""
+    __tablename__ = 'test_results'
+    __table_args__ = (
+        db.UniqueConstraint('test_run_id', 'test_case_id', name='uq_test_results_run_case'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    test_run_id = column_property(db.Column(db.String(36), db.ForeignKey('test_runs.id'), nullable=False),
+                                  active_history=True)
+    test_case_id = db.Column(db.String(36), nullable=False, index=True)
+    outcome = column_property(db.Column(db.String(20), nullable=False, index=True), active_history=True)  # Passed, Failed, Blocked, Skipped...
+    duration_ms = db.Column(db.Integer, index=True)
+    recorded_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    @staticmethod
+    def parse_value(value):
+        """Split a legacy results value into (outcome, duration_ms)"""
+        if isinstance(value, dict):
+            outcome = value.get('outcome') or value.get('status') or 'Unknown'
+            duration = value.get('duration_ms')
+            try:
+                duration = int(duration) if duration is not None else None
+            except (TypeError, ValueError):
+                duration = None
+            return str(outcome), duration
+        return str(value), None
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'test_run_id': self.test_run_id,
+            'test_case_id': self.test_case_id,
+            'outcome': self.outcome,
+            'duration_ms': self.duration_ms,
+            'recorded_at': self.recorded_at.isoformat() if self.recorded_at else None
+        }
+
+# Child counts as correlated subqueries: serializing a list of projects or
+# suites is a single SELECT and never loads the child collections. They are
+# deferred, so plain lookups (Project.query.get, db.session.get) run no COUNT;
+# queries whose rows are serialized add .options(WITH_COUNTS).
+Project.test_cases_count = column_property(
+    select(func.count()).where(TestCase.project_id == Project.id)
+    .correlate_except(TestCase).scalar_subquery(),
+    deferred=True, group='counts'
+)
+Project.test_suites_count = column_property(
+    select(func.count()).where(TestSuite.project_id == Project.id)
+    .correlate_except(TestSuite).scalar_subquery(),
+    deferred=True, group='counts'
+)
+TestSuite.test_cases_count = column_property(
+    select(func.count()).where(TestSuiteCase.test_suite_id == TestSuite.id)
+    .correlate_except(TestSuiteCase).scalar_subquery(),
+    deferred=True, group='counts'
+)
+TestSuite.test_runs_count = column_property(
+    select(func.count()).where(TestRun.test_suite_id == TestSuite.id)
+    .correlate_except(TestRun).scalar_subquery(),
+    deferred=True, group='counts'
+)
+WITH_COUNTS = undefer_group('counts')
+
+class StatsRollup(db.Model):
+    """Pre-aggregated counts for the dashboard and reports
+    
+    One row per (project, dimension, value), e.g. (project, 'test_case_status',
+    'Draft'). Rows with project_id == ALL_PROJECTS hold the totals across all
+    projects. Kept current by the flush hooks below in the same transaction
+    as the write; stats_rollup.py rebuilds and verifies it.
+    """
+    __tablename__ = 'stats_rollup'
+    
+    ALL_PROJECTS = ''
+    
+    project_id = db.Column(db.String(36), primary_key=True)
+    dimension = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    @classmethod
+    def totals(cls, project_id=ALL_PROJECTS):
+        """Counts for one project (default: all projects) as {dimension: {value: count}}"""
+        rows = db.session.execute(
+            select(cls.dimension, cls.value, cls.count).where(cls.project_id == project_id))
+        totals = {}
+        for dimension, value, count in rows:
+            totals.setdefault(dimension, {})[value] = count
+        return totals
+
+def stat_keys(model, value_of):
+    """(dimension, value) pairs a row of model counts towards, read through value_of(name)"""
+    if issubclass(model, Project):
+        return [('projects', '')]
+    if issubclass(model, TestCase):
+        return [('test_cases', ''),
+                ('test_case_status', value_of('status')),
+                ('test_case_priority', value_of('priority'))]
+    if issubclass(model, TestSuite):
+        return [('test_suites', '')]
+    if issubclass(model, TestRun):
+        return [('test_runs', ''), ('test_run_status', value_of('status'))]
+    if issubclass(model, TestResult):
+        return [('test_result_outcome', value_of('outcome'))]
+    return []
+
+def rollup_keys(project_id, dimension, value):
+    """stats_rollup keys for a count: the project's row and the all-projects total"""
+    value = '' if value is None else str(value)
+    scopes = dict.fromkeys((project_id or StatsRollup.ALL_PROJECTS, StatsRollup.ALL_PROJECTS))
+    return [(scope, dimension, value) for scope in scopes]
+
+def add_stat_deltas(deltas, model, project_id, value_of, count):
+    """Accumulate count (+1/-1 per row, or a group size) into a {rollup key: delta} dict"""
+    for dimension, value in stat_keys(model, value_of):
+        for key in rollup_keys(project_id, dimension, value):
+            deltas[key] = deltas.get(key, 0) + count
+
+def apply_stat_deltas(connection, deltas):
+    """Add {(project_id, dimension, value): delta} to stats_rollup with upserts"""
+    rows = [
+        {'project_id': project_id, 'dimension': dimension, 'value': value, 'count': delta}
+        for (project_id, dimension, value), delta in deltas.items() if delta
+    ]
+    if not rows:
+        return
+    table = StatsRollup.__table__
+    statement = dialect_insert(table, connection)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.project_id, table.c.dimension, table.c.value],
+        set_={'count': table.c.count + statement.excluded.count}
+    )
+    connection.execute(statement, rows)
+
+class TableVersion(db.Model):
+    """Change counter per table, bumped in the same transaction as every write
+    
+    Cached responses are keyed by the versions of the tables they read, so a
+    committed write makes every older cache entry unreachable.
+    """
+    __tablename__ = 'table_versions'
+    
+    name = db.Column(db.String(100), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    
+    @classmethod
+    def current(cls, names):
+        """Versions for the given table names as {name: version} (0 if never written)"""
+        versions = dict.fromkeys(names, 0)
+        versions.update(db.session.execute(
+            select(cls.name, cls.version).where(cls.name.in_(list(names)))).all())
+        return versions
+
+def bump_table_versions(connection, names):
+    """Increment the change counters of the given tables"""
+    names = sorted(set(names))
+    if not names:
+        return
+    table = TableVersion.__table__
+    statement = dialect_insert(table, connection)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.name],
+        set_={'version': table.c.version + 1}
+    )
+    connection.execute(statement, [{'name': name, 'version': 1} for name in names])
+
+class ImportJob(db.Model):
+    """Progress of a test case file import (see importer.py)"""
+    __tablename__ = 'import_jobs'
+    
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    filename = db.Column(db.String(255))
+    format = db.Column(db.String(20))
+    project_id = db.Column(db.String(36), nullable=False)
+    status = db.Column(db.String(20), default='Queued')  # Queued, Running, Completed, Failed
+    bytes_total = db.Column(db.BigInteger)
+    bytes_read = db.Column(db.BigInteger, default=0)
+    records_read = db.Column(db.Integer, default=0)
+    imported = db.Column(db.Integer, default=0)
+    failed = db.Column(db.Integer, default=0)
+    errors = db.Column(db.Text)  # JSON list of the first per-record errors
+    message = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'filename': self.filename,
+            'format': self.format,
+            'project_id': self.project_id,
+            'status': self.status,
+            'bytes_total': self.bytes_total,
+            'bytes_read': self.bytes_read,
+            'progress': round(self.bytes_read / self.bytes_total, 4) if self.bytes_total else None,
+            'records_read': self.records_read,
+            'imported': self.imported,
+            'failed': self.failed,
+            'errors': json.loads(self.errors) if self.errors else [],
+            'message': self.message,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+class ArchivedRun(db.Model):
+    """Summary of a test run moved to the cold archive (see archive.py)
+
+    The run and its results live in a gzip member of an NDJSON segment file
+    (segment, offset, length); the counts stay here for trend reports.
+    """
+    __tablename__ = 'archived_runs'
+    __table_args__ = (
+        db.Index('ix_archived_runs_status_created', 'status', 'created_at', 'id'),
+        db.Index('ix_archived_runs_created', 'created_at', 'id'),
+        db.Index('ix_archived_runs_project_created', 'project_id', 'created_at'),
+    )
+
+    id = db.Column(db.String(36), primary_key=True)  # The original test run ID
+    name = db.Column(db.String(100), nullable=False)
+    test_suite_id = db.Column(db.String(36), index=True)
+    project_id = db.Column(db.String(36))  # Owning project at archive time
+    status = db.Column(db.String(20))
+    executed_by = db.Column(db.String(50))
+    started_at = db.Column(db.DateTime)
+    completed_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime)
+    results_count = db.Column(db.Integer, default=0)
+    outcome_counts = db.Column(db.Text)  # JSON {outcome: count}
+    duration_ms = db.Column(db.BigInteger)  # Sum over results with a duration
+    segment = db.Column(db.String(255), nullable=False)
+    offset = db.Column(db.BigInteger, nullable=False)
+    length = db.Column(db.Integer, nullable=False)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def get_outcome_counts(self):
+        return json.loads(self.outcome_counts) if self.outcome_counts else {}
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'test_suite_id': self.test_suite_id,
+            'project_id': self.project_id,
+            'status': self.status,
+            'executed_by': self.executed_by,
+            'started_at': self.started_at.isoformat() if self.started_at else '',
+            'completed_at': self.completed_at.isoformat() if self.completed_at else '',
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'results_count': self.results_count,
+            'outcome_counts': self.get_outcome_counts(),
+            'duration_ms': self.duration_ms,
+            'archived': True,
+            'archived_at': self.archived_at.isoformat() if self.archived_at else None
+        }
+
+class ProjectDeletion(db.Model):
+    """Progress of a background project deletion (see project_deletion.py)"""
+    __tablename__ = 'project_deletions'
+    
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    project_id = db.Column(db.String(36), nullable=False, index=True)
+    project_name = db.Column(db.String(100))
+    status = db.Column(db.String(20), default='Queued')  # Queued, Running, Completed, Failed
+    stage = db.Column(db.String(50))  # Table currently being emptied
+    rows_total = db.Column(db.Integer, default=0)
+    rows_deleted = db.Column(db.Integer, default=0)
+    message = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'project_id': self.project_id,
+            'project_name': self.project_name,
+            'status': self.status,
+            'stage': self.stage,
+            'rows_total': self.rows_total,
+            'rows_deleted': self.rows_deleted,
+            'progress': round(min(self.rows_deleted / self.rows_total, 1), 4) if self.rows_total else None,
+            'message': self.message,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+class AIJob(db.Model):
+    """Queued AI test case generation, run by the worker pool in ai_jobs.py"""
+    __tablename__ = 'ai_jobs'
+    
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    project_id = db.Column(db.String(36))
+    requirements = db.Column(db.Text, nullable=False)
+    test_type = db.Column(db.String(50), default='functional')
+    count = db.Column(db.Integer, default=3)
+    bypass_cache = db.Column(db.Boolean, nullable=False, default=False, server_default=false())
+    status = db.Column(db.String(20), default='Queued')  # Queued, Running, Completed, Failed
+    attempts = db.Column(db.Integer, default=0)
+    worker = db.Column(db.String(100))  # Worker that claimed the job last
+    test_case_ids = db.Column(db.Text)  # JSON list of the stored test cases
+    ai_provider = db.Column(db.String(50))
+    message = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)  # Renewed by the worker with every stored case (the lease)
+    finished_at = db.Column(db.DateTime)
+    
+    __table_args__ = (
+        db.Index('ix_ai_jobs_status_created', 'status', 'created_at'),
+    )
+    
+    def get_test_case_ids(self):
+        return json.loads(self.test_case_ids) if self.test_case_ids else []
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'project_id': self.project_id,
+            'test_type': self.test_type,
+            'count': self.count,
+            'bypass_cache': self.bypass_cache,
+            'status': self.status,
+            'attempts': self.attempts,
+            'test_case_ids': self.get_test_case_ids(),
+            'ai_provider': self.ai_provider,
+            'message': self.message,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'heartbeat_at': self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
 # User model for future authentication
 class User(db.Model):
     __tablename__ = 'users'
@@ -215,3 +827,260 @@ class User(db.Model):
             'last_login': self.last_login.isoformat() if self.last_login else None,
             'is_active': self.is_active
         }
+
+@event.listens_for(Session, 'before_flush')
+def _drop_deleted_links(session, flush_context, instances):
+    """Remove tag links and suite memberships before their rows are deleted"""
+    removed_cases = [obj.id for obj in session.deleted if isinstance(obj, TestCase)]
+    removed_suites = [obj.id for obj in session.deleted if isinstance(obj, TestSuite)]
+    if not removed_cases and not removed_suites:
+        return
+    
+    connection = session.connection()
+    members = TestSuiteCase.__table__
+    changed = set()
+    for chunk in chunked(removed_cases):
+        if connection.execute(delete(test_case_tags).where(test_case_tags.c.test_case_id.in_(chunk))).rowcount:
+            changed.add('test_case_tags')
+        if connection.execute(delete(members).where(members.c.test_case_id.in_(chunk))).rowcount:
+            changed.add('test_suite_cases')
+    for chunk in chunked(removed_suites):
+        if connection.execute(delete(members).where(members.c.test_suite_id.in_(chunk))).rowcount:
+            changed.add('test_suite_cases')
+    # Bare connection writes: the version counters are not bumped for us
+    bump_table_versions(connection, changed)
+
+@event.listens_for(Session, 'after_flush')
+def _maintain_tag_index(session, flush_context):
+    """Keep test_case_tags in step with TestCase.tags on every ORM flush"""
+    changed = []
+    
+    for obj in session.new:
+        if isinstance(obj, TestCase):
+            changed.append((obj.id, obj.project_id, Tag.normalize(obj.get_tags())))
+    
+    for obj in session.dirty:
+        if isinstance(obj, TestCase) and (
+                attributes.get_history(obj, 'tags').has_changes() or
+                attributes.get_history(obj, 'project_id').has_changes()):
+            changed.append((obj.id, obj.project_id, Tag.normalize(obj.get_tags())))
+    
+    if changed:
+        sync_tag_index(session.connection(), changed)
+
+@event.listens_for(Session, 'after_flush')
+def _write_pending_memberships(session, flush_context):
+    """Write suite memberships assigned before the suite row existed"""
+    for obj in session.new:
+        if isinstance(obj, TestSuite) and getattr(obj, '_pending_case_ids', None) is not None:
+            ids = obj._pending_case_ids
+            del obj._pending_case_ids
+            obj.add_test_cases(ids)
+
+
+class _StatsTracker:
+    """Collects stats_rollup deltas for one flush, resolving owning projects"""
+    
+    def __init__(self, session):
+        self.connection = session.connection()
+        self.deltas = {}
+        # Objects pending in this flush resolve without a query
+        self._suite_projects = {obj.id: obj.project_id for obj in session.new
+                                if isinstance(obj, TestSuite) and obj.id}
+        self._run_suites = {obj.id: obj.test_suite_id for obj in session.new
+                            if isinstance(obj, TestRun) and obj.id}
+    
+    def suite_project(self, suite_id):
+        if suite_id not in self._suite_projects:
+            self._suite_projects[suite_id] = self.connection.execute(
+                select(TestSuite.project_id).where(TestSuite.id == suite_id)).scalar()
+        return self._suite_projects[suite_id]
+    
+    def run_suite(self, run_id):
+        if run_id not in self._run_suites:
+            self._run_suites[run_id] = self.connection.execute(
+                select(TestRun.test_suite_id).where(TestRun.id == run_id)).scalar()
+        return self._run_suites[run_id]
+    
+    def project_of(self, obj, value_of):
+        """Owning project of a row (None for projects themselves, which only have a total)"""
+        if isinstance(obj, (TestCase, TestSuite)):
+            return value_of('project_id')
+        if isinstance(obj, TestRun):
+            return self.suite_project(value_of('test_suite_id'))
+        if isinstance(obj, TestResult):
+            run_id = value_of('test_run_id')
+            if run_id is None and obj.test_run is not None:
+                run_id = obj.test_run.id
+            return self.suite_project(self.run_suite(run_id))
+        return None
+    
+    def add(self, project_id, dimension, value, delta):
+        for key in rollup_keys(project_id, dimension, value):
+            self.deltas[key] = self.deltas.get(key, 0) + delta
+    
+    def count(self, obj, value_of, sign):
+        add_stat_deltas(self.deltas, type(obj), self.project_of(obj, value_of), value_of, sign)
+    
+    def move_children(self, runs_filter, old_project, new_project, include_runs=True):
+        """Move the counts of matching runs (optionally) and their results between projects"""
+        if old_project == new_project:
+            return
+        runs = TestRun.__table__
+        results = TestResult.__table__
+        grouped = [('test_result_outcome', select(results.c.outcome, func.count())
+                    .join(runs, runs.c.id == results.c.test_run_id)
+                    .where(runs_filter).group_by(results.c.outcome))]
+        if include_runs:
+            grouped.append(('test_run_status', select(runs.c.status, func.count())
+                            .where(runs_filter).group_by(runs.c.status)))
+        
+        for dimension, query in grouped:
+            for value, count in self.connection.execute(query):
+                for project_id, delta in ((old_project, -count), (new_project, count)):
+                    self.add(project_id, dimension, value, delta)
+                    if dimension == 'test_run_status':
+                        self.add(project_id, 'test_runs', '', delta)
+    
+    def flush(self):
+        apply_stat_deltas(self.connection, self.deltas)
+        self.deltas = {}
+
+_TRACKED_MODELS = (Project, TestCase, TestSuite, TestRun, TestResult)
+
+def _current_value(obj):
+    return lambda name: getattr(obj, name)
+
+def _previous_value(obj):
+    """Attribute getter returning values as they were before this flush"""
+    def value_of(name):
+        history = attributes.get_history(obj, name)
+        if history.deleted:
+            return history.deleted[0]
+        if history.unchanged:
+            return history.unchanged[0]
+        return getattr(obj, name)
+    return value_of
+
+def _rollup_changed(obj):
+    names = ['project_id', 'status', 'priority', 'test_suite_id', 'test_run_id', 'outcome']
+    return any(
+        hasattr(type(obj), name) and attributes.get_history(obj, name).has_changes()
+        for name in names
+    )
+
+STATS_TRACKER_KEY = 'stats_rollup_tracker'
+
+@event.listens_for(Session, 'before_flush')
+def _reset_stats_tracker(session, flush_context, instances):
+    # Drop deltas left over from a flush that failed
+    session.info.pop(STATS_TRACKER_KEY, None)
+
+def _count_deleted_row(mapper, connection, target):
+    """Subtract a deleted row (including cascades and orphans) while its parents still exist"""
+    session = object_session(target)
+    tracker = session.info.get(STATS_TRACKER_KEY)
+    if tracker is None:
+        tracker = session.info[STATS_TRACKER_KEY] = _StatsTracker(session)
+    tracker.count(target, _previous_value(target), -1)
+
+for _model in _TRACKED_MODELS:
+    event.listen(_model, 'after_delete', _count_deleted_row)
+
+@event.listens_for(Session, 'after_flush')
+def _count_written_rows(session, flush_context):
+    """Add new rows, re-bucket changed rows and write all deltas to stats_rollup"""
+    tracker = session.info.pop(STATS_TRACKER_KEY, None)
+    new = [obj for obj in session.new if isinstance(obj, _TRACKED_MODELS)]
+    dirty = [obj for obj in session.dirty
+             if isinstance(obj, _TRACKED_MODELS) and _rollup_changed(obj)]
+    if not new and not dirty and tracker is None:
+        return
+    
+    if tracker is None:
+        tracker = _StatsTracker(session)
+    for obj in new:
+        tracker.count(obj, _current_value(obj), 1)
+    
+    for obj in dirty:
+        before, after = _previous_value(obj), _current_value(obj)
+        tracker.count(obj, before, -1)
+        tracker.count(obj, after, 1)
+        
+        # Runs and results follow their suite or run to another project
+        runs = TestRun.__table__
+        if isinstance(obj, TestSuite) and before('project_id') != after('project_id'):
+            tracker.move_children(runs.c.test_suite_id == obj.id,
+                                  before('project_id'), after('project_id'))
+        elif isinstance(obj, TestRun) and before('test_suite_id') != after('test_suite_id'):
+            tracker.move_children(runs.c.id == obj.id,
+                                  tracker.suite_project(before('test_suite_id')),
+                                  tracker.suite_project(after('test_suite_id')),
+                                  include_runs=False)
+    
+    tracker.flush()
+
+
+# Table version counters: ORM row writes are collected per flush (mapper
+# events also see cascades and orphans); DML run through Session.execute()
+# is bumped directly. Code writing through a bare connection must call
+# bump_table_versions() itself.
+VERSIONS_KEY = 'changed_tables'
+_UNVERSIONED_TABLES = {'table_versions', 'stats_rollup', 'schema_migrations', 'import_jobs', 'project_deletions',
+                       'ai_jobs'}
+
+def _note_changed_table(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(VERSIONS_KEY, set()).add(mapper.local_table.name)
+
+for _event_name in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(db.Model, _event_name, _note_changed_table, propagate=True)
+
+@event.listens_for(Session, 'before_flush')
+def _reset_changed_tables(session, flush_context, instances):
+    session.info.pop(VERSIONS_KEY, None)
+
+@event.listens_for(Session, 'after_flush')
+def _bump_flushed_tables(session, flush_context):
+    changed = session.info.pop(VERSIONS_KEY, set()) - _UNVERSIONED_TABLES
+    if changed:
+        bump_table_versions(session.connection(), changed)
+
+@event.listens_for(Session, 'do_orm_execute')
+def _bump_executed_tables(orm_execute_state):
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    table = getattr(orm_execute_state.statement, 'table', None)
+    name = getattr(table, 'name', None)
+    if name and name not in _UNVERSIONED_TABLES:
+        bump_table_versions(orm_execute_state.session.connection(), [name])
+
+
+# Projects marked deleting are hidden from every ORM SELECT together with
+# their test cases, suites, runs and archived runs while project_deletion.py
+# removes them. Relationship and column loads start from rows that are
+# already visible and are left alone. Pass execution_options(include_deleting=True)
+# to see everything; Core statements on a bare connection are never filtered.
+def deleting_project_ids():
+    """Subquery of projects being deleted (table columns, so no ORM criteria apply inside)"""
+    projects = Project.__table__
+    return select(projects.c.id).where(projects.c.deleting == true())
+
+def _project_suite_ids():
+    suites = TestSuite.__table__
+    return select(suites.c.id).where(suites.c.project_id.in_(deleting_project_ids()))
+
+@event.listens_for(Session, 'do_orm_execute')
+def _hide_deleting_projects(orm_execute_state):
+    if (not orm_execute_state.is_select or orm_execute_state.is_column_load
+            or orm_execute_state.is_relationship_load
+            or orm_execute_state.execution_options.get('include_deleting')):
+        return
+    orm_execute_state.statement = orm_execute_state.statement.options(
+        with_loader_criteria(Project, Project.__table__.c.deleting == false()),
+        with_loader_criteria(TestCase, TestCase.__table__.c.project_id.notin_(deleting_project_ids())),
+        with_loader_criteria(TestSuite, TestSuite.__table__.c.project_id.notin_(deleting_project_ids())),
+        with_loader_criteria(TestRun, TestRun.__table__.c.test_suite_id.notin_(_project_suite_ids())),
+        with_loader_criteria(ArchivedRun, ArchivedRun.__table__.c.project_id.notin_(deleting_project_ids())),
+    )
@@ -0,0 +1,275 @@
+"""
+Background Project Deletion for TestGenie Enterprise
+Removes a project and everything under it in bounded chunks
+
+DELETE /api/projects/<id> only sets projects.deleting, which hides the
+project with its test cases, suites and runs from every ORM query (see
+models.py), and records a ProjectDeletion job. A worker thread then empties
+one table at a time in chunks of DELETE_CHUNK_SIZE rows, one short
+transaction each, so other writers get the SQLite write lock between chunks.
+Core deletes bypass the flush hooks: every chunk updates stats_rollup and
+table versions itself.
+
+The project's rollup counts leave the all-projects totals in the same
+transaction that hides it, so dashboard and report totals are final as soon
+as DELETE returns; chunks then only decrement the project's own rollup rows,
+which are dropped with the project. A deletion interrupted by a shutdown
+keeps the project hidden until it is resumed.
+
+Usage:
+    python project_deletion.py resume   - Restart interrupted deletions
+    python project_deletion.py status   - List deletion jobs
+"""
+
+import logging
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import select, delete, func, tuple_
+from sqlalchemy.exc import IntegrityError
+
+from models import (db, Project, TestCase, TestSuite, TestSuiteCase, TestRun, TestResult, ArchivedRun,
+                    ProjectDeletion, StatsRollup, test_case_tags, add_stat_deltas, apply_stat_deltas,
+                    bump_table_versions)
+from bulk import grouped_stat_deltas
+
+logger = logging.getLogger(__name__)
+
+DELETE_CHUNK_SIZE = 1000
+
+# Tables hidden by the deleting flag; their cached responses go stale when it is set
+HIDDEN_TABLES = ['projects', 'test_cases', 'test_suites', 'test_suite_cases', 'test_runs', 'test_results',
+                 'archived_runs']
+
+
+def project_suites(project_id):
+    suites = TestSuite.__table__
+    return select(suites.c.id).where(suites.c.project_id == project_id)
+
+
+def project_runs(project_id):
+    runs = TestRun.__table__
+    return select(runs.c.id).where(runs.c.test_suite_id.in_(project_suites(project_id)))
+
+
+def project_scope(deltas):
+    """Only the project's own rollup deltas: the all-projects totals left it when deletion started"""
+    return {key: delta for key, delta in deltas.items() if key[0] != StatsRollup.ALL_PROJECTS}
+
+
+def hide_from_totals(connection, project_id):
+    """Subtract a project's rollup counts, and the project itself, from the all-projects totals"""
+    rollup = StatsRollup.__table__
+    deltas = {(StatsRollup.ALL_PROJECTS, dimension, value): -count
+              for dimension, value, count in connection.execute(
+                  select(rollup.c.dimension, rollup.c.value, rollup.c.count)
+                  .where(rollup.c.project_id == project_id))}
+    add_stat_deltas(deltas, Project, None, {}.get, -1)
+    apply_stat_deltas(connection, deltas)
+
+
+def delete_results(connection, project_id, limit):
+    results = TestResult.__table__
+    rows = connection.execute(
+        select(results.c.id, results.c.outcome)
+        .where(results.c.test_run_id.in_(project_runs(project_id))).limit(limit)).all()
+    if rows:
+        connection.execute(delete(results).where(results.c.id.in_([row.id for row in rows])))
+        deltas = {}
+        for outcome, count in Counter(row.outcome for row in rows).items():
+            add_stat_deltas(deltas, TestResult, project_id, {'outcome': outcome}.get, -count)
+        apply_stat_deltas(connection, project_scope(deltas))
+    return len(rows)
+
+
+def delete_runs(connection, project_id, limit):
+    runs = TestRun.__table__
+    rows = connection.execute(
+        select(runs.c.id, runs.c.status)
+        .where(runs.c.test_suite_id.in_(project_suites(project_id))).limit(limit)).all()
+    if rows:
+        connection.execute(delete(runs).where(runs.c.id.in_([row.id for row in rows])))
+        deltas = {}
+        for status, count in Counter(row.status for row in rows).items():
+            add_stat_deltas(deltas, TestRun, project_id, {'status': status}.get, -count)
+        apply_stat_deltas(connection, project_scope(deltas))
+    return len(rows)
+
+
+def delete_suite_members(connection, project_id, limit):
+    members = TestSuiteCase.__table__
+    pairs = connection.execute(
+        select(members.c.test_suite_id, members.c.test_case_id)
+        .where(members.c.test_suite_id.in_(project_suites(project_id))).limit(limit)).all()
+    if pairs:
+        connection.execute(delete(members).where(
+            tuple_(members.c.test_suite_id, members.c.test_case_id).in_([tuple(pair) for pair in pairs])))
+    return len(pairs)
+
+
+def delete_cases(connection, project_id, limit):
+    """Test cases with their tag links and memberships in other projects' suites"""
+    cases = TestCase.__table__
+    members = TestSuiteCase.__table__
+    rows = connection.execute(
+        select(cases.c.id, cases.c.project_id, cases.c.status, cases.c.priority)
+        .where(cases.c.project_id == project_id).limit(limit)).mappings().all()
+    if rows:
+        ids = [row['id'] for row in rows]
+        connection.execute(delete(test_case_tags).where(test_case_tags.c.test_case_id.in_(ids)))
+        connection.execute(delete(members).where(members.c.test_case_id.in_(ids)))
+        connection.execute(delete(cases).where(cases.c.id.in_(ids)))
+        apply_stat_deltas(connection, project_scope(grouped_stat_deltas(rows, -1)))
+    return len(rows)
+
+
+def delete_suites(connection, project_id, limit):
+    suites = TestSuite.__table__
+    ids = connection.execute(project_suites(project_id).limit(limit)).scalars().all()
+    if ids:
+        connection.execute(delete(suites).where(suites.c.id.in_(ids)))
+        deltas = {}
+        add_stat_deltas(deltas, TestSuite, project_id, {}.get, -len(ids))
+        apply_stat_deltas(connection, project_scope(deltas))
+    return len(ids)
+
+
+def delete_archived_runs(connection, project_id, limit):
+    archived = ArchivedRun.__table__
+    ids = connection.execute(
+        select(archived.c.id).where(archived.c.project_id == project_id).limit(limit)).scalars().all()
+    if ids:
+        connection.execute(delete(archived).where(archived.c.id.in_(ids)))
+    return len(ids)
+
+
+# (table, chunk deleter, tables it changes) in foreign key order: children before parents
+STAGES = [
+    ('test_results', delete_results, ['test_results']),
+    ('test_runs', delete_runs, ['test_runs']),
+    ('test_suite_cases', delete_suite_members, ['test_suite_cases']),
+    ('test_cases', delete_cases, ['test_cases', 'test_suite_cases']),
+    ('test_suites', delete_suites, ['test_suites']),
+    ('archived_runs', delete_archived_runs, ['archived_runs']),
+]
+
+
+def count_rows(connection, project_id):
+    """Rows a project deletion will remove, for progress reporting"""
+    cases = TestCase.__table__
+    members = TestSuiteCase.__table__
+    results = TestResult.__table__
+    archived = ArchivedRun.__table__
+    queries = [
+        select(func.count()).select_from(results).where(results.c.test_run_id.in_(project_runs(project_id))),
+        select(func.count()).select_from(project_runs(project_id).subquery()),
+        select(func.count()).select_from(members).where(members.c.test_suite_id.in_(project_suites(project_id))),
+        select(func.count()).select_from(cases).where(cases.c.project_id == project_id),
+        select(func.count()).select_from(project_suites(project_id).subquery()),
+        select(func.count()).select_from(archived).where(archived.c.project_id == project_id),
+    ]
+    return sum(connection.execute(query).scalar() for query in queries) + 1
+
+
+def start_project_deletion(project):
+    """Hide a project and record a deletion job; the caller starts run_project_deletion"""
+    connection = db.session.connection()
+    project.deleting = True
+    job = ProjectDeletion(project_id=project.id, project_name=project.name,
+                          rows_total=count_rows(connection, project.id))
+    db.session.add(job)
+    db.session.flush()
+    hide_from_totals(connection, project.id)
+    # Lists of test cases, suites and runs change without a write to those tables
+    bump_table_versions(connection, HIDDEN_TABLES)
+    db.session.commit()
+    return job
+
+
+def delete_project_rows(job, chunk_size=DELETE_CHUNK_SIZE):
+    """Empty every stage chunk by chunk, then delete the project row itself"""
+    project_id = job.project_id
+    projects = Project.__table__
+    for attempt in range(3):
+        for table, delete_chunk, changed in STAGES:
+            job.stage = table
+            db.session.commit()
+            while True:
+                deleted = delete_chunk(db.session.connection(), project_id, chunk_size)
+                if not deleted:
+                    db.session.rollback()
+                    break
+                bump_table_versions(db.session.connection(), changed)
+                job.rows_deleted = (job.rows_deleted or 0) + deleted
+                db.session.commit()
+
+        job.stage = 'projects'
+        try:
+            connection = db.session.connection()
+            if connection.execute(delete(projects).where(projects.c.id == project_id)).rowcount:
+                # All zero by now; the totals were adjusted by start_project_deletion()
+                rollup = StatsRollup.__table__
+                connection.execute(delete(rollup).where(rollup.c.project_id == project_id))
+                bump_table_versions(connection, ['projects'])
+                job.rows_deleted = (job.rows_deleted or 0) + 1
+            db.session.commit()
+            return
+        except IntegrityError:
+            # A row was added under the project while it was being emptied
+            db.session.rollback()
+            logger.warning(f"⚠️ Project {project_id} gained rows during deletion; emptying again")
+    raise RuntimeError('Project still has rows after repeated passes')
+
+
+def run_project_deletion(app, job_id, chunk_size=DELETE_CHUNK_SIZE):
+    """Background worker: delete a project recorded by start_project_deletion"""
+    with app.app_context():
+        job = db.session.get(ProjectDeletion, job_id)
+        job.status = 'Running'
+        db.session.commit()
+        started = datetime.utcnow()
+        try:
+            delete_project_rows(job, chunk_size)
+            job.status = 'Completed'
+            job.stage = None
+            logger.info(f"🗑️ Deleted project {job.project_id} ({job.rows_deleted} rows) "
+                        f"in {(datetime.utcnow() - started).total_seconds():.1f}s")
+        except Exception as e:
+            db.session.rollback()
+            job = db.session.get(ProjectDeletion, job_id)
+            job.status = 'Failed'
+            job.message = str(e)
+            logger.error(f"❌ Deletion of project {job.project_id} failed: {e}")
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        db.session.remove()
+
+
+def interrupted_deletions():
+    """Jobs whose project is still marked deleting and no longer has a running worker"""
+    jobs = ProjectDeletion.query.filter(ProjectDeletion.status != 'Completed').all()
+    deleting = set(db.session.execute(
+        select(Project.__table__.c.id).where(Project.__table__.c.deleting.is_(True))).scalars())
+    return [job for job in jobs if job.project_id in deleting]
+
+
+if __name__ == '__main__':
+    import sys
+    from enterprise_test_platform_sqlite import app
+
+    command = sys.argv[1] if len(sys.argv) > 1 else ''
+    with app.app_context():
+        if command == 'resume':
+            jobs = interrupted_deletions()
+            if not jobs:
+                print("✅ No interrupted project deletions")
+            for job in jobs:
+                print(f"🗑️ Resuming deletion of {job.project_name} ({job.project_id})")
+                run_project_deletion(app, job.id)
+                print(f"   {db.session.get(ProjectDeletion, job.id).status}")
+        elif command == 'status':
+            for job in ProjectDeletion.query.order_by(ProjectDeletion.created_at).all():
+                print(f"{job.status:10} {job.rows_deleted}/{job.rows_total} rows  {job.project_name} ({job.id})")
+        else:
+            print(__doc__)
+            sys.exit(1)
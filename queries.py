@@ -0,0 +1,207 @@
+"""
+Query Builders for TestGenie Enterprise
+Filtered list queries shared by the API routes and query_plan_check.py,
+so the plan check explains exactly the SQL the API runs
+
+List endpoints use keyset pagination on (created_at, id): the cursor is the
+position of the last row returned, so every page is an index range seek and
+page 10,000 costs the same as page 1. Search results are ranked instead and
+page on (rank, id).
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from models import db, Project, TestCase, TestSuite, TestRun, ArchivedRun, Tag, test_case_tags
+from search import apply_search, is_search_row
+
+# Filter parameters accepted by /api/test-cases and /api/test-runs
+TEST_CASE_FILTERS = ('project_id', 'status', 'priority', 'tag', 'search')
+TEST_RUN_FILTERS = ('status',)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(*values):
+    """Opaque cursor for the last row of a page, e.g. (created_at, id) or (rank, id)"""
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    payload = json.dumps(values, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor(), as a list of raw values; raises ValueError for malformed cursors"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != 2:
+        raise ValueError('Invalid cursor')
+    return values
+
+
+def page_limit(args):
+    """Read ?limit=, clamped to 1..MAX_PAGE_SIZE"""
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except (TypeError, ValueError):
+        raise ValueError('limit must be an integer')
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def keyset(query, model, args):
+    """Order newest first on (created_at, id) and seek past ?cursor="""
+    cursor = args.get('cursor')
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        try:
+            created_at = datetime.fromisoformat(created_at)
+        except (TypeError, ValueError):
+            raise ValueError('Invalid cursor')
+        query = query.filter(
+            db.tuple_(model.created_at, model.id) < db.tuple_(created_at, str(row_id)))
+    return query.order_by(model.created_at.desc(), model.id.desc())
+
+
+def ranked_keyset(query, rank, args):
+    """Order search results best match first on (rank, id) and seek past ?cursor="""
+    cursor = args.get('cursor')
+    if cursor:
+        after_rank, row_id = decode_cursor(cursor)
+        if isinstance(after_rank, bool) or not isinstance(after_rank, (int, float)):
+            raise ValueError('Invalid cursor')
+        query = query.filter(
+            db.tuple_(rank, TestCase.id) > db.tuple_(after_rank, str(row_id)))
+    return query.order_by(rank, TestCase.id)
+
+
+def cursor_values(row):
+    """Keyset position of a row returned by keyset() or ranked_keyset()
+
+    Rows are ORM objects, (TestCase, search columns...) rows, or plain column
+    rows (serialize.py) that include id and created_at or search_rank.
+    """
+    if is_search_row(row) and 'search_rank' in row._fields:
+        return row.search_rank, row.id if 'id' in row._fields else row.TestCase.id
+    return row.created_at, row.id
+
+
+def fetch_page(query, args):
+    """Run a keyset-ordered query for one page; returns (rows, next_cursor)"""
+    limit = page_limit(args)
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    return rows[:limit], encode_cursor(*cursor_values(rows[limit - 1]))
+
+
+def parse_tag_args(args):
+    """Read tag filters from repeated and/or comma separated ?tag= parameters"""
+    names = []
+    for value in args.getlist('tag'):
+        names.extend(value.split(','))
+    return Tag.normalize(names)
+
+
+def filter_by_tags(query, tag_names, match='all', project_id=None):
+    """Restrict a TestCase query to cases carrying all (or any) of the tags"""
+    tagged = (
+        db.select(test_case_tags.c.test_case_id)
+        .join(Tag, Tag.id == test_case_tags.c.tag_id)
+        .where(Tag.name.in_(tag_names))
+    )
+    if project_id:
+        tagged = tagged.where(test_case_tags.c.project_id == project_id)
+    if match != 'any':
+        tagged = tagged.group_by(test_case_tags.c.test_case_id).having(
+            db.func.count(test_case_tags.c.tag_id) == len(tag_names))
+    return query.filter(TestCase.id.in_(tagged))
+
+
+def filtered_test_cases(args):
+    """TestCase query restricted by the /api/test-cases filters, unordered
+
+    Returns (query, rank). With ?search= the query rows are (TestCase,
+    search_rank, snippet, title_highlight) and rank is the ranking expression;
+    otherwise rank is None. Raises ValueError for invalid parameters.
+    """
+    project_id = args.get('project_id')
+    status = args.get('status')
+    priority = args.get('priority')
+    search = args.get('search', '').strip()
+    tag_names = parse_tag_args(args)
+    tag_match = args.get('tag_match', 'all').lower()
+
+    if tag_match not in ('all', 'any'):
+        raise ValueError("tag_match must be 'all' or 'any'")
+
+    query = TestCase.query
+
+    if project_id:
+        query = query.filter_by(project_id=project_id)
+    if status:
+        query = query.filter_by(status=status)
+    if priority:
+        query = query.filter_by(priority=priority)
+    if tag_names:
+        query = filter_by_tags(query, tag_names, tag_match, project_id)
+    if search:
+        ranked, rank = apply_search(query, search)
+        if ranked is not None:
+            return ranked, rank
+
+    return query, None
+
+
+def test_case_query(args):
+    """Filtered, ordered TestCase query for /api/test-cases
+
+    With ?search= the rows are (TestCase, search_rank, snippet, title_highlight)
+    ranked by relevance; see search.search_result_dict(). Raises ValueError
+    for invalid parameters.
+    """
+    query, rank = filtered_test_cases(args)
+    if rank is not None:
+        return ranked_keyset(query, rank, args)
+    return keyset(query, TestCase, args)
+
+
+def test_run_query(args):
+    """Filtered, ordered TestRun query for /api/test-runs"""
+    status = args.get('status')
+
+    query = TestRun.query
+    if status:
+        query = query.filter_by(status=status)
+
+    return keyset(query, TestRun, args)
+
+
+def archived_run_query(args):
+    """Filtered, ordered ArchivedRun query for /api/test-runs?archived=1"""
+    status = args.get('status')
+
+    query = ArchivedRun.query
+    if status:
+        query = query.filter_by(status=status)
+
+    return keyset(query, ArchivedRun, args)
+
+
+def project_query(args):
+    """Ordered Project query for /api/projects"""
+    return keyset(Project.query, Project, args)
+
+
+def test_suite_query(args):
+    """Filtered, ordered TestSuite query for /api/test-suites"""
+    project_id = args.get('project_id')
+
+    query = TestSuite.query
+    if project_id:
+        query = query.filter_by(project_id=project_id)
+
+    return keyset(query, TestSuite, args)
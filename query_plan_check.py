@@ -0,0 +1,147 @@
+"""
+Query Plan Check for TestGenie Enterprise
+Runs EXPLAIN QUERY PLAN for every filter combination the list APIs support
+and fails if any of them falls back to a full table scan.
+
+The queries come from queries.py, the same builders the API routes use.
+
+Usage:
+    python query_plan_check.py             - Check against a scratch SQLite database
+    python query_plan_check.py --verbose   - Also print every plan
+"""
+
+import itertools
+import os
+import re
+import sys
+
+# Plans are checked against a scratch database built from the current models
+os.environ['DATABASE_URL'] = os.environ.get('QUERY_PLAN_DATABASE_URL', 'sqlite://')
+
+from datetime import datetime
+
+from werkzeug.datastructures import MultiDict
+
+# "SCAN <table>" without an index is a full table scan; index scans read
+# "SCAN <table> USING [COVERING] INDEX ..." and virtual tables "VIRTUAL TABLE INDEX"
+SCAN_LINE = re.compile(r'^SCAN (TABLE )?(?P<table>\w+)(?P<access>.*)$')
+
+TEST_CASE_VALUES = {
+    'project_id': [None, 'project-1'],
+    'status': [None, 'Draft'],
+    'priority': [None, 'High'],
+    'tag': [None, ['api'], ['api', 'regression'], ('any', ['api', 'regression'])],
+    'search': [None, 'login'],
+    'cursor': [None, 'page-2'],
+}
+
+TEST_RUN_VALUES = {
+    'status': [None, 'In Progress'],
+    'cursor': [None, 'page-2'],
+}
+
+ARCHIVED_RUN_VALUES = dict(TEST_RUN_VALUES, archived=['1'])
+
+# Stand in for real cursors so deep keyset pages are checked as well
+PAGE_2_CURSOR = (datetime(2025, 1, 1), '00000000-0000-0000-0000-000000000000')
+SEARCH_PAGE_2_CURSOR = (-1.0, '00000000-0000-0000-0000-000000000000')
+
+
+def build_args(combination):
+    """Turn {param: value} into request-style MultiDict args"""
+    args = MultiDict()
+    for name, value in combination.items():
+        if value is None:
+            continue
+        if name == 'cursor':
+            from queries import encode_cursor
+            # Search results page on (rank, id) instead of (created_at, id)
+            position = SEARCH_PAGE_2_CURSOR if combination.get('search') else PAGE_2_CURSOR
+            args.add('cursor', encode_cursor(*position))
+        elif name == 'tag':
+            if isinstance(value, tuple):
+                args.add('tag_match', value[0])
+                value = value[1]
+            for tag in value:
+                args.add('tag', tag)
+        else:
+            args.add(name, value)
+    return args
+
+
+def is_full_scan(line):
+    """True if a plan line reads a whole table without an index"""
+    match = SCAN_LINE.match(line)
+    if not match:
+        return False
+    access = match.group('access')
+    return 'INDEX' not in access and 'PRIMARY KEY' not in access
+
+
+def combinations(values):
+    """Every combination of the filter values (None = parameter absent)"""
+    names = list(values)
+    for picked in itertools.product(*(values[name] for name in names)):
+        yield dict(zip(names, picked))
+
+
+def explain(db, query):
+    """Return the EXPLAIN QUERY PLAN detail lines for an ORM query"""
+    compiled = query.statement.compile(
+        dialect=db.engine.dialect,
+        compile_kwargs={'literal_binds': True}
+    )
+    rows = db.session.execute(db.text(f'EXPLAIN QUERY PLAN {compiled}')).all()
+    return [row[-1] for row in rows]
+
+
+def check_query_plans(verbose=False):
+    """Check every supported filter combination; returns the list of failures"""
+    from enterprise_test_platform_sqlite import app
+    from models import db
+    from queries import test_case_query, test_run_query, archived_run_query
+
+    checks = [
+        ('/api/test-cases', test_case_query, TEST_CASE_VALUES),
+        ('/api/test-runs', test_run_query, TEST_RUN_VALUES),
+        ('/api/test-runs', archived_run_query, ARCHIVED_RUN_VALUES),
+    ]
+
+    failures = []
+    total = 0
+
+    with app.app_context():
+        if db.engine.dialect.name != 'sqlite':
+            print("❌ EXPLAIN QUERY PLAN checks need a SQLite database")
+            return ['unsupported dialect']
+
+        print("🔍 TestGenie Query Plan Check")
+        print("=" * 50)
+
+        for endpoint, builder, values in checks:
+            for combination in combinations(values):
+                args = build_args(combination)
+                plan = explain(db, builder(args))
+                total += 1
+
+                scans = [line for line in plan if is_full_scan(line)]
+                label = f"{endpoint}?{'&'.join(f'{k}={v}' for k, v in args.items(multi=True)) or '(no filters)'}"
+
+                if scans:
+                    failures.append((label, plan))
+                    print(f"❌ {label}")
+                elif verbose:
+                    print(f"✅ {label}")
+
+                if scans or verbose:
+                    for line in plan:
+                        print(f"     {line}")
+
+    print()
+    print(f"📊 Checked {total} filter combinations, {len(failures)} full table scans")
+    return failures
+
+
+if __name__ == '__main__':
+    failures = check_query_plans(verbose='--verbose' in sys.argv)
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,232 @@
+"""
+Full-Text Search for TestGenie Enterprise
+Ranked search over test case title, description, steps and expected result
+
+SQLite uses an FTS5 external-content table (test_cases_fts) kept in sync by
+triggers and ranked with BM25. PostgreSQL uses a GIN-indexed tsvector with
+ts_rank/ts_headline. Other databases fall back to LIKE matching.
+
+test_cases has a string primary key, so its implicit rowid may change on
+VACUUM; the FTS5 index is keyed on test_cases.search_rowid instead, an
+explicit INTEGER column (unique index) that the insert trigger assigns.
+
+Usage:
+    python search.py rebuild          - Rebuild the search index from test_cases
+    python search.py "<terms>"        - Search from the command line
+"""
+
+import re
+
+from sqlalchemy import func, literal_column, table, column, or_, literal, text, inspect
+from sqlalchemy.engine import Row
+
+from models import db, TestCase
+
+FTS_TABLE = 'test_cases_fts'
+FTS_COLUMNS = ('title', 'description', 'steps', 'expected_result')
+
+# BM25 column weights: a hit in the title matters most
+BM25_WEIGHTS = (10.0, 4.0, 1.0, 2.0)
+
+SNIPPET_TOKENS = 12
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_END = '</mark>'
+
+# Stable integer key of a test case in the FTS5 index (SQLite only, not part of the model)
+SEARCH_ROWID = 'search_rowid'
+
+fts_table = table(FTS_TABLE, column('rowid'))
+
+SQLITE_FTS_TRIGGERS = ('test_cases_fts_insert', 'test_cases_fts_delete', 'test_cases_fts_update')
+
+SQLITE_FTS_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description, steps, expected_result,
+        content='test_cases', content_rowid='{SEARCH_ROWID}', tokenize='porter unicode61'
+    )""",
+    # Rows inserted without a search_rowid (every insert: the model does not map it) get the next one
+    f"""CREATE TRIGGER IF NOT EXISTS test_cases_fts_insert AFTER INSERT ON test_cases BEGIN
+        UPDATE test_cases SET {SEARCH_ROWID} = (SELECT COALESCE(MAX({SEARCH_ROWID}), 0) + 1 FROM test_cases)
+        WHERE rowid = new.rowid AND {SEARCH_ROWID} IS NULL;
+        INSERT INTO {FTS_TABLE}(rowid, title, description, steps, expected_result)
+        SELECT {SEARCH_ROWID}, title, description, steps, expected_result FROM test_cases WHERE rowid = new.rowid;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS test_cases_fts_delete AFTER DELETE ON test_cases BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, steps, expected_result)
+        VALUES ('delete', old.{SEARCH_ROWID}, old.title, old.description, old.steps, old.expected_result);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS test_cases_fts_update
+    AFTER UPDATE OF title, description, steps, expected_result ON test_cases BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, steps, expected_result)
+        VALUES ('delete', old.{SEARCH_ROWID}, old.title, old.description, old.steps, old.expected_result);
+        INSERT INTO {FTS_TABLE}(rowid, title, description, steps, expected_result)
+        VALUES (new.{SEARCH_ROWID}, new.title, new.description, new.steps, new.expected_result);
+    END""",
+]
+
+
+def fts_query(term):
+    """Turn free text into a safe FTS5 query: all words must match, last one as a prefix"""
+    words = re.findall(r'\w+', term or '')
+    if not words:
+        return None
+    quoted = [f'"{word}"' for word in words]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def postgres_document():
+    """tsvector over the searchable columns (must match the GIN index expression)"""
+    parts = [func.coalesce(getattr(TestCase, name), '') for name in FTS_COLUMNS]
+    document = parts[0]
+    for part in parts[1:]:
+        document = document.op('||')(' ').op('||')(part)
+    return func.to_tsvector(text("'english'::regconfig"), document)
+
+
+def add_search_rowid(connection):
+    """Add and number test_cases.search_rowid (SQLite) where it is missing"""
+    columns = {column['name'] for column in inspect(connection).get_columns('test_cases')}
+    if SEARCH_ROWID not in columns:
+        connection.exec_driver_sql(f'ALTER TABLE test_cases ADD COLUMN {SEARCH_ROWID} INTEGER')
+    highest = connection.exec_driver_sql(f'SELECT COALESCE(MAX({SEARCH_ROWID}), 0) FROM test_cases').scalar()
+    connection.exec_driver_sql(
+        f'UPDATE test_cases SET {SEARCH_ROWID} = rowid + ? WHERE {SEARCH_ROWID} IS NULL', (highest,))
+    connection.exec_driver_sql(
+        f'CREATE UNIQUE INDEX IF NOT EXISTS ix_test_cases_{SEARCH_ROWID} ON test_cases ({SEARCH_ROWID})')
+
+
+def install(connection):
+    """Create the search index for the connection's database"""
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        add_search_rowid(connection)
+        for statement in SQLITE_FTS_DDL:
+            connection.exec_driver_sql(statement)
+        rebuild(connection)
+    elif dialect == 'postgresql':
+        db.Index('ix_test_cases_search', postgres_document(),
+                 postgresql_using='gin').create(connection, checkfirst=True)
+
+
+def uninstall(connection):
+    """Drop the SQLite FTS5 index and its triggers (test_cases.search_rowid stays)"""
+    if connection.dialect.name == 'sqlite':
+        for trigger in SQLITE_FTS_TRIGGERS:
+            connection.exec_driver_sql(f'DROP TRIGGER IF EXISTS {trigger}')
+        connection.exec_driver_sql(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def rebuild(connection):
+    """Re-index every test case (SQLite FTS5 only; the Postgres index is maintained by the database)"""
+    if connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def backend(connection):
+    """'fts5', 'tsvector' or 'like' depending on what the database supports"""
+    dialect = connection.dialect.name
+    if dialect == 'postgresql':
+        return 'tsvector'
+    if dialect == 'sqlite':
+        found = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)).first()
+        if found:
+            return 'fts5'
+    return 'like'
+
+
+def apply_search(query, term):
+    """Filter a TestCase query by search terms and add rank, snippet and title columns
+
+    Returns (query, rank expression); lower rank is a better match on every
+    backend. Returns (None, None) when the terms contain nothing searchable.
+    """
+    kind = backend(db.session.connection())
+
+    if kind == 'fts5':
+        match = fts_query(term)
+        if match is None:
+            return None, None
+        fts = literal_column(FTS_TABLE)
+        rank = func.bm25(fts, *BM25_WEIGHTS)
+        return (
+            query.join(fts_table, fts_table.c.rowid == literal_column(f'test_cases.{SEARCH_ROWID}'))
+            .filter(fts.op('MATCH')(match))
+            .add_columns(
+                rank.label('search_rank'),
+                func.snippet(fts, -1, HIGHLIGHT_START, HIGHLIGHT_END, '…', SNIPPET_TOKENS).label('snippet'),
+                func.highlight(fts, 0, HIGHLIGHT_START, HIGHLIGHT_END).label('title_highlight'),
+            )
+        ), rank
+
+    if kind == 'tsvector':
+        if not re.search(r'\w', term or ''):
+            return None, None
+        tsquery = func.plainto_tsquery(text("'english'::regconfig"), term)
+        document = postgres_document()
+        rank = -func.ts_rank(document, tsquery)
+        options = f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, MaxWords={SNIPPET_TOKENS * 2}'
+        return (
+            query.filter(document.op('@@')(tsquery))
+            .add_columns(
+                rank.label('search_rank'),
+                func.ts_headline(text("'english'::regconfig"),
+                                 func.coalesce(TestCase.description, ''), tsquery, options).label('snippet'),
+                func.ts_headline(text("'english'::regconfig"),
+                                 TestCase.title, tsquery, options).label('title_highlight'),
+            )
+        ), rank
+
+    words = re.findall(r'\w+', term or '')
+    if not words:
+        return None, None
+    for word in words:
+        query = query.filter(or_(TestCase.title.contains(word), TestCase.description.contains(word)))
+    rank = literal(0.0)
+    return query.add_columns(
+        rank.label('search_rank'),
+        TestCase.description.label('snippet'),
+        TestCase.title.label('title_highlight'),
+    ), rank
+
+
+def is_search_row(row):
+    """True for (TestCase, search_rank, snippet, title_highlight) rows from apply_search()"""
+    return isinstance(row, Row)
+
+
+def search_result_dict(row):
+    """Serialize a test case row, adding ranking details for search results"""
+    if not is_search_row(row):
+        return row.to_dict()
+    data = row.TestCase.to_dict()
+    data['search'] = {
+        'rank': row.search_rank,
+        'snippet': row.snippet,
+        'title': row.title_highlight
+    }
+    return data
+
+
+if __name__ == '__main__':
+    import sys
+    from enterprise_test_platform_sqlite import app
+    from werkzeug.datastructures import MultiDict
+    from queries import test_case_query, fetch_page
+
+    with app.app_context():
+        if len(sys.argv) > 1 and sys.argv[1] == 'rebuild':
+            with db.engine.begin() as connection:
+                rebuild(connection)
+            print(f"✅ Search index rebuilt ({backend(db.session.connection())})")
+        elif len(sys.argv) > 1:
+            args = MultiDict({'search': ' '.join(sys.argv[1:]), 'limit': 20})
+            rows, _ = fetch_page(test_case_query(args), args)
+            print(f"🔍 {len(rows)} results ({backend(db.session.connection())})")
+            for row in rows:
+                result = search_result_dict(row)
+                print(f"📝 {result['search']['title']}  [{result['search']['rank']:.3f}]")
+                print(f"   {result['search']['snippet']}")
+        else:
+            print(__doc__)
@@ -0,0 +1,188 @@
+"""
+Semantic Generation Cache for TestGenie Enterprise
+Finds earlier generations for near-duplicate requirements
+
+The exact generation cache (generation_cache.py) misses when requirements
+differ by wording or an extra sentence. This index embeds requirements
+with an offline hashing vectorizer (word unigrams and bigrams hashed into
+AI_SEMANTIC_DIMENSIONS signed buckets, log term frequency, L2 normalized) and
+returns the cache key of the most similar earlier generation by cosine
+similarity. Only generations with the same test type, count and model
+parameters (the scope) are compared.
+
+Vectors are float32 rows in a flat file next to the cache database
+(AI_CACHE_PATH + '.vectors'), read through a NumPy memmap when NumPy is
+installed (requirements.txt) and a plain mmap with a pure-Python scan
+otherwise, about 30ms per 1,000 entries in scope; row metadata lives in the
+cache database. Rows are written at offsets reserved by their INTEGER
+PRIMARY KEY, so several processes can append at once.
+
+Settings (environment):
+    AI_SEMANTIC_CACHE_ENABLED - true/false (default true)
+    AI_SEMANTIC_THRESHOLD     - minimum cosine similarity for a hit (default 0.9)
+    AI_SEMANTIC_DIMENSIONS    - vector size (default 512; changing it needs a clear)
+"""
+
+import logging
+import math
+import mmap
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from array import array
+from contextlib import contextmanager
+
+try:
+    import numpy
+except ImportError:  # Optional; similarity falls back to pure Python
+    numpy = None
+
+logger = logging.getLogger(__name__)
+
+_WORDS = re.compile(r'[a-z0-9]+')
+
+
+def hashed_vector(text, dimensions):
+    """L2-normalized hashing vector of word unigrams and bigrams (float32 array)"""
+    words = _WORDS.findall(text.lower())
+    counts = {}
+    for feature in words + [f'{a} {b}' for a, b in zip(words, words[1:])]:
+        counts[feature] = counts.get(feature, 0) + 1
+
+    vector = array('f', bytes(4 * dimensions))
+    for feature, count in counts.items():
+        digest = zlib.crc32(feature.encode('utf-8'))
+        sign = 1.0 if digest & 0x80000000 else -1.0
+        vector[digest % dimensions] += sign * (1.0 + math.log(count))
+    norm = math.sqrt(sum(value * value for value in vector))
+    if norm:
+        for index, value in enumerate(vector):
+            vector[index] = value / norm
+    return vector
+
+
+class SemanticIndex:
+    """Requirement vectors with the generation cache keys they produced"""
+
+    def __init__(self, path, threshold=0.9, dimensions=512):
+        self.path = path
+        self.vectors_path = path + '.vectors'
+        self.threshold = threshold
+        self.dimensions = dimensions
+        self.row_bytes = 4 * dimensions
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'stale': 0}
+        with self._connect() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS semantic_entries ('
+                ' row INTEGER PRIMARY KEY, key TEXT NOT NULL UNIQUE, scope TEXT NOT NULL,'
+                ' requirements TEXT, created_at REAL NOT NULL)')
+            connection.execute('CREATE INDEX IF NOT EXISTS ix_semantic_entries_scope ON semantic_entries (scope)')
+        open(self.vectors_path, 'ab').close()
+
+    @contextmanager
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=10)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def add(self, requirements, scope, key):
+        """Index the requirements of a cached generation (no-op if key is indexed)"""
+        vector = hashed_vector(requirements, self.dimensions)
+        with self._connect() as connection:
+            cursor = connection.execute(
+                'INSERT OR IGNORE INTO semantic_entries (key, scope, requirements, created_at) VALUES (?, ?, ?, ?)',
+                (key, scope, requirements[:500], time.time()))
+            if not cursor.rowcount:
+                return
+            row = cursor.lastrowid
+        # Rows never overlap, so other processes writing their own rows meanwhile are fine
+        with self._lock, open(self.vectors_path, 'r+b') as stream:
+            stream.seek((row - 1) * self.row_bytes)
+            stream.write(vector.tobytes())
+
+    def nearest(self, requirements, scope):
+        """(key, similarity, indexed requirements) of the closest entry in scope, or None"""
+        with self._connect() as connection:
+            entries = connection.execute(
+                'SELECT row, key, requirements FROM semantic_entries WHERE scope = ?', (scope,)).fetchall()
+        if not entries:
+            return None
+        rows_available = os.path.getsize(self.vectors_path) // self.row_bytes
+        entries = [entry for entry in entries if entry[0] <= rows_available]
+        if not entries:
+            return None
+
+        query = hashed_vector(requirements, self.dimensions)
+        if numpy is not None:
+            matrix = numpy.memmap(self.vectors_path, dtype=numpy.float32, mode='r',
+                                  shape=(rows_available, self.dimensions))
+            scores = matrix[[entry[0] - 1 for entry in entries]] @ numpy.frombuffer(query, dtype=numpy.float32)
+            best = int(scores.argmax())
+            similarity = float(scores[best])
+        else:
+            with open(self.vectors_path, 'rb') as stream, \
+                    mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                best, similarity = 0, -1.0
+                for position, entry in enumerate(entries):
+                    offset = (entry[0] - 1) * self.row_bytes
+                    row = array('f', mapped[offset:offset + self.row_bytes])
+                    score = sum(a * b for a, b in zip(row, query) if a)
+                    if score > similarity:
+                        best, similarity = position, score
+        return entries[best][1], similarity, entries[best][2]
+
+    def match(self, requirements, scope):
+        """nearest() when its similarity reaches the threshold, else None"""
+        nearest = self.nearest(requirements, scope)
+        hit = nearest is not None and nearest[1] >= self.threshold
+        self._count('hits' if hit else 'misses')
+        if nearest is not None and not hit:
+            logger.info(f"🧭 Semantic cache miss: best similarity {nearest[1]:.3f} < {self.threshold}")
+        return nearest if hit else None
+
+    def forget(self, key):
+        """Drop an entry whose generation left the generation cache (its vector row stays unused)"""
+        self._count('stale')
+        with self._connect() as connection:
+            connection.execute('DELETE FROM semantic_entries WHERE key = ?', (key,))
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def clear(self):
+        with self._connect() as connection:
+            connection.execute('DELETE FROM semantic_entries')
+        open(self.vectors_path, 'wb').close()
+
+    def stats(self):
+        """Counters of this process plus the size of the index"""
+        with self._lock:
+            stats = dict(self._stats)
+        with self._connect() as connection:
+            entries = connection.execute('SELECT COUNT(*) FROM semantic_entries').fetchone()[0]
+        lookups = stats['hits'] + stats['misses']
+        stats.update(enabled=True, entries=entries, vector_bytes=os.path.getsize(self.vectors_path),
+                     threshold=self.threshold, dimensions=self.dimensions,
+                     backend='numpy memmap' if numpy is not None else 'mmap',
+                     hit_rate=round(stats['hits'] / lookups, 4) if lookups else None)
+        return stats
+
+
+def create_semantic_index(cache):
+    """Index stored with the generation cache, or None when either is disabled"""
+    if cache is None or os.getenv('AI_SEMANTIC_CACHE_ENABLED', 'true').lower() != 'true':
+        return None
+    try:
+        return SemanticIndex(cache.path, threshold=float(os.getenv('AI_SEMANTIC_THRESHOLD', 0.9)),
+                             dimensions=int(os.getenv('AI_SEMANTIC_DIMENSIONS', 512)))
+    except Exception as e:
+        logger.error(f"❌ Semantic generation cache unavailable: {e}")
+        return None
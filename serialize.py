@@ -0,0 +1,210 @@
+"""
+Fast List Serialization for TestGenie Enterprise
+Encodes list API pages straight from Core rows instead of ORM objects
+
+The list endpoints select only the columns they return (through the mapped
+attributes, so ORM criteria such as hidden deleting projects still apply),
+skip the identity map and to_dict(), and splice the stored JSON text of
+steps and tags into the output without decoding and re-encoding it. Pages
+are encoded with orjson when it is installed and the json module otherwise;
+either way the output matches the to_dict() shapes.
+
+Stored steps/tags are the text TestCase.set_steps/set_tags wrote: a JSON
+array, or plain legacy text, which is wrapped in a one-item list exactly as
+get_steps/get_tags do.
+
+?fields=title,status (comma separated or repeated) limits both the SELECT
+and the output; `id` is always included and fields=all returns everything.
+By default list pages leave out heavy text columns (*_LIST_FIELDS); the
+detail endpoints always return full objects.
+"""
+
+import json
+
+from flask import Response
+
+from models import db, Project, TestCase, TestSuite, TestRun, TestResult, chunked
+from queries import (keyset, ranked_keyset, fetch_page, filtered_test_cases, test_run_query, project_query,
+                     test_suite_query)
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up; requirements.txt installs it
+    orjson = None
+
+# How a column is written: as-is, JSON text spliced verbatim, '' for a
+# missing timestamp (test runs), or 0 for a missing count
+VALUE, JSON_LIST, OPTIONAL_DATETIME, COUNT = 'value', 'json_list', 'optional_datetime', 'count'
+
+TEST_CASE_FIELDS = {
+    'id': VALUE, 'title': VALUE, 'description': VALUE, 'steps': JSON_LIST, 'expected_result': VALUE,
+    'priority': VALUE, 'status': VALUE, 'project_id': VALUE, 'tags': JSON_LIST, 'created_by': VALUE,
+    'created_at': VALUE, 'updated_at': VALUE,
+}
+TEST_RUN_FIELDS = {
+    'id': VALUE, 'name': VALUE, 'test_suite_id': VALUE, 'status': VALUE, 'executed_by': VALUE,
+    'started_at': OPTIONAL_DATETIME, 'completed_at': OPTIONAL_DATETIME, 'created_at': VALUE,
+}
+PROJECT_FIELDS = {
+    'id': VALUE, 'name': VALUE, 'description': VALUE, 'created_by': VALUE, 'created_at': VALUE,
+    'test_cases_count': COUNT, 'test_suites_count': COUNT,
+}
+TEST_SUITE_FIELDS = {
+    'id': VALUE, 'name': VALUE, 'description': VALUE, 'project_id': VALUE, 'created_by': VALUE,
+    'created_at': VALUE, 'test_cases_count': COUNT, 'test_runs_count': COUNT,
+}
+
+# Default list projections: everything except long free text
+TEST_CASE_LIST_FIELDS = tuple(name for name in TEST_CASE_FIELDS
+                              if name not in ('description', 'steps', 'expected_result'))
+PROJECT_LIST_FIELDS = tuple(name for name in PROJECT_FIELDS if name != 'description')
+
+# Test run results come from test_results, not a test_runs column
+TEST_RUN_EXTRAS = ('results',)
+
+
+def _default(value):
+    """json fallback for datetimes (orjson writes the same isoformat text itself)"""
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def dumps(value):
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, default=_default, separators=(',', ':')).encode('utf-8')
+
+
+def json_list_text(text):
+    """A stored steps/tags value as JSON array bytes, spliced when already an array
+
+    set_steps()/set_tags() store non-list values as given, so bracketed text
+    is only spliced after it parses; anything else is wrapped like get_tags().
+    """
+    if not text:
+        return b'[]'
+    if text[0] == '[' and text[-1] == ']':
+        try:
+            (orjson or json).loads(text)
+            return text.encode('utf-8')
+        except ValueError:
+            pass
+    return dumps([text])
+
+
+def item_encoder(fields):
+    """Function encoding one row (columns in fields order) as a JSON object
+
+    The per-field decisions are made once per page; extra adds already-built
+    values such as a run's results.
+    """
+    names = list(fields)
+    plain = [(index, name) for index, name in enumerate(names) if fields[name] != JSON_LIST]
+    spliced = [(index, b'"' + name.encode() + b'":') for index, name in enumerate(names)
+               if fields[name] == JSON_LIST]
+    optional = [name for name in names if fields[name] == OPTIONAL_DATETIME]
+    counts = [name for name in names if fields[name] == COUNT]
+
+    def encode(row, extra=None):
+        values = {name: row[index] for index, name in plain}
+        for name in optional:
+            if values[name] is None:
+                values[name] = ''
+        for name in counts:
+            values[name] = values[name] or 0
+        if extra:
+            values.update(extra)
+        parts = [dumps(values)[1:-1]] if values else []
+        parts.extend(prefix + json_list_text(row[index]) for index, prefix in spliced)
+        return b'{' + b','.join(parts) + b'}'
+    return encode
+
+
+def encode_page(items, next_cursor):
+    """{"items": [...], "next_cursor": ...} from encoded items"""
+    return b'{"items":[' + b','.join(items) + b'],"next_cursor":' + dumps(next_cursor) + b'}'
+
+
+def json_response(body, status=200):
+    return Response(body, status=status, mimetype='application/json')
+
+
+def requested_fields(args, fields, default=None, extras=()):
+    """(fields subset, extras) selected by ?fields=; raises ValueError for unknown names"""
+    names = [name.strip() for value in args.getlist('fields') for name in value.split(',') if name.strip()]
+    if not names:
+        names = list(default or fields) + list(extras)
+    elif names == ['all']:
+        names = list(fields) + list(extras)
+    unknown = sorted(set(names) - set(fields) - set(extras))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)} "
+                         f"(available: {', '.join(list(fields) + list(extras))})")
+    selected = {name: kind for name, kind in fields.items() if name == 'id' or name in names}
+    return selected, [name for name in extras if name in names]
+
+
+def columns(model, fields):
+    """Mapped attributes for the fields in order, then created_at and id for the keyset cursor"""
+    names = list(dict.fromkeys(list(fields) + ['created_at', 'id']))
+    return [getattr(model, name) for name in names]
+
+
+def test_case_page(args):
+    """Encoded /api/test-cases page; search results carry their ranking details"""
+    fields, _ = requested_fields(args, TEST_CASE_FIELDS, TEST_CASE_LIST_FIELDS)
+    query, rank = filtered_test_cases(args)
+    if rank is None:
+        query = keyset(query.with_entities(*columns(TestCase, fields)), TestCase, args)
+    else:
+        # Keep the rank, snippet and highlight columns added by apply_search()
+        search_columns = [entity['expr'] for entity in query.column_descriptions[1:]]
+        query = ranked_keyset(query.with_entities(*columns(TestCase, fields), *search_columns), rank, args)
+    rows, next_cursor = fetch_page(query, args)
+
+    encode = item_encoder(fields)
+    if rank is None:
+        return encode_page([encode(row) for row in rows], next_cursor)
+    return encode_page([encode(row, {'search': {'rank': row.search_rank, 'snippet': row.snippet,
+                                                'title': row.title_highlight}})
+                        for row in rows], next_cursor)
+
+
+def run_results(run_ids):
+    """{test_run_id: {test_case_id: outcome}} for a page of runs, one query per 500 runs"""
+    results = TestResult.__table__
+    by_run = {}
+    for ids in chunked(run_ids):
+        for run_id, test_case_id, outcome in db.session.execute(
+                db.select(results.c.test_run_id, results.c.test_case_id, results.c.outcome)
+                .where(results.c.test_run_id.in_(ids)).order_by(results.c.id)):
+            by_run.setdefault(run_id, {})[test_case_id] = outcome
+    return by_run
+
+
+def test_run_page(args):
+    """Encoded /api/test-runs page, with each run's results unless fields= leaves them out"""
+    fields, extras = requested_fields(args, TEST_RUN_FIELDS, extras=TEST_RUN_EXTRAS)
+    rows, next_cursor = fetch_page(test_run_query(args).with_entities(*columns(TestRun, fields)), args)
+    encode = item_encoder(fields)
+    if 'results' not in extras:
+        return encode_page([encode(row) for row in rows], next_cursor)
+    results = run_results([row.id for row in rows])
+    return encode_page([encode(row, {'results': results.get(row.id, {})}) for row in rows], next_cursor)
+
+
+def project_page(args):
+    """Encoded /api/projects page"""
+    fields, _ = requested_fields(args, PROJECT_FIELDS, PROJECT_LIST_FIELDS)
+    rows, next_cursor = fetch_page(project_query(args).with_entities(*columns(Project, fields)), args)
+    encode = item_encoder(fields)
+    return encode_page([encode(row) for row in rows], next_cursor)
+
+
+def test_suite_page(args):
+    """Encoded /api/test-suites page (without the test case ID lists)"""
+    fields, _ = requested_fields(args, TEST_SUITE_FIELDS)
+    rows, next_cursor = fetch_page(test_suite_query(args).with_entities(*columns(TestSuite, fields)), args)
+    encode = item_encoder(fields)
+    return encode_page([encode(row) for row in rows], next_cursor)
@@ -0,0 +1,70 @@
+"""
+Serialization Check for TestGenie Enterprise
+Compares the spliced list encoding (serialize.py) with to_dict() for stored
+steps/tags values that are not plain JSON arrays
+
+set_steps()/set_tags() keep non-list values as given, so rows may hold plain
+text, bracketed text that is not JSON, or an empty string. Every such row
+must still encode to valid JSON that matches get_steps()/get_tags().
+
+Usage:
+    python serialize_check.py
+"""
+
+import json
+import os
+import sys
+
+# Checks run against a scratch database built from the current models
+os.environ['DATABASE_URL'] = os.environ.get('SERIALIZE_CHECK_DATABASE_URL', 'sqlite://')
+os.environ['CACHE_BACKEND'] = 'none'
+
+STORED_VALUES = ['["Open the page", "Submit"]', '[smoke]', '[not json', '[1, 2]', '[ "a" ]', 'plain text',
+                 '[]', '']
+
+
+def check(condition, label, failures):
+    print(f"{'✅' if condition else '❌'} {label}")
+    if not condition:
+        failures.append(label)
+
+
+def main():
+    from enterprise_test_platform_sqlite import app
+    from models import db, Project, TestCase
+
+    print("🧪 TestGenie Serialization Check")
+    print("=" * 50)
+    failures = []
+    client = app.test_client()
+    with app.app_context():
+        project = Project(name='Serialization check', description='')
+        db.session.add(project)
+        db.session.commit()
+        project_id = project.id
+        expected = {}
+        for value in STORED_VALUES:
+            case = TestCase(title=f'Stored {value!r}', project_id=project_id, steps=value, tags=value)
+            db.session.add(case)
+            db.session.flush()
+            expected[case.id] = case.to_dict()
+        db.session.commit()
+
+    response = client.get(f'/api/test-cases?fields=all&limit=500&project_id={project_id}')
+    try:
+        items = {item['id']: item for item in json.loads(response.get_data())['items']}
+    except ValueError as e:
+        items = {}
+        check(False, f'page is valid JSON ({e})', failures)
+    for case_id, case in expected.items():
+        item = items.get(case_id, {})
+        check(item.get('steps') == case['steps'] and item.get('tags') == case['tags'],
+              f"{case['title']} encodes as {case['tags']}", failures)
+
+    print()
+    print(f"📊 {len(failures)} failed checks")
+    return failures
+
+
+if __name__ == '__main__':
+    sys.exit(1 if main() else 0)
@@ -0,0 +1,130 @@
+"""
+Statistics Rollup for TestGenie Enterprise
+Rebuilds and verifies the stats_rollup table behind the dashboard and reports
+
+stats_rollup is maintained incrementally by flush hooks in models.py; this
+module recomputes it from the base tables. Writes that bypass the ORM (raw
+SQL, bulk Core statements) must update it themselves or be followed by a
+rebuild. Rebuild while writers are idle: increments committed during the
+rebuild's snapshot would be overwritten.
+
+Usage:
+    python stats_rollup.py verify     - Compare the rollup with live counts
+    python stats_rollup.py rebuild    - Recompute the rollup from scratch
+"""
+
+from sqlalchemy import select, delete, insert, func, inspect, true
+
+from models import db, Project, TestCase, TestSuite, TestRun, TestResult, StatsRollup, rollup_keys
+
+
+def compute_stats(connection):
+    """Live counts as {(project_id, dimension, value): count}, computed from the base tables"""
+    cases = TestCase.__table__
+    suites = TestSuite.__table__
+    runs = TestRun.__table__
+    results = TestResult.__table__
+
+    stats = {}
+    # Projects being deleted keep their own rows but are not in the all-projects totals
+    # (the column is missing while migration 8 runs; nothing can be deleting then)
+    projects = Project.__table__
+    live, deleting = true(), set()
+    if 'deleting' in {column['name'] for column in inspect(connection).get_columns('projects')}:
+        live = projects.c.deleting.is_(False)
+        deleting = set(connection.execute(select(projects.c.id).where(~live)).scalars())
+
+    def add(project_id, dimension, value, count):
+        keys = rollup_keys(project_id, dimension, value)
+        for key in keys[:1] if project_id in deleting else keys:
+            stats[key] = stats.get(key, 0) + count
+
+    add(None, 'projects', '', connection.execute(
+        select(func.count()).select_from(projects).where(live)).scalar())
+
+    for project_id, status, priority, count in connection.execute(
+            select(cases.c.project_id, cases.c.status, cases.c.priority, func.count())
+            .group_by(cases.c.project_id, cases.c.status, cases.c.priority)):
+        add(project_id, 'test_cases', '', count)
+        add(project_id, 'test_case_status', status, count)
+        add(project_id, 'test_case_priority', priority, count)
+
+    for project_id, count in connection.execute(
+            select(suites.c.project_id, func.count()).group_by(suites.c.project_id)):
+        add(project_id, 'test_suites', '', count)
+
+    for project_id, status, count in connection.execute(
+            select(suites.c.project_id, runs.c.status, func.count())
+            .select_from(runs.outerjoin(suites, suites.c.id == runs.c.test_suite_id))
+            .group_by(suites.c.project_id, runs.c.status)):
+        add(project_id, 'test_runs', '', count)
+        add(project_id, 'test_run_status', status, count)
+
+    for project_id, outcome, count in connection.execute(
+            select(suites.c.project_id, results.c.outcome, func.count())
+            .select_from(results
+                         .outerjoin(runs, runs.c.id == results.c.test_run_id)
+                         .outerjoin(suites, suites.c.id == runs.c.test_suite_id))
+            .group_by(suites.c.project_id, results.c.outcome)):
+        add(project_id, 'test_result_outcome', outcome, count)
+
+    return stats
+
+
+def stored_stats(connection):
+    """Current stats_rollup contents as {(project_id, dimension, value): count}"""
+    rollup = StatsRollup.__table__
+    return {
+        (project_id, dimension, value): count
+        for project_id, dimension, value, count in connection.execute(
+            select(rollup.c.project_id, rollup.c.dimension, rollup.c.value, rollup.c.count))
+    }
+
+
+def rebuild(connection):
+    """Replace the rollup with freshly computed counts; returns the number of rows"""
+    rollup = StatsRollup.__table__
+    rows = [
+        {'project_id': project_id, 'dimension': dimension, 'value': value, 'count': count}
+        for (project_id, dimension, value), count in compute_stats(connection).items()
+    ]
+    connection.execute(delete(rollup))
+    if rows:
+        connection.execute(insert(rollup), rows)
+    return len(rows)
+
+
+def verify(connection):
+    """Differences between the rollup and live counts as [(key, stored, live)]"""
+    live = compute_stats(connection)
+    stored = stored_stats(connection)
+    mismatches = []
+    for key in sorted(set(live) | set(stored)):
+        # Zero rows are left behind when the last row of a bucket is deleted
+        if stored.get(key, 0) != live.get(key, 0):
+            mismatches.append((key, stored.get(key, 0), live.get(key, 0)))
+    return mismatches
+
+
+if __name__ == '__main__':
+    import sys
+    from enterprise_test_platform_sqlite import app
+
+    with app.app_context():
+        command = sys.argv[1] if len(sys.argv) > 1 else ''
+        if command == 'rebuild':
+            with db.engine.begin() as connection:
+                count = rebuild(connection)
+            print(f"✅ Stats rollup rebuilt ({count} rows)")
+        elif command == 'verify':
+            with db.engine.connect() as connection:
+                mismatches = verify(connection)
+            if not mismatches:
+                print("✅ Stats rollup matches live counts")
+            else:
+                print(f"❌ {len(mismatches)} stats rollup mismatches")
+                for (project_id, dimension, value), stored, live in mismatches:
+                    print(f"   {project_id or '(all)'} {dimension}={value!r}: rollup {stored}, live {live}")
+            sys.exit(1 if mismatches else 0)
+        else:
+            print(__doc__)
@@ -0,0 +1,109 @@
+"""
+Storage Profiles for TestGenie Enterprise
+Engine options and per-connection PRAGMAs for running on SQLite under load
+
+The production profile puts the database in WAL mode so readers never block
+the single writer, waits on locks (busy_timeout) instead of failing with
+"database is locked", enforces foreign keys and sizes the page cache and
+memory map for read-heavy list APIs. The baseline profile leaves SQLite's
+defaults in place and exists for benchmarking.
+
+Select with SQLITE_PROFILE (see azure_config.Config); non-SQLite databases use
+the config's SQLALCHEMY_ENGINE_OPTIONS unchanged.
+"""
+
+import logging
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE = 'production'
+
+SQLITE_PROFILES = {
+    'production': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',      # Durable in WAL mode except on power loss
+        'foreign_keys': 'ON',
+        'busy_timeout': 15000,        # ms to wait for the write lock
+        'cache_size': -65536,         # 64 MiB page cache per connection
+        'mmap_size': 268435456,       # 256 MiB memory-mapped reads
+        'temp_store': 'MEMORY',
+    },
+    'baseline': {},
+}
+
+# One writer at a time: a moderate pool keeps readers concurrent without
+# piling connections up behind the write lock
+SQLITE_POOL_OPTIONS = {
+    'pool_size': 10,
+    'max_overflow': 10,
+    'pool_timeout': 30,
+}
+
+
+def is_sqlite(uri):
+    return make_url(uri).get_backend_name() == 'sqlite'
+
+
+def is_sqlite_memory(uri):
+    return is_sqlite(uri) and make_url(uri).database in (None, '', ':memory:')
+
+
+def sqlite_profile(name):
+    """PRAGMA settings for a profile name (unknown names fall back to the default)"""
+    if name not in SQLITE_PROFILES:
+        logger.warning(f"⚠️ Unknown SQLITE_PROFILE '{name}', using '{DEFAULT_PROFILE}'")
+        name = DEFAULT_PROFILE
+    return SQLITE_PROFILES[name]
+
+
+def engine_options(uri, config=None, profile=DEFAULT_PROFILE):
+    """SQLAlchemy engine options for a database URI
+
+    Non-SQLite databases get the config's SQLALCHEMY_ENGINE_OPTIONS. SQLite
+    files get pool options and a busy timeout matching the profile;
+    in-memory SQLite keeps Flask-SQLAlchemy's single shared connection.
+    """
+    if not is_sqlite(uri):
+        return dict(getattr(config, 'SQLALCHEMY_ENGINE_OPTIONS', {}) or {})
+
+    pragmas = sqlite_profile(profile)
+    options = {'connect_args': {'check_same_thread': False}}
+    if 'busy_timeout' in pragmas:
+        options['connect_args']['timeout'] = pragmas['busy_timeout'] / 1000
+    if not is_sqlite_memory(uri):
+        options.update(SQLITE_POOL_OPTIONS)
+    return options
+
+
+def apply_storage_profile(engine, profile=DEFAULT_PROFILE):
+    """Run the profile's PRAGMAs on every new connection of a SQLite engine"""
+    if engine.dialect.name != 'sqlite':
+        return
+    pragmas = sqlite_profile(profile)
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+    logger.info(f"✅ SQLite storage profile '{profile}' applied")
+
+
+def storage_status(engine):
+    """Effective PRAGMA values of a connection, for diagnostics"""
+    if engine.dialect.name != 'sqlite':
+        return {'dialect': engine.dialect.name}
+    status = {'dialect': 'sqlite'}
+    with engine.connect() as connection:
+        for name in SQLITE_PROFILES[DEFAULT_PROFILE]:
+            status[name] = connection.exec_driver_sql(f'PRAGMA {name}').scalar()
+    return status